@@ -1,20 +1,35 @@
 # app.py
 # BeCoach — Suite de Coaching Estratégico (UI Pro + VAK 24 + Copiloto + PDF)
-# Requisitos: streamlit, matplotlib, numpy, pandas, google-generativeai, reportlab
+# Requisitos: streamlit, matplotlib, numpy, pandas, google-generativeai, reportlab (carga diferida salvo streamlit)
 
-import io
+import contextlib
+import functools
+import os
+import tempfile
+import time
 from datetime import datetime
 
 import streamlit as st
-import matplotlib.pyplot as plt
-import numpy as np
-import pandas as pd
-import google.generativeai as genai
 
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
+from claridad import batch, bulk, generation, structured
+from claridad.cache import ResponseCache, cache_key
+from claridad.charts import render_radar
+from claridad.clients import ClientProvider
+from claridad.context import CopilotoContext
+from claridad.data import CANALES, VAK_ITEMS, ruedas_data
+from claridad.export import SESSION_FIELDS, build_pdf, build_txt, export_filename, fingerprint
+from claridad.generation import MODEL_NAME
+from claridad.heuristics import local_analysis
+from claridad.jobs import CANCELADA, EN_CURSO, ERROR, LISTA, PENDIENTE, JobRunner, QueueFull
+from claridad.prompts import build_prompt_auto, build_prompt_copiloto, build_prompt_sintesis
+from claridad.scoring import predominant, score_vak
+from claridad.similar import RuedaIndex
+from claridad.store import SessionRecorder, SessionStore, person_key
+from claridad.sweep import AreaSweep, concurrency
+from claridad.throttle import Throttle
+from claridad.tracing import Tracer
+
+# pandas, google-generativeai y ReportLab se importan donde se usan: el primer render no paga su carga.
 
 # -------------------------
 # CONFIG
@@ -24,6 +39,7 @@ st.set_page_config(
     layout="wide",
     page_icon="BC",
 )
+_t_rerun = time.perf_counter()
 
 # -------------------------
 # CSS (Interfaz limpia)
@@ -63,303 +79,256 @@ DEFAULTS = {
     "datos_rueda": None,             # {"area": str, "vectores": [str], "valores":[int]}
     "puntos_vak": None,              # {"V": int, "A": int, "C": int}
     "diagnostico_generado": None,    # str
+    "hipotesis_local": False,        # diagnostico_generado es el análisis local (plazo vencido o sin clave)
+    "hipotesis_borrador": False,     # diagnostico_generado viene de una rueda parecida (RuedaIndex)
     "chat_hist": [],                 # [{"role":"user|assistant", "content": str}]
     "area_sel": "0. MAPA GENERAL (Macro)",
+    "job_hipotesis": None,           # id de JobRunner en curso (Tab 3)
+    "job_copiloto": None,            # id de JobRunner en curso (Tab 5)
+    "aviso_copiloto": None,          # aviso de la última jugada entregada (MAX_TOKENS o vacía)
+    "ruedas_areas": {},              # {área: datos_rueda} guardadas en esta sesión (Tab 3, todas las áreas)
+    "sweep_areas": None,             # claridad.sweep.AreaSweep en curso o terminado (Tab 3)
 }
 for k, v in DEFAULTS.items():
     if k not in st.session_state:
         st.session_state[k] = v
+if "_recorder" not in st.session_state:
+    st.session_state._recorder = SessionRecorder()  # id de sesión en el historial persistente
+
+POLL_SECONDS = 0.5  # refresco de los fragmentos que siguen una generación en segundo plano
+
+if "rerun_ms" not in st.session_state:
+    st.session_state.rerun_ms = {}  # {"app" | nombre de pestaña: ms de la última ejecución}
+
+
+def timed_fragment(nombre: str):
+    # Cada pestaña es un fragmento: una interacción dentro de ella solo re-ejecuta esa pestaña.
+    # Se anota el tiempo de la última ejecución para el panel ⏱️ de la barra lateral.
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                ms = (time.perf_counter() - t0) * 1000
+                st.session_state.rerun_ms[nombre] = ms
+                get_tracer().record(f"fragment.{nombre}", ms)
+
+        return st.fragment(wrapper)
+
+    return decorator
 
 
 def reset_app():
+    get_job_runner().cancel(st.session_state.job_hipotesis)
+    get_job_runner().cancel(st.session_state.job_copiloto)
+    if st.session_state.sweep_areas is not None:
+        st.session_state.sweep_areas.cancel()
     for k, v in DEFAULTS.items():
         st.session_state[k] = v
+    # Lo anterior ya quedó guardado al final del último rerun; el cliente nuevo abre otra sesión
+    st.session_state._recorder = SessionRecorder()
     st.toast("Sesión limpia ✅", icon="🧹")
 
 
 def has_api_key() -> bool:
+    if not generation.needs_api_key():
+        return True
     return "GEMINI_API_KEY" in st.secrets and bool(st.secrets["GEMINI_API_KEY"])
 
 
+@st.cache_resource
+def _model_provider() -> ClientProvider:
+    # genai.configure es estado global del SDK; ClientProvider lo serializa y lo repite solo si rota la clave.
+    return ClientProvider(generation.backend_factory("generativeai"))
+
+
 def get_model():
-    genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
-    return genai.GenerativeModel("gemini-2.5-flash")
+    # Con el stub o el servidor simulado no hace falta clave (ni secrets.toml)
+    return _model_provider().get(st.secrets["GEMINI_API_KEY"] if generation.needs_api_key() else "local")
 
 
-# -------------------------
-# DATA: RUEDAS
-# -------------------------
-ruedas_data = {
-    "0. MAPA GENERAL (Macro)": ["Salud", "Economía", "Trabajo", "Des. Personal", "Familia", "Amor", "Amistad", "Diversión"],
-    "2.1 SALUD": ["Sueño", "Nutrición", "Energía", "Movimiento", "Estrés", "Prevención", "Escucha Corporal", "Rutinas"],
-    "2.2 ECONOMÍA": ["Ingresos", "Ahorro", "Deudas", "Control Gasto", "Relación Dinero", "Edu. Finan.", "Extras", "Seguridad"],
-    "2.3 TRABAJO": ["Claridad", "Productividad", "Satisfacción", "Progresión", "Clima", "Autonomía", "Propósito", "Reconocimiento"],
-    "2.4 DESARROLLO PERSONAL": ["Autoconocimiento", "Emociones", "Disciplina", "Narrativa", "Aprendizaje", "Valores", "Adaptación", "Evolución"],
-    "2.5 FAMILIA": ["Comunicación", "Tiempo", "Apoyo", "Conflictos", "Límites", "Responsabilidad", "Presencia", "Unión"],
-    "2.6 AMOR": ["Comunicación", "Intimidad", "Confianza", "Proyecto", "Conflictos", "Espacio", "Afecto", "Satisfacción"],
-    "2.7 AMISTAD": ["Cantidad", "Profundidad", "Confianza", "Apoyo", "Diversidad", "Influencia", "Frecuencia", "Pertenencia"],
-    "2.8 DIVERSIÓN": ["Tiempo", "Desconexión", "Placer", "Creatividad", "Juego", "Variedad", "Entorno", "Culpa"],
+@st.cache_resource
+def get_response_cache() -> ResponseCache:
+    return ResponseCache()
+
+
+@st.cache_resource
+def get_job_runner() -> JobRunner:
+    return JobRunner(max_workers=4)
+
+
+@st.cache_resource
+def get_session_store() -> SessionStore:
+    # Historial persistente (data/sesiones.sqlite3): una transacción de solo-añadir por rerun
+    return SessionStore()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def rueda_rows(cliente: str | None = None, coach: str | None = None) -> list:
+    # Ruedas guardadas de un cliente o de la cartera de un coach; caché corta compartida entre sesiones
+    return get_session_store().rueda_rows(cliente=cliente, coach=coach)
+
+
+@st.cache_resource
+def get_rueda_index() -> RuedaIndex:
+    # Hipótesis ya generadas por área + puntuaciones, para ofrecer un borrador ante ruedas casi iguales
+    return RuedaIndex()
+
+
+@st.cache_resource
+def get_throttle() -> Throttle:
+    # Presupuesto RPM/TPM, reintentos y coalescencia compartidos por todas las sesiones del proceso
+    return Throttle()
+
+
+@st.cache_resource
+def get_tracer() -> Tracer:
+    # Spans en .cache/traces.jsonl (rotativo) + ventana p50/p95 para el panel de depuración
+    return Tracer()
+
+
+def stream_opener(force: bool = False, config: dict | None = None):
+    # Modelo, caché, cola y trazas se resuelven aquí (hilo del script); la función devuelta abre streams
+    # desde cualquier hilo (JobRunner, claridad.sweep), también para prompts que aún no existen.
+    model, cache, throttle, tracer = get_model(), get_response_cache(), get_throttle(), get_tracer()
+
+    def abrir(prompt: str, span: str = "gemini", stats: dict | None = None):
+        stats = {} if stats is None else stats
+        chunks = generation.stream(model, prompt, cache=cache, force=force, stats=stats, throttle=throttle, config=config)
+        return tracer.stream(span, chunks, stats)
+
+    return abrir
+
+
+def stream_text(prompt: str, force: bool = False, span: str = "gemini", config: dict | None = None,
+                stats: dict | None = None):
+    # Entrega la respuesta por fragmentos: el coach lee desde el primer token.
+    # Pasa por la caché en disco; force=True ignora la entrada guardada y la sobrescribe.
+    # El iterador puede consumirse en un hilo del JobRunner.
+    # El span cubre la generación completa (tamaños, tokens y acierto de caché); stats (opcional) los recibe
+    # también, p. ej. en job.meta para avisar de una respuesta cortada (aviso_salida).
+    return stream_opener(force, config)(prompt, span, stats)
+
+
+# Secciones del modo JSON y su render, por prompt
+SECCIONES = {
+    "hipotesis": (structured.HIPOTESIS_SECCIONES, structured.render_hipotesis),
+    "copiloto": (structured.COPILOTO_SECCIONES, structured.render_copiloto),
 }
 
+
+def config_for(prompt: str) -> dict:
+    # Tope de salida siempre; esquema JSON si el modo estructurado está activo en la barra lateral
+    schema = structured.response_schema(SECCIONES[prompt][0]) if st.session_state.get("modo_json") else None
+    return generation.generation_config(prompt, schema)
+
+
+def huella_hipotesis(prompt_auto: str, config: dict) -> str:
+    return cache_key(generation.cache_model(MODEL_NAME, config), prompt_auto)
+
+
+def partial_text(job) -> str:
+    # El JSON a medias no se lee: en modo estructurado se muestra el avance
+    if job.meta.get("json"):
+        return f"Respuesta estructurada en curso… {len(job.text)} caracteres"
+    return job.text
+
+
+def final_text(job, prompt: str) -> str:
+    # Texto entregado: en modo JSON se valida contra el esquema y se pinta desde los campos
+    texto = job.text.strip()
+    if not job.meta.get("json"):
+        return texto
+    secciones, render = SECCIONES[prompt]
+    campos = structured.parse(texto, secciones)
+    if campos is None:
+        return f"⚠️ Respuesta fuera de esquema (¿cortada por el tope de tokens?):\n\n{texto}"
+    return render(campos)
+
+
+def aviso_salida(job) -> str | None:
+    # Respuesta vacía o cortada por el tope de tokens: se avisa en lugar de entregar nada en silencio
+    return aviso_respuesta(job.meta.get("stats", {}), job.text)
+
+
+def aviso_respuesta(stats: dict, texto: str) -> str | None:
+    # Lo mismo a partir de las estadísticas del stream (también por área en claridad.sweep)
+    if stats.get("finish_reason") == "MAX_TOKENS":
+        return "La respuesta de Gemini llegó cortada por el tope de tokens (MAX_TOKENS); regenera o sube el tope."
+    if not texto.strip():
+        return "Gemini devolvió una respuesta vacía; vuelve a intentarlo."
+    return None
+
+
+def cancel_job(state_key: str):
+    get_job_runner().cancel(st.session_state[state_key])
+
+
 # -------------------------
-# DATA: VAK 24 (escena + V/A/C)
+# HIPÓTESIS ANTICIPADA
 # -------------------------
-VAK_ITEMS = [
-    {
-        "titulo": "Instrucciones",
-        "escena": "Debes ensamblar un objeto o aprender un proceso técnico nuevo (sin ayuda). ¿Qué te facilita más hacerlo bien?",
-        "V": "Ver un diagrama/video paso a paso y una lista visual de piezas.",
-        "A": "Escuchar una explicación clara o que alguien me lo explique en voz alta.",
-        "C": "Probar con las manos, ajustar sobre la marcha y aprender haciendo.",
-    },
-    {
-        "titulo": "Orientación",
-        "escena": "Estás en una zona desconocida y necesitas llegar a una dirección sin perder tiempo.",
-        "V": "Un mapa/referencias visuales (edificios, colores, formas) para ubicarme.",
-        "A": "Indicaciones verbales (izquierda/derecha) o preguntar y repetir la ruta.",
-        "C": "Caminar un tramo, sentir si voy bien y corregir por intuición de recorrido.",
-    },
-    {
-        "titulo": "Distracción",
-        "escena": "Estás trabajando concentrado y algo te interrumpe. ¿Qué te saca más de foco?",
-        "V": "Movimiento, pantallas, notificaciones, desorden visual.",
-        "A": "Ruidos, conversaciones cerca, sonidos repetitivos.",
-        "C": "Incomodidad física, hambre, tensión corporal, ganas de moverme.",
-    },
-    {
-        "titulo": "Memoria de Viajes",
-        "escena": "Piensas en unas vacaciones pasadas. ¿Qué se te viene primero a la mente?",
-        "V": "Imágenes del lugar, paisajes, fotos mentales de escenas.",
-        "A": "Música/sonidos del sitio o conversaciones que recuerdo.",
-        "C": "Sensaciones: clima, olor, energía del lugar, cómo me sentía.",
-    },
-    {
-        "titulo": "Comunicación",
-        "escena": "Necesitas contactar a alguien y recibir info importante. ¿Qué prefieres?",
-        "V": "Mensaje escrito con puntos claros o un resumen visual.",
-        "A": "Llamada/nota de voz para captar matices rápido.",
-        "C": "Hablar en persona o una interacción que ‘se sienta’ directa.",
-    },
-    {
-        "titulo": "Resolución de Problemas",
-        "escena": "Un aparato no funciona. ¿Qué haces primero?",
-        "V": "Busco manual/video/foros; reviso pasos y señales visibles.",
-        "A": "Pregunto a alguien o escucho una explicación de qué revisar.",
-        "C": "Toco, pruebo, reinicio, hago tests físicos y ajusto.",
-    },
-    {
-        "titulo": "Conferencia / Clase",
-        "escena": "Sales de una clase y mañana te evaluarán. ¿Cómo retienes mejor lo escuchado?",
-        "V": "Recuerdo diapositivas, títulos, gráficos y estructura.",
-        "A": "Recuerdo frases, ejemplos y el tono del docente.",
-        "C": "Recuerdo lo que me hizo sentir y lo que ‘me quedó en el cuerpo’.",
-    },
-    {
-        "titulo": "Nuevas Adquisiciones",
-        "escena": "Vas a comprar un gadget (móvil, reloj, auriculares). ¿Qué te decide más?",
-        "V": "Comparativas, specs, reviews con imágenes y tablas.",
-        "A": "Recomendación de alguien o reseñas que expliquen bien el uso.",
-        "C": "Probarlo en mano: peso, tacto, comodidad, sensación real.",
-    },
-    {
-        "titulo": "Tiempo Libre",
-        "escena": "Tienes una tarde libre. ¿Qué actividad te recarga más?",
-        "V": "Ver algo (serie, fotos, museo) o crear algo visual.",
-        "A": "Música, podcast, conversar, escuchar algo que me active.",
-        "C": "Moverme: caminar, deporte, cocinar, actividades físicas.",
-    },
-    {
-        "titulo": "Memoria de Personas",
-        "escena": "Conoces a alguien nuevo. ¿Qué recuerdas primero de esa persona?",
-        "V": "Cara, gestos, ropa, mirada, detalles visuales.",
-        "A": "Nombre, voz, forma de hablar, frases que dijo.",
-        "C": "Energía, vibra, apretón de manos, cómo me hizo sentir.",
-    },
-    {
-        "titulo": "Predicados Verbales",
-        "escena": "Sin pensarlo, ¿qué tipo de frases te salen más al hablar?",
-        "V": "“Veo claro”, “me enfoca”, “se nota”, “imagina esto”.",
-        "A": "“Suena bien”, “dime”, “escucha”, “eso no me cuadra”.",
-        "C": "“Siento que”, “me pesa”, “me mueve”, “no me encaja”.",
-    },
-    {
-        "titulo": "Concentración",
-        "escena": "¿Qué ambiente te ayuda más a rendir intelectualmente?",
-        "V": "Orden, buena luz, escritorio limpio, cero estímulos visuales.",
-        "A": "Silencio o sonido controlado (música específica).",
-        "C": "Comodidad física: postura, temperatura, pausas de movimiento.",
-    },
-    {
-        "titulo": "Manejo de Estrés",
-        "escena": "Surge una crisis/urgencia. ¿Qué te calma y te activa mejor?",
-        "V": "Ver el plan por escrito y ordenar prioridades en una lista.",
-        "A": "Hablarlo para aclarar y escuchar un plan directo.",
-        "C": "Respirar, moverme y ejecutar una primera acción inmediata.",
-    },
-    {
-        "titulo": "Aprendizaje de Software",
-        "escena": "Abres una app nueva. ¿Cómo aprendes más rápido?",
-        "V": "Exploro menús y miro tutoriales/guías visuales.",
-        "A": "Sigo instrucciones narradas o alguien me explica.",
-        "C": "Toco botones, ensayo-error y aprendo por uso.",
-    },
-    {
-        "titulo": "Habilidades Sociales",
-        "escena": "¿Qué genera confianza o ‘clic’ con un desconocido?",
-        "V": "Su mirada/gestos coherentes y cómo se presenta visualmente.",
-        "A": "Su tono, forma de hablar y claridad al comunicarse.",
-        "C": "La energía que transmite y cómo me hace sentir en el momento.",
-    },
-    {
-        "titulo": "Recepción de Feedback",
-        "escena": "Te van a evaluar desempeño. ¿Cómo prefieres recibir feedback?",
-        "V": "Documento con puntos, ejemplos y plan de mejora.",
-        "A": "Conversación directa (llamada) con explicaciones claras.",
-        "C": "Práctico: demo, acompañamiento, hacerlo juntos y corregir.",
-    },
-    {
-        "titulo": "Descanso Mental",
-        "escena": "Tras un día agotador, ¿qué te desconecta mejor?",
-        "V": "Contenido visual ligero o algo creativo visual.",
-        "A": "Música/podcast/charla que me relaje.",
-        "C": "Ducha, caminata, estiramientos, descanso físico real.",
-    },
-    {
-        "titulo": "Memoria de Corto Plazo",
-        "escena": "Te dictan un número (teléfono/código) una vez. ¿Qué haces para retenerlo?",
-        "V": "Lo visualizo escrito o lo ‘veo’ en mi mente.",
-        "A": "Lo repito en voz baja varias veces.",
-        "C": "Lo marco con dedos/ritmo o lo asocio a una acción/sensación.",
-    },
-    {
-        "titulo": "Decisión de Compra (Ropa)",
-        "escena": "Estás en el probador. ¿Qué define si compras la prenda?",
-        "V": "Cómo se ve: corte, color, estilo, espejo.",
-        "A": "Opinión de alguien o explicación de calidad/marca.",
-        "C": "Cómo se siente: tela, comodidad, libertad de movimiento.",
-    },
-    {
-        "titulo": "Proyectos en Grupo",
-        "escena": "En un trabajo en equipo, ¿qué rol asumes naturalmente?",
-        "V": "Organizo estructura, tableros, planificación visual.",
-        "A": "Coordino comunicación, alineo conversaciones, sintetizo acuerdos.",
-        "C": "Ejecuto tareas, destrabo acciones, pongo el cuerpo al trabajo.",
-    },
-    {
-        "titulo": "Lectura de Placer",
-        "escena": "Cuando lees por placer, ¿qué disfrutas más?",
-        "V": "Descripciones, escenas, ideas que puedo visualizar.",
-        "A": "El ritmo del texto, diálogos, ‘voz’ del autor.",
-        "C": "La emoción/impacto que me deja, cómo me transforma.",
-    },
-    {
-        "titulo": "Seguridad / Confort",
-        "escena": "Llegas a un lugar nuevo. ¿Qué te da sensación de bienestar?",
-        "V": "Ver la disposición del espacio, salidas, orden y claridad.",
-        "A": "Escuchar el ambiente: volumen, tono, si hay ruido agradable.",
-        "C": "Sentir el lugar: temperatura, comodidad, energía.",
-    },
-    {
-        "titulo": "Transmisión de Conocimiento",
-        "escena": "Tienes que explicar algo complejo a otra persona. ¿Cómo lo haces mejor?",
-        "V": "Con un esquema/dibujo y pasos en pizarra/pantalla.",
-        "A": "Hablándolo con ejemplos y repitiendo lo clave.",
-        "C": "Haciéndolo juntos: práctica guiada paso a paso.",
-    },
-    {
-        "titulo": "Búsqueda de Objetos",
-        "escena": "Perdiste algo (llaves, móvil). ¿Qué haces primero?",
-        "V": "Escaneo visual por zonas y recuerdo dónde lo vi por última vez.",
-        "A": "Repaso en voz alta la secuencia: ‘llegué, dejé, volví…’.",
-        "C": "Rehago movimientos: camino la ruta y ‘siento’ dónde estuvo.",
-    },
-]
+def rueda_clave() -> tuple:
+    # (área, valores, coach) de la rueda que origina una hipótesis, para RuedaIndex al entregarla
+    rueda = st.session_state.datos_rueda
+    return rueda["area"], list(rueda["valores"]), st.session_state.nombre_coach
+
+
+def prefetch_hipotesis():
+    # Modo especulativo (opt-in): la hipótesis arranca en segundo plano al guardar rueda o ficha.
+    # Si ya hay un trabajo para el mismo prompt se respeta; si el prompt cambió, el anterior se descarta.
+    if not (st.session_state.get("prefetch_hipotesis") and has_api_key() and st.session_state.datos_rueda):
+        return
+    prompt_auto = build_prompt_auto(
+        st.session_state.nombre_cliente, st.session_state.objetivo_sesion, st.session_state.datos_rueda
+    )
+    config = config_for("hipotesis")
+    huella = huella_hipotesis(prompt_auto, config)
+    runner = get_job_runner()
+    job = runner.get(st.session_state.job_hipotesis)
+    if job is not None and not job.done and job.meta.get("huella") == huella:
+        return
+    runner.cancel(st.session_state.job_hipotesis)
+    st.session_state.job_hipotesis = None
+    stats = {}
+    chunks = stream_text(prompt_auto, span="gemini.hipotesis", config=config, stats=stats)
+    try:
+        st.session_state.job_hipotesis = runner.submit(
+            "hipotesis",
+            chunks,
+            meta={"huella": huella, "especulativa": True, "rueda": rueda_clave(), "json": "response_schema" in config,
+                  "stats": stats},
+        )
+    except QueueFull:  # especulativo: con la cola llena simplemente no se anticipa
+        pass
+
 
 # -------------------------
 # PDF EXPORT
 # -------------------------
-def build_pdf_bytes() -> bytes:
-    styles = getSampleStyleSheet()
-    buf = io.BytesIO()
-    doc = SimpleDocTemplate(buf, pagesize=A4, title="Registro de Sesión BeCoach")
-    story = []
-
-    def P(text: str) -> Paragraph:
-        return Paragraph(text, styles["BodyText"])
-
-    # Portada simple
-    story.append(Paragraph("BeCocach — Registro de Sesión", styles["Title"]))
-    story.append(Spacer(1, 10))
-
-    story.append(P(f"<b>Coach:</b> {st.session_state.nombre_coach or '—'}"))
-    story.append(P(f"<b>Cliente:</b> {st.session_state.nombre_cliente or '—'}"))
-    story.append(P(f"<b>Objetivo:</b> {st.session_state.objetivo_sesion or '—'}"))
-    story.append(P(f"<b>Nivel:</b> {st.session_state.nivel_cliente or '—'}"))
-    story.append(P(f"<b>Fecha:</b> {datetime.now().strftime('%d/%m/%Y %H:%M')}"))
-    story.append(Spacer(1, 12))
-
-    # Rueda
-    story.append(Paragraph("Rueda", styles["Heading2"]))
-    rueda = st.session_state.datos_rueda
-    if rueda:
-        story.append(P(f"<b>Área:</b> {rueda['area']}"))
-        data = [["Vector", "Puntuación"]] + [[v, str(val)] for v, val in zip(rueda["vectores"], rueda["valores"])]
-        t = Table(data, colWidths=[330, 130])
-        t.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("ALIGN", (1, 1), (1, -1), "CENTER"),
-                ]
-            )
-        )
-        story.append(t)
-    else:
-        story.append(P("No se generó rueda."))
-    story.append(Spacer(1, 12))
-
-    # Hipótesis IA
-    story.append(Paragraph("Hipótesis conductual (IA)", styles["Heading2"]))
-    hypo = st.session_state.diagnostico_generado or "No disponible."
-    story.append(P(hypo.replace("\n", "<br/>")))
-    story.append(Spacer(1, 12))
-
-    # VAK
-    story.append(Paragraph("Perfil VAK", styles["Heading2"]))
-    vak = st.session_state.puntos_vak
-    if vak:
-        data = [["Canal", "Puntos"]] + [[k, str(vak.get(k, 0))] for k in ["V", "A", "C"]]
-        t = Table(data, colWidths=[130, 130])
-        t.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("ALIGN", (1, 1), (1, -1), "CENTER"),
-                ]
-            )
-        )
-        story.append(t)
-    else:
-        story.append(P("No disponible."))
-    story.append(Spacer(1, 12))
-
-    # Chat Copiloto
-    story.append(Paragraph("Copiloto — Registro de sesión", styles["Heading2"]))
-    if st.session_state.chat_hist:
-        for m in st.session_state.chat_hist:
-            role = "COACH/CLIENTE" if m["role"] == "user" else "IA"
-            story.append(P(f"<b>{role}:</b> {m['content'].replace('\n', '<br/>')}"))
-            story.append(Spacer(1, 6))
-    else:
-        story.append(P("Sin conversación registrada."))
+def session_record() -> dict:
+    return {k: st.session_state[k] for k in SESSION_FIELDS}
+
 
-    doc.build(story)
-    pdf = buf.getvalue()
-    buf.close()
+def flush_session_store():
+    # Historial persistente: lo que cambió desde el último volcado, en una sola escritura
+    with get_tracer().span("store.flush") as attrs:
+        attrs["events"] = st.session_state._recorder.flush(get_session_store(), session_record())
+
+
+def build_pdf_bytes() -> bytes:
+    # Memo por huella de contenido: sin cambios en ficha/rueda/hipótesis/VAK/chat no se vuelve a renderizar.
+    # La fecha no entra en la huella: el PDF lleva la de cuando se construyó.
+    record = session_record()
+    huella = fingerprint(record)
+    memo = st.session_state.get("_pdf_memo")
+    if memo and memo[0] == huella:
+        return memo[1]
+    with get_tracer().span("pdf", chat_turns=len(record["chat_hist"])) as attrs:
+        pdf = build_pdf(record, datetime.now().strftime('%d/%m/%Y %H:%M'))
+        attrs["bytes"] = len(pdf)
+    st.session_state._pdf_memo = (huella, pdf)
     return pdf
 
 
@@ -373,6 +342,27 @@ with st.sidebar:
     st.divider()
     st.button("🧹 Nuevo cliente / Limpiar", use_container_width=True, on_click=reset_app)
 
+    st.toggle(
+        "⚡ Anticipar hipótesis al guardar la rueda",
+        key="prefetch_hipotesis",
+        help="Genera la hipótesis en segundo plano en cuanto se guarda la rueda (consume cuota aunque no abras el Tab 3).",
+        disabled=not has_api_key(),
+    )
+    st.toggle(
+        "🧩 Respuestas estructuradas (JSON)",
+        key="modo_json",
+        help="Hipótesis y Copiloto con esquema de seis campos: se validan y se pintan por secciones.",
+    )
+    st.number_input(
+        "⏳ Plazo de la IA (s)",
+        min_value=0,
+        max_value=300,
+        value=int(generation.deadline_s()),
+        step=5,
+        key="plazo_ia",
+        help="Si Gemini no termina en este tiempo se muestra un análisis local; la respuesta real lo sustituye al llegar. 0 = sin plazo.",
+    )
+
     st.divider()
     st.markdown("**Estado**")
     st.write(f"- Rueda: {'✅' if st.session_state.datos_rueda else '—'}")
@@ -383,6 +373,37 @@ with st.sidebar:
     st.divider()
     if not has_api_key():
         st.warning("Falta `GEMINI_API_KEY` en Secrets (IA desactivada).")
+    else:
+        cache_stats = get_response_cache().stats()
+        st.caption(f"Caché IA: {cache_stats['hits']} aciertos · {cache_stats['misses']} fallos · {cache_stats['entries']} entradas")
+        cola = get_throttle().stats()
+        st.caption(
+            f"Gemini: {cola['waiting']} en cola (máx. {cola['max_waiting']}) · {cola['in_flight']} en vuelo · "
+            f"{cola['retries']} reintentos · {cola['coalesced']} compartidas · "
+            f"trabajos {get_job_runner().queued()} en espera / {get_job_runner().running()} activos"
+        )
+
+    with st.expander("⏱️ Rendimiento (último rerun)"):
+        if st.session_state.rerun_ms:
+            for nombre, ms in st.session_state.rerun_ms.items():
+                st.caption(f"{nombre}: {ms:.0f} ms")
+        else:
+            st.caption("Sin mediciones todavía.")
+
+        if st.toggle("🐞 Depuración: p50/p95 recientes", key="debug_trazas"):
+            # Ventana móvil de todo el proceso (todas las sesiones); detalle por span en .cache/traces.jsonl
+            resumen = get_tracer().summary()
+            if resumen:
+                filas = "\n".join(
+                    f"| {nombre} | {r['n']} | {r['p50_ms']:.0f} | {r['p95_ms']:.0f} | "
+                    f"{r.get('p50_out_tokens', '—')} | {r.get('p95_out_tokens', '—')} |"
+                    for nombre, r in resumen.items()
+                )
+                st.markdown(
+                    "| span | n | p50 ms | p95 ms | p50 tok | p95 tok |\n|---|---:|---:|---:|---:|---:|\n" + filas
+                )
+            else:
+                st.caption("Sin spans todavía.")
 
 
 # -------------------------
@@ -422,12 +443,15 @@ st.write("")
 # -------------------------
 # TABS (Flujo)
 # -------------------------
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["1) Ficha", "2) Rueda", "3) Hipótesis IA", "4) VAK 24", "5) Copiloto + PDF"])
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(
+    ["1) Ficha", "2) Rueda", "3) Hipótesis IA", "4) VAK 24", "5) Copiloto + PDF", "6) Taller"]
+)
 
 # -------------------------
 # TAB 1: FICHA
 # -------------------------
-with tab1:
+@timed_fragment("ficha")
+def tab_ficha():
     st.subheader("1) Ficha de sesión")
     with st.form("ficha_form", clear_on_submit=False):
         c1, c2, c3, c4 = st.columns([1.3, 1.3, 1.4, 1])
@@ -447,14 +471,51 @@ with tab1:
             st.session_state.objetivo_sesion = objetivo.strip()
             st.session_state.nivel_cliente = nivel
             st.toast("Ficha guardada ✅", icon="🗂️")
+            prefetch_hipotesis()
+            st.rerun()  # la cabecera y las demás pestañas dependen de la ficha
+
+    if st.session_state.nombre_cliente:
+        client_history(st.session_state.nombre_cliente)
 
     st.markdown("<hr>", unsafe_allow_html=True)
     st.info("Consejo operativo: si el objetivo está vago, el Copiloto lo redefine en 1 línea y se acabó la charla circular.")
 
+
+def client_history(cliente: str):
+    # Sesiones anteriores del cliente (índice por cliente): consulta de milisegundos en cada render de la ficha
+    actual = st.session_state._recorder.session_id
+    previas = [s for s in get_session_store().client_history(cliente, limit=20) if s["session_id"] != actual]
+    if not previas:
+        return
+    with st.expander(f"📚 Historial de {cliente} ({len(previas)} sesiones anteriores)"):
+        for s in previas:
+            fecha = datetime.fromtimestamp(s["updated_at"]).strftime("%d/%m/%Y %H:%M")
+            rueda = s.get("datos_rueda") or {}
+            vak = s.get("puntos_vak")
+            st.markdown(
+                f"**{fecha}** · coach {s.get('nombre_coach') or '—'} · {rueda.get('area', 'sin rueda')} · "
+                f"VAK {CANALES[predominant(vak)] if vak else '—'} · {len(s['chat_hist'])} turnos"
+            )
+            if s.get("objetivo_sesion"):
+                st.caption(f"Objetivo: {s['objetivo_sesion']}")
+        if st.button("↩️ Retomar la última sesión", key="retomar_sesion"):
+            # Punto de partida: ficha, rueda, VAK e hipótesis de la última sesión (el chat empieza de cero)
+            ultima = previas[0]
+            for campo in ("objetivo_sesion", "nivel_cliente", "datos_rueda", "puntos_vak", "diagnostico_generado"):
+                if ultima.get(campo):
+                    st.session_state[campo] = ultima[campo]
+            st.toast("Sesión anterior cargada ✅", icon="📚")
+            st.rerun()
+
+
+with tab1:
+    tab_ficha()
+
 # -------------------------
 # TAB 2: RUEDA
 # -------------------------
-with tab2:
+@timed_fragment("rueda")
+def tab_rueda():
     st.subheader("2) Rueda (input rápido + gráfico)")
 
     colA, colB = st.columns([1.2, 1])
@@ -474,7 +535,10 @@ with tab2:
 
         if gen:
             st.session_state.datos_rueda = {"area": area_sel, "vectores": vectores, "valores": valores}
+            st.session_state.ruedas_areas = {**st.session_state.ruedas_areas, area_sel: st.session_state.datos_rueda}
             st.toast("Rueda guardada ✅", icon="🎡")
+            prefetch_hipotesis()
+            st.rerun()  # Tab 3 y Tab 5 se activan con la rueda
 
     with colB:
         if st.session_state.datos_rueda:
@@ -482,31 +546,109 @@ with tab2:
             vectores = rueda["vectores"]
             valores = rueda["valores"]
 
-            N = len(vectores)
-            angulos = [n / float(N) * 2 * np.pi for n in range(N)]
-            fig, ax = plt.subplots(figsize=(6.4, 6.4), subplot_kw=dict(polar=True))
-            ax.set_theta_offset(np.pi / 2)
-            ax.set_theta_direction(-1)
-            plt.xticks(angulos, vectores, size=9, weight="bold")
-            ax.plot(angulos + [angulos[0]], valores + [valores[0]], linewidth=2)
-            ax.fill(angulos + [angulos[0]], valores + [valores[0]], alpha=0.18)
-            st.pyplot(fig, use_container_width=True)
+            with get_tracer().span("radar", vectores=len(vectores)) as attrs:
+                png = render_radar(rueda["area"], vectores, valores, theme="becoach")
+                attrs["bytes"] = len(png)
+            st.image(png)
         else:
             st.markdown("<div class='h-card'>Aún no hay rueda guardada.</div>", unsafe_allow_html=True)
 
     st.markdown("<hr>", unsafe_allow_html=True)
     if st.session_state.datos_rueda:
+        import pandas as pd
+
         df = pd.DataFrame(
             {"Vector": st.session_state.datos_rueda["vectores"], "Puntuación": st.session_state.datos_rueda["valores"]}
         ).sort_values("Puntuación")
         st.dataframe(df, use_container_width=True, hide_index=True)
+        if st.session_state.nombre_cliente:
+            rueda_evolucion(st.session_state.datos_rueda)
+        if st.session_state.nombre_coach:
+            cartera_coach(st.session_state.datos_rueda)
     else:
         st.info("Guarda la rueda para ver el resumen.")
 
+
+def rueda_evolucion(rueda: dict):
+    # Todas las ruedas del cliente en esta área (la actual la última): pasado vs. actual
+    import numpy as np
+    import pandas as pd
+
+    from claridad.longitudinal import RuedaHistory, analyze, rank_vectors
+
+    cliente = st.session_state.nombre_cliente
+    actual = (st.session_state._recorder.session_id, time.time(), person_key(cliente), rueda)
+    historia = RuedaHistory.from_rows(rueda_rows(cliente=cliente) + [actual], rueda["area"], rueda["vectores"])
+    stats = analyze(historia)
+    if not len(historia) or stats["n"][0] < 2:
+        return
+
+    st.markdown(f"#### 📈 Evolución de {cliente} ({stats['n'][0]} sesiones en esta área)")
+    c1, c2 = st.columns([1, 1.2])
+    with c1:
+        st.image(render_radar(
+            rueda["area"], rueda["vectores"], rueda["valores"], theme="becoach",
+            overlay=[("Primera sesión", stats["primera"][0]), ("Media histórica", stats["media"][0])],
+        ))
+    with c2:
+        st.dataframe(
+            pd.DataFrame({
+                "Vector": rueda["vectores"],
+                "Primera": stats["primera"][0],
+                "Actual": stats["ultima"][0],
+                "Δ": stats["delta"][0],
+                "Tendencia / mes": np.round(stats["tendencia"][0], 2),
+                "Volatilidad": np.round(stats["volatilidad"][0], 2),
+            }),
+            use_container_width=True,
+            hide_index=True,
+        )
+        ranking = rank_vectors(stats, 0)
+        st.caption("Más mejorados: " + ", ".join(rueda["vectores"][i] for i in ranking["mejorados"]))
+        st.caption("Más estancados: " + ", ".join(rueda["vectores"][i] for i in ranking["estancados"]))
+
+
+def cartera_coach(rueda: dict):
+    # Todos los clientes del coach en esta área, en una sola pasada (bajo demanda: puede ser mucha historia)
+    coach = st.session_state.nombre_coach
+    if not st.toggle(f"👥 Cartera de {coach} en {rueda['area']}", key="ver_cartera"):
+        return
+    import numpy as np
+    import pandas as pd
+
+    from claridad.longitudinal import RuedaHistory, analyze, rank_clients
+
+    stats = analyze(RuedaHistory.from_rows(rueda_rows(coach=coach), rueda["area"], rueda["vectores"]))
+    if not (stats["n"] >= 2).any():
+        st.caption("Aún no hay clientes con dos o más ruedas en esta área.")
+        return
+    ranking = rank_clients(stats)
+
+    def tabla(indices):
+        return pd.DataFrame({
+            "Cliente": stats["clientes"][indices],
+            "Sesiones": stats["n"][indices],
+            "Δ medio": np.round(stats["delta"][indices].mean(axis=1), 2),
+            "Media actual": np.round(stats["ultima"][indices].mean(axis=1), 1),
+        })
+
+    c1, c2 = st.columns(2)
+    with c1:
+        st.markdown("**Más mejorados**")
+        st.dataframe(tabla(ranking["mejorados"]), use_container_width=True, hide_index=True)
+    with c2:
+        st.markdown("**Más estancados**")
+        st.dataframe(tabla(ranking["estancados"]), use_container_width=True, hide_index=True)
+
+
+with tab2:
+    tab_rueda()
+
 # -------------------------
 # TAB 3: HIPÓTESIS IA
 # -------------------------
-with tab3:
+@timed_fragment("hipotesis")
+def tab_hipotesis():
     st.subheader("3) Hipótesis conductual (IA) — salida para dirigir la sesión")
     st.caption("Esto no es ‘análisis bonito’. Es: patrón → cuello de botella → autoengaño → prueba 7 días.")
 
@@ -515,58 +657,236 @@ with tab3:
     else:
         c1, c2 = st.columns([1, 1])
         with c1:
-            if st.button("🤖 Generar / Regenerar hipótesis", use_container_width=True, type="primary", disabled=not has_api_key()):
-                with st.spinner("Analizando patrón..."):
-                    model = get_model()
-                    rueda = st.session_state.datos_rueda
-                    puntuaciones = list(zip(rueda["vectores"], rueda["valores"]))
-
-                    prompt_auto = f"""
-Eres Director de Diagnóstico conductual. No motivas. No das teoría.
-
-Cliente: {st.session_state.nombre_cliente or "No indicado"}
-Objetivo declarado (si existe): {st.session_state.objetivo_sesion or "No indicado"}
-Área: {rueda["area"]}
-Vectores y puntuaciones: {puntuaciones}
-
-REGLAS DURAS
-- No repitas puntuaciones.
-- Máx 170 palabras.
-- Bullets, sin introducción.
-- Cada bullet = afirmación + conducta observable + coste.
-- OBLIGATORIO: 1 contradicción (lo que dice querer vs lo que sus hábitos muestran) y 1 trade-off (qué prioriza en silencio).
-
-ENTREGA (en este orden)
-- Patrón dominante (1 línea)
-- Cuello de botella (NO el más bajo) + por qué arrastra otros
-- Mecanismo de autoengaño (conducta semanal observable)
-- Prueba 7 días (≤20 min/día, métrica binaria)
-- Coste oculto (dinero/energía/relación/tiempo)
-- Pregunta de quiebre (corta y verificable)
-"""
-                    resp = model.generate_content(prompt_auto)
-                    st.session_state.diagnostico_generado = resp.text.strip()
-                    st.toast("Hipótesis generada ✅", icon="🧠")
-
+            generar = st.button("🤖 Generar / Regenerar hipótesis", use_container_width=True, type="primary")
+            forzar = st.checkbox("Forzar regeneración (ignorar caché)", key="forzar_hipotesis")
         with c2:
-            if st.session_state.diagnostico_generado:
+            estado = st.empty()
+
+        st.markdown("<hr>", unsafe_allow_html=True)
+
+        if generar and not has_api_key():
+            # Sin clave: análisis local inmediato en lugar de un botón muerto
+            st.session_state.diagnostico_generado = local_analysis(
+                st.session_state.datos_rueda, motivo="sin `GEMINI_API_KEY`"
+            )
+            st.session_state.hipotesis_local = True
+            st.session_state.hipotesis_borrador = False
+            st.rerun()
+        elif generar:
+            get_job_runner().cancel(st.session_state.job_hipotesis)
+            st.session_state.job_hipotesis = None
+            prompt_auto = build_prompt_auto(
+                st.session_state.nombre_cliente, st.session_state.objetivo_sesion, st.session_state.datos_rueda
+            )
+            config = config_for("hipotesis")
+            stats = {}
+            chunks = stream_text(prompt_auto, force=forzar, span="gemini.hipotesis", config=config, stats=stats)
+            try:
+                st.session_state.job_hipotesis = get_job_runner().submit(
+                    "hipotesis",
+                    chunks,
+                    meta={"rueda": rueda_clave(), "json": "response_schema" in config, "stats": stats},
+                )
+            except QueueFull as exc:
+                st.warning(str(exc))
+
+        # Trabajo especulativo obsoleto (ficha o rueda cambiaron desde que arrancó): se descarta
+        job = get_job_runner().get(st.session_state.job_hipotesis)
+        if job is not None and job.meta.get("especulativa"):
+            prompt_actual = build_prompt_auto(
+                st.session_state.nombre_cliente, st.session_state.objetivo_sesion, st.session_state.datos_rueda
+            )
+            if job.meta["huella"] != huella_hipotesis(prompt_actual, config_for("hipotesis")):
+                get_job_runner().cancel(st.session_state.job_hipotesis)
+                st.session_state.job_hipotesis = None
+
+        with estado:
+            if st.session_state.job_hipotesis:
+                st.info("Generando en segundo plano: puedes seguir trabajando en otras pestañas.")
+            elif st.session_state.hipotesis_borrador:
+                st.info("Borrador de una rueda parecida: úsalo para arrancar y regenera para una hipótesis a medida.")
+            elif st.session_state.hipotesis_local:
+                st.warning("Análisis local (sin IA): orientativo, regenera cuando Gemini esté disponible.")
+            elif st.session_state.diagnostico_generado:
                 st.success("Lista para usar en sesión.")
             else:
                 st.info("Genera la hipótesis para tener guion base.")
 
-        st.markdown("<hr>", unsafe_allow_html=True)
-        st.markdown(st.session_state.diagnostico_generado or "—")
+        # Rueda casi igual a otra ya analizada: borrador instantáneo mientras no haya hipótesis propia
+        rueda = st.session_state.datos_rueda
+        if not st.session_state.job_hipotesis and (
+            not st.session_state.diagnostico_generado or st.session_state.hipotesis_local
+        ):
+            parecida = get_rueda_index().lookup(rueda["area"], rueda["valores"], coach=st.session_state.nombre_coach)
+            if parecida is not None:
+                texto, distancia = parecida
+                st.info(f"⚡ Hay una hipótesis de una rueda parecida (distancia {distancia:.1f}).")
+                if st.button("Usar como borrador", key="usar_borrador"):
+                    st.session_state.diagnostico_generado = (
+                        f"**⚡ Borrador de una rueda parecida** (distancia {distancia:.1f}) — "
+                        f"regenera para una hipótesis a medida.\n\n{texto}"
+                    )
+                    st.session_state.hipotesis_borrador = True
+                    st.session_state.hipotesis_local = False
+                    st.rerun()
+
+        @st.fragment(run_every=POLL_SECONDS if st.session_state.job_hipotesis else None)
+        def hipotesis_panel():
+            job = get_job_runner().get(st.session_state.job_hipotesis)
+            if job is None:
+                st.session_state.job_hipotesis = None
+                st.markdown(st.session_state.diagnostico_generado or "—")
+                return
+            if not job.done:
+                plazo = st.session_state.plazo_ia
+                if plazo and job.elapsed > plazo and not job.meta.get("local"):
+                    # Plazo vencido: análisis local ya utilizable (Copiloto, PDF); el trabajo sigue en segundo plano
+                    job.meta["local"] = True
+                    st.session_state.diagnostico_generado = local_analysis(
+                        st.session_state.datos_rueda,
+                        motivo=f"Gemini no respondió en {plazo} s; la respuesta real lo sustituirá al llegar",
+                    )
+                    st.session_state.hipotesis_local = True
+                    st.session_state.hipotesis_borrador = False
+                    st.rerun()
+                if job.meta.get("local"):
+                    st.markdown(st.session_state.diagnostico_generado)
+                    st.caption(f"Gemini sigue generando… {job.elapsed:.0f}s")
+                else:
+                    st.caption(f"Analizando patrón… {job.elapsed:.0f}s")
+                st.button("⏹️ Cancelar", key="cancel_hipotesis", on_click=cancel_job, args=("job_hipotesis",))
+                st.markdown(partial_text(job) + "▌")
+                return
+            # Entrega del resultado y una sola ejecución completa para refrescar cabecera y pestañas
+            st.session_state.job_hipotesis = None
+            aviso = aviso_salida(job) if job.status == LISTA else None
+            if aviso:
+                st.session_state.aviso_hipotesis = aviso
+            if job.status == ERROR:
+                st.session_state.error_hipotesis = f"No se pudo generar la hipótesis: {job.error}"
+            elif job.status != CANCELADA and job.text.strip():
+                st.session_state.diagnostico_generado = final_text(job, "hipotesis")
+                st.session_state.hipotesis_local = False
+                st.session_state.hipotesis_borrador = False
+                if "rueda" in job.meta and not aviso:  # solo respuestas reales y completas alimentan el índice
+                    area, valores, coach = job.meta["rueda"]
+                    get_rueda_index().add(area, valores, st.session_state.diagnostico_generado, coach=coach)
+                st.toast("Hipótesis anticipada lista ✅" if job.meta.get("especulativa") else "Hipótesis generada ✅", icon="🧠")
+            st.rerun()
+
+        if st.session_state.get("error_hipotesis"):
+            st.error(st.session_state.pop("error_hipotesis"))
+        if st.session_state.get("aviso_hipotesis"):
+            st.warning(st.session_state.pop("aviso_hipotesis"))
+        hipotesis_panel()
+        todas_las_areas()
+
+
+ICONO_ESTADO = {PENDIENTE: "⏳", EN_CURSO: "✍️", LISTA: "✅", ERROR: "⚠️", CANCELADA: "⏹️"}
+
+
+def todas_las_areas():
+    # Hipótesis de todas las áreas guardadas a la vez (asyncio, claridad.sweep) y síntesis entre áreas
+    st.markdown("<hr>", unsafe_allow_html=True)
+    st.markdown("#### 🗺️ Todas las áreas")
+    ruedas = st.session_state.ruedas_areas
+    st.caption(
+        f"Guarda en el Tab 2 la rueda de cada área a incluir ({len(ruedas)} de {len(ruedas_data)} guardadas). "
+        "Se analizan a la vez, cada una aparece al terminar y al final se cruzan en una síntesis."
+    )
+    sweep = st.session_state.sweep_areas
+    c1, c2 = st.columns([1, 1])
+    with c1:
+        limite = st.number_input(
+            "Áreas en paralelo", min_value=1, max_value=len(ruedas_data), value=min(concurrency(), len(ruedas_data)),
+            key="limite_areas",
+        )
+    with c2:
+        lanzar = st.button(
+            "🗺️ Analizar todas las áreas", use_container_width=True,
+            disabled=len(ruedas) < 2 or not has_api_key() or (sweep is not None and not sweep.done),
+        )
+    if lanzar:
+        cliente, objetivo = st.session_state.nombre_cliente, st.session_state.objetivo_sesion
+        forzar = st.session_state.get("forzar_hipotesis", False)
+        # Mismo prompt y configuración que el Tab 3 por área (sin JSON): comparten caché en ambos sentidos
+        hipotesis = stream_opener(forzar, generation.generation_config("hipotesis"))
+        sintesis = stream_opener(forzar, generation.generation_config("sintesis"))
+        st.session_state.sweep_areas = AreaSweep(
+            {area: build_prompt_auto(cliente, objetivo, rueda) for area, rueda in ruedas.items()},
+            lambda prompt, area, stats: (
+                hipotesis(prompt, "gemini.hipotesis", stats) if area else sintesis(prompt, "gemini.sintesis", stats)
+            ),
+            lambda resultados: build_prompt_sintesis(cliente, objetivo, resultados),
+            limit=limite,
+            meta={"ruedas": {area: list(rueda["valores"]) for area, rueda in ruedas.items()},
+                  "coach": st.session_state.nombre_coach},
+        ).start()
+
+    @st.fragment(run_every=POLL_SECONDS if st.session_state.sweep_areas and not st.session_state.sweep_areas.done else None)
+    def areas_panel():
+        sweep = st.session_state.sweep_areas
+        if sweep is None:
+            return
+        if not sweep.done:
+            st.caption(f"{len(sweep.llegada)} de {len(sweep.prompts)} áreas listas · {sweep.elapsed:.0f}s")
+            st.button("⏹️ Cancelar", key="cancel_areas", on_click=sweep.cancel)
+        elif not sweep.meta.get("entregado"):
+            # Entrega: las hipótesis reales y completas alimentan el índice de ruedas parecidas (una cortada por
+            # MAX_TOKENS o vacía saldría luego como borrador) y se refresca todo una vez
+            sweep.meta["entregado"] = True
+            for area, texto in sweep.resultados().items():
+                if aviso_respuesta(sweep.stats[area], texto) is None:
+                    get_rueda_index().add(area, sweep.meta["ruedas"][area], texto, coach=sweep.meta["coach"])
+            get_tracer().record("sweep.areas", sweep.elapsed * 1000, areas=len(sweep.prompts),
+                                limit=sweep.limit, status=sweep.status)
+            st.rerun()
+        else:
+            st.caption(f"{len(sweep.llegada)} de {len(sweep.prompts)} áreas en {sweep.elapsed:.1f}s "
+                       f"(máx. {sweep.limit} a la vez)")
+
+        if sweep.sintesis or None in sweep.errores:
+            st.markdown("**Síntesis entre áreas**")
+            if None in sweep.errores:
+                st.error(f"No se pudo generar la síntesis: {sweep.errores[None]}")
+            else:
+                st.markdown(sweep.sintesis + ("" if sweep.done else "▌"))
+                if sweep.done and st.button("Usar la síntesis como hipótesis de la sesión", key="usar_sintesis"):
+                    st.session_state.diagnostico_generado = sweep.sintesis.strip()
+                    st.session_state.hipotesis_local = False
+                    st.session_state.hipotesis_borrador = False
+                    st.rerun()
+        # Las terminadas primero, en orden de llegada
+        for area in sweep.llegada + [a for a in sweep.prompts if a not in sweep.llegada]:
+            estado = sweep.estados[area]
+            # Cortada o vacía: marcada (y fuera del índice de ruedas parecidas)
+            aviso = aviso_respuesta(sweep.stats[area], sweep.textos[area]) if estado == LISTA else None
+            icono = ICONO_ESTADO[ERROR] if aviso else ICONO_ESTADO[estado]
+            with st.expander(f"{icono} {area}", expanded=estado == EN_CURSO):
+                if area in sweep.errores:
+                    st.error(f"No se pudo generar: {sweep.errores[area]}")
+                else:
+                    st.markdown(sweep.textos[area] + ("▌" if estado == EN_CURSO else "") or "…")
+                    if aviso:
+                        st.warning(aviso)
+
+    areas_panel()
+
+
+with tab3:
+    tab_hipotesis()
 
 # -------------------------
 # TAB 4: VAK 24
 # -------------------------
-with tab4:
+@timed_fragment("vak")
+def tab_vak():
     st.subheader("4) VAK 24 (guiado, sin ambigüedad)")
     st.caption("El cliente elige lo que más se le parece. Tú solo pides ejemplos si duda.")
 
-    total = {"V": 0, "A": 0, "C": 0}
+    choices = []
 
-    with st.form("vak_form", clear_on_submit=False):
+    with get_tracer().span("vak_form", items=len(VAK_ITEMS)), st.form("vak_form", clear_on_submit=False):
         for idx, item in enumerate(VAK_ITEMS):
             st.markdown("<div class='h-card'>", unsafe_allow_html=True)
             st.markdown(f"**{idx+1}. {item['titulo']}**")
@@ -575,7 +895,7 @@ with tab4:
             choice = st.radio(
                 "Elige la opción que más se parece a ti:",
                 options=["V", "A", "C"],
-                format_func=lambda x: {"V": "Visual", "A": "Auditivo", "C": "Cinestésico"}[x],
+                format_func=CANALES.get,
                 key=f"vak_{idx}",
                 horizontal=True,
             )
@@ -589,130 +909,312 @@ with tab4:
             )
             st.markdown("</div>", unsafe_allow_html=True)
 
-            total[choice] += 1
+            choices.append(choice)
 
         guardar = st.form_submit_button("Guardar perfil VAK", type="primary", use_container_width=True)
 
     if guardar:
-        st.session_state.puntos_vak = total
-        pred = max(total, key=total.get)
-        mapa = {"V": "Visual", "A": "Auditivo", "C": "Cinestésico"}
-        st.success(f"Perfil guardado ✅ Predominante: **{mapa[pred]}**")
-        st.bar_chart(pd.DataFrame(total.items(), columns=["Canal", "Puntos"]).set_index("Canal"))
+        st.session_state.puntos_vak = score_vak(choices)
+        st.rerun()  # cabecera, barra lateral y PDF reflejan el perfil
+
+    if st.session_state.puntos_vak:
+        vak = st.session_state.puntos_vak
+        st.success(f"Perfil guardado ✅ Predominante: **{CANALES[predominant(vak)]}**")
+
+        import pandas as pd
+
+        st.bar_chart(pd.DataFrame(vak.items(), columns=["Canal", "Puntos"]).set_index("Canal"))
+
+
+with tab4:
+    tab_vak()
 
 # -------------------------
 # TAB 5: COPILOTO + PDF
 # -------------------------
-with tab5:
+def entregar_copiloto(job, cortar: bool = False) -> str:
+    # Cierra una jugada del Copiloto: al historial y al SessionStore en el momento, sin esperar a una
+    # ejecución completa. cortar: el coach envió otro turno antes de que terminara.
+    st.session_state.job_copiloto = None
+    if cortar:
+        get_job_runner().cancel(job.id)
+    if job.status == ERROR:
+        texto = f"⚠️ No pude generar el siguiente paso: {job.error}"
+    elif job.status == LISTA:
+        texto = final_text(job, "copiloto")
+        st.session_state.aviso_copiloto = aviso_salida(job)
+    else:
+        texto = f"{job.text.strip()}\n\n_(cancelado)_" if job.text.strip() else ""
+    if texto:
+        st.session_state.chat_hist.append({"role": "assistant", "content": texto})
+    flush_session_store()
+    return texto
+
+
+@timed_fragment("copiloto")
+def tab_copiloto():
     st.subheader("5) Copiloto IA (guion en vivo) + Export PDF")
     st.caption("La IA te da: qué decir, qué preguntar, qué escuchar y qué tarea dejar. Tú llevas el control.")
 
     if not st.session_state.datos_rueda:
         st.warning("Guarda la rueda para activar el Copiloto (Tab 2).")
     else:
-        # Historial de chat
-        for msg in st.session_state.chat_hist:
-            with st.chat_message(msg["role"]):
-                st.markdown(msg["content"])
-
-        # Input chat
+        # Historial de chat (contenedor fijo: los turnos nuevos se pintan encima del input)
+        historial = st.container()
+        with historial:
+            for msg in st.session_state.chat_hist:
+                with st.chat_message(msg["role"]):
+                    st.markdown(msg["content"])
+
+        # Input chat siempre activo: un turno nuevo corta la jugada en curso y la entrega tal cual
         user_input = st.chat_input("Pega aquí lo que el cliente acaba de decir (1–3 frases)…")
 
         if user_input:
+            st.session_state.aviso_copiloto = None
+            job = get_job_runner().get(st.session_state.job_copiloto)
+            if job is not None and entregar_copiloto(job, cortar=True):
+                with historial:
+                    with st.chat_message("assistant"):
+                        st.markdown(st.session_state.chat_hist[-1]["content"])
+            st.session_state.job_copiloto = None
             st.session_state.chat_hist.append({"role": "user", "content": user_input})
+            with historial:
+                with st.chat_message("user"):
+                    st.markdown(user_input)
 
             if not has_api_key():
-                st.session_state.chat_hist.append(
-                    {"role": "assistant", "content": "⚠️ Falta `GEMINI_API_KEY` en Secrets. No puedo generar el siguiente paso."}
+                assistant_text = "⚠️ Falta `GEMINI_API_KEY` en Secrets. No puedo generar el siguiente paso."
+                with historial:
+                    with st.chat_message("assistant"):
+                        st.markdown(assistant_text)
+            else:
+                # Memoria acotada: turnos recientes literales + resumen incremental (presupuesto fijo de tokens)
+                memoria = st.session_state.setdefault("_copiloto_ctx", CopilotoContext())
+                prompt_copiloto = build_prompt_copiloto(
+                    st.session_state.nombre_coach,
+                    st.session_state.nombre_cliente,
+                    st.session_state.objetivo_sesion,
+                    st.session_state.datos_rueda,
+                    st.session_state.diagnostico_generado,
+                    st.session_state.puntos_vak,
+                    user_input,
+                    contexto=memoria.render(st.session_state.chat_hist[:-1]),
                 )
-                st.rerun()
-
-            with st.spinner("Generando la siguiente jugada..."):
-                model = get_model()
-                rueda = st.session_state.datos_rueda
-                puntuaciones = list(zip(rueda["vectores"], rueda["valores"]))
-                diagnostico = st.session_state.diagnostico_generado or "No disponible"
-
-                vak = st.session_state.puntos_vak or {"V": 0, "A": 0, "C": 0}
-                pred = max(vak, key=vak.get) if any(vak.values()) else "V"
-                mapa = {"V": "Visual", "A": "Auditivo", "C": "Cinestésico"}
-                predominancia = mapa.get(pred, "Visual")
-
-                prompt_copiloto = f"""
-Eres Copiloto de Sesión GROW+ (coach estratégico). Respondes como guion práctico para el coach.
-Tu objetivo: avanzar la sesión hoy, no hablar bonito.
-
-CONTEXTO
-Coach: {st.session_state.nombre_coach or "No indicado"}
-Cliente: {st.session_state.nombre_cliente or "No indicado"}
-Objetivo declarado: {st.session_state.objetivo_sesion or "No indicado"}
-Área rueda: {rueda["area"]}
-Puntuaciones: {puntuaciones}
-Hipótesis previa (si existe): {diagnostico}
-Canal predominante: {predominancia}
-Última frase del cliente: {user_input}
-
-REGLAS
-- Directo, operativo, sin discursos.
-- Máx 190 palabras.
-- Usa predicados del canal {predominancia}.
-- Si el objetivo está vago, REDEFINE en 1 línea primero.
-
-SALIDA (bullets, en este orden exacto)
-1) 🎯 DESAFÍO REDEFINIDO (1 línea)
-2) 🗣️ COACH DICE (literal, 1–2 frases)
-3) ❓ PREGUNTA SIGUIENTE (1 sola)
-4) 🔁 SI RESPONDE “EVITA/DEPENDE” → repregunta exacta (1 sola)
-5) ✅ TAREA 7 DÍAS (≤20 min, binaria, SMART) + fricción (qué eliminar)
-6) ⚠️ SEÑAL DE AUTOENGAÑO (1 línea)
-"""
-                resp = model.generate_content(prompt_copiloto)
-                assistant_text = resp.text.strip()
-
-            st.session_state.chat_hist.append({"role": "assistant", "content": assistant_text})
-            st.rerun()
-
+                config = config_for("copiloto")
+                stats = {}
+                chunks = stream_text(prompt_copiloto, span="gemini.copiloto", config=config, stats=stats)
+                try:
+                    st.session_state.job_copiloto = get_job_runner().submit(
+                        "copiloto", chunks, meta={"json": "response_schema" in config, "stats": stats}
+                    )
+                except QueueFull as exc:
+                    # El turno no se envió: fuera del historial para que el coach lo reenvíe tal cual
+                    st.session_state.chat_hist.pop()
+                    st.warning(f"{exc} Tu mensaje no se envió: vuelve a enviarlo.")
+                assistant_text = None
+
+            if assistant_text:
+                st.session_state.chat_hist.append({"role": "assistant", "content": assistant_text})
+
+        # Lo pintado arriba; el fragmento añade debajo lo que entregue él mismo
+        st.session_state._chat_pintados = len(st.session_state.chat_hist)
+
+        @st.fragment(run_every=POLL_SECONDS if st.session_state.job_copiloto else None)
+        def copiloto_en_curso():
+            # La jugada se entrega aquí mismo (historial, aviso y SessionStore): sin rerun completo por turno.
+            # run_every queda fijado hasta la siguiente ejecución de la pestaña; sin trabajo, solo repinta.
+            job = get_job_runner().get(st.session_state.job_copiloto)
+            if job is None:
+                st.session_state.job_copiloto = None
+            elif job.done:
+                entregar_copiloto(job)
+            for msg in st.session_state.chat_hist[st.session_state._chat_pintados:]:
+                with st.chat_message(msg["role"]):
+                    st.markdown(msg["content"])
+            if st.session_state.aviso_copiloto:
+                st.warning(st.session_state.aviso_copiloto)
+            if st.session_state.job_copiloto:
+                with st.chat_message("assistant"):
+                    st.markdown((partial_text(job) if job.text else "Generando la siguiente jugada…") + "▌")
+                st.button("⏹️ Cancelar", key="cancel_copiloto", on_click=cancel_job, args=("job_copiloto",))
+
+        with historial:
+            copiloto_en_curso()
+
+
+@timed_fragment("exportar")
+def export_panel():
+    # Fragmento propio: un turno del chat no reconstruye el PDF. Las jugadas entregadas por el fragmento del
+    # Copiloto entran al repintar este panel (🔄 o cualquier ejecución completa).
     st.markdown("<hr>", unsafe_allow_html=True)
 
     c1, c2 = st.columns([1, 1])
     with c1:
         st.subheader("Descarga PDF (registro completo)")
-        st.caption("Incluye ficha, rueda, hipótesis, VAK y chat del copiloto.")
-        pdf_bytes = build_pdf_bytes()
-        file_name = f"registro_{(st.session_state.nombre_cliente or 'cliente').replace(' ', '_')}.pdf"
-        st.download_button(
-            "⬇️ Descargar registro (PDF)",
-            data=pdf_bytes,
-            file_name=file_name,
-            mime="application/pdf",
-            use_container_width=True,
-            type="primary",
-        )
+        st.caption(f"Incluye ficha, rueda, hipótesis, VAK y chat del copiloto ({len(st.session_state.chat_hist)} mensajes).")
+        # Perezoso: ReportLab no se carga ni se renderiza nada hasta que el coach pide el PDF la primera vez.
+        # Después se mantiene al día con el memo por huella de build_pdf_bytes().
+        if "_pdf_memo" not in st.session_state:
+            st.button("📄 Preparar PDF", use_container_width=True, on_click=build_pdf_bytes)
+        else:
+            st.button("🔄 Actualizar con el chat actual", key="refrescar_export")
+            pdf_bytes = build_pdf_bytes()
+            file_name = export_filename(session_record(), "registro", "pdf")
+            st.download_button(
+                "⬇️ Descargar registro (PDF)",
+                data=pdf_bytes,
+                file_name=file_name,
+                mime="application/pdf",
+                use_container_width=True,
+                type="primary",
+            )
 
     with c2:
         st.subheader("Export rápido (TXT)")
-        export_text = f"""BeCoach — Registro de Sesión
-Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M')}
-
-Coach: {st.session_state.nombre_coach}
-Cliente: {st.session_state.nombre_cliente}
-Objetivo: {st.session_state.objetivo_sesion}
-Nivel: {st.session_state.nivel_cliente}
-
-RUEDA: {st.session_state.datos_rueda}
-
-HIPÓTESIS:
-{st.session_state.diagnostico_generado}
-
-VAK: {st.session_state.puntos_vak}
-
-CHAT:
-""" + "\n\n".join([f"{m['role'].upper()}: {m['content']}" for m in st.session_state.chat_hist])
+        export_text = build_txt(session_record(), datetime.now().strftime('%d/%m/%Y %H:%M'))
 
         st.download_button(
             "⬇️ Descargar resumen (TXT)",
             data=export_text.encode("utf-8"),
-            file_name=f"sesion_{(st.session_state.nombre_cliente or 'cliente').replace(' ', '_')}.txt",
+            file_name=export_filename(session_record(), "sesion", "txt"),
             mime="text/plain",
             use_container_width=True,
         )
+
+
+with tab5:
+    tab_copiloto()
+    export_panel()
+
+# -------------------------
+# TAB 6: TALLER (IMPORTACIÓN MASIVA)
+# -------------------------
+def taller_dir() -> str:
+    # Archivos del taller (con nombres de participantes) en un directorio propio de la sesión: se borra al
+    # recolectarse su estado cuando la sesión termina (TemporaryDirectory) o, como tarde, al salir el proceso
+    if "_taller_tmp" not in st.session_state:
+        st.session_state._taller_tmp = tempfile.TemporaryDirectory(prefix="claridad-taller-")
+    return st.session_state._taller_tmp.name
+
+
+def borrar_archivo(ruta: str | None):
+    if ruta:
+        with contextlib.suppress(FileNotFoundError):  # el directorio temporal pudo limpiarse entretanto
+            os.unlink(ruta)
+
+
+@timed_fragment("taller")
+def tab_taller():
+    st.subheader("6) Taller: ruedas y VAK de todo el grupo (CSV/XLSX)")
+    st.caption(
+        "Una fila por participante: participante, area, v1..v8 (en el orden de la rueda del área) y "
+        "vak1..vak24 (V/A/C). Se valida, se puntúa por bloques y se resume la cohorte."
+    )
+    st.download_button("⬇️ Plantilla CSV", data=bulk.template_csv(), file_name="plantilla_taller.csv", mime="text/csv")
+    archivo = st.file_uploader("Archivo del taller", type=["csv", "xlsx"], key="taller_archivo")
+
+    if archivo is not None and st.button("📥 Importar y puntuar", type="primary"):
+        barra = st.progress(0.0, text="Leyendo…")
+
+        def progreso(filas: int):
+            barra.progress(min(archivo.tell() / max(archivo.size, 1), 1.0), text=f"{filas:,} filas procesadas")
+
+        previo = st.session_state.get("taller")
+        if previo:
+            borrar_archivo(previo["salida"])
+            borrar_archivo(previo.get("zip"))
+        # Filas puntuadas a disco según se procesan: la memoria no crece con el tamaño del archivo
+        salida = tempfile.NamedTemporaryFile(
+            "w", suffix=".csv", newline="", encoding="utf-8", delete=False, dir=taller_dir()
+        )
+        try:
+            with get_tracer().span("taller.import", bytes=archivo.size) as attrs, salida:
+                resumen = bulk.import_file(archivo, archivo.name, out=salida, progress=progreso)
+                attrs["rows"] = resumen.filas
+        except RuntimeError as exc:  # .xlsx sin openpyxl
+            borrar_archivo(salida.name)
+            st.session_state.pop("taller", None)
+            st.error(str(exc))
+            return
+        barra.progress(1.0, text=f"{resumen.filas:,} filas procesadas")
+        st.session_state.taller = {"resumen": resumen, "salida": salida.name, "nombre": archivo.name}
+
+    taller = st.session_state.get("taller")
+    if not taller:
+        return
+    if not os.path.exists(taller["salida"]):
+        st.session_state.pop("taller")
+        st.info("Los archivos de la última importación ya no están disponibles: vuelve a importar el taller.")
+        return
+    resumen = taller["resumen"]
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Filas", f"{resumen.filas:,}")
+    c2.metric("Válidas", f"{resumen.validas:,}")
+    c3.metric("Con errores", f"{resumen.n_errores:,}")
+
+    if resumen.areas():
+        st.markdown("**Ruedas por área**")
+        st.dataframe(resumen.overview(), use_container_width=True, hide_index=True)
+        area = st.selectbox("Detalle por vector", resumen.areas(), key="taller_area")
+        st.dataframe(resumen.area_table(area), use_container_width=True, hide_index=True)
+    if resumen.vak_n:
+        st.markdown(f"**Perfil VAK de la cohorte** ({resumen.vak_n:,} participantes)")
+        st.dataframe(resumen.vak_table(), use_container_width=True, hide_index=True)
+    if resumen.errores:
+        with st.expander(f"⚠️ Filas descartadas ({resumen.n_errores:,}; se muestran {len(resumen.errores)})"):
+            st.dataframe(resumen.errores, use_container_width=True, hide_index=True)
+
+    with open(taller["salida"], "rb") as fh:
+        st.download_button(
+            "⬇️ Descargar filas puntuadas (CSV)",
+            data=fh,
+            file_name=f"puntuado_{os.path.splitext(taller['nombre'])[0]}.csv",
+            mime="text/csv",
+            use_container_width=True,
+        )
+
+    # Un PDF por participante válido, renderizados en un pool de procesos y escritos al ZIP según terminan
+    if archivo is not None and archivo.name == taller["nombre"] and st.button("📦 Generar PDFs individuales (ZIP)"):
+        barra = st.progress(0.0, text="Generando PDFs…")
+
+        def progreso_pdf(hechos: int):
+            barra.progress(min(hechos / max(resumen.validas, 1), 1.0), text=f"{hechos:,} / {resumen.validas:,} PDFs")
+
+        borrar_archivo(taller.pop("zip", None))
+        destino = tempfile.NamedTemporaryFile(suffix=".zip", delete=False, dir=taller_dir())
+        base = {
+            "nombre_coach": st.session_state.nombre_coach,
+            "objetivo_sesion": f"Taller ({taller['nombre']})",
+            "nivel_cliente": st.session_state.nivel_cliente,
+        }
+        archivo.seek(0)
+        with get_tracer().span("taller.pdf_zip", rows=resumen.validas) as attrs, destino:
+            r = batch.build_pdf_zip(
+                bulk.iter_records(archivo, archivo.name, base=base),
+                destino,
+                datetime.now().strftime("%d/%m/%Y %H:%M"),
+                progress=progreso_pdf,
+            )
+            attrs.update(r)
+        taller["zip"] = destino.name
+        if r["errores"]:
+            st.warning(f"{r['errores']:,} PDFs fallaron; el detalle va en errores.txt dentro del ZIP.")
+    if taller.get("zip") and os.path.exists(taller["zip"]):
+        with open(taller["zip"], "rb") as fh:
+            st.download_button(
+                "⬇️ Descargar PDFs individuales (ZIP)",
+                data=fh,
+                file_name=f"registros_{os.path.splitext(taller['nombre'])[0]}.zip",
+                mime="application/zip",
+                use_container_width=True,
+            )
+
+
+with tab6:
+    tab_taller()
+
+# Lo que cambió en este rerun (las jugadas del Copiloto ya se volcaron al entregarse)
+flush_session_store()
+
+st.session_state.rerun_ms["app"] = (time.perf_counter() - _t_rerun) * 1000
+get_tracer().record("rerun", st.session_state.rerun_ms["app"])
@@ -0,0 +1,242 @@
+# bench/fake_gemini.py
+# Sustituto local de la API REST de Gemini para benchmarks y pruebas de carga (sin red ni cuota).
+#
+# Imita los endpoints que usan los dos SDK:
+#   POST /v1beta/models/{modelo}:generateContent
+#   POST /v1beta/models/{modelo}:streamGenerateContent?alt=sse   (google-genai, gptapp.py)
+#   POST /v1beta/models/{modelo}:streamGenerateContent            (google-generativeai REST, app.py: array JSON)
+#   GET  /stats                                                    contadores del servidor
+#
+# Uso:
+#   python bench/fake_gemini.py --port 8765 --latency uniform:0.3,1.2 --tokens-per-s 60 --rate-429 0.05
+#   CLARIDAD_GEMINI_BASE_URL=http://127.0.0.1:8765 streamlit run app.py
+#
+# Latencia (hasta el primer fragmento): fixed:S | uniform:A,B | normal:MEDIA,SD | lognormal:MU,SIGMA
+# Respuestas: plantilla por defecto de claridad.stub, --template FICHERO (str.format con {firma},
+# {modelo}, {prompt_chars}) o --canned FICHERO.json ([{"match": "subcadena", "text": "..."}]).
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from claridad.stub import StubBackend  # noqa: E402
+
+_RUTA = re.compile(r"^/(v1beta|v1|v1alpha)/models/([^:/]+):(generateContent|streamGenerateContent)$")
+
+_ERRORES = {
+    429: "RESOURCE_EXHAUSTED",
+    500: "INTERNAL",
+}
+
+
+def parse_latency(spec: str):
+    kind, _, params = spec.partition(":")
+    nums = [float(x) for x in params.split(",") if x]
+    if kind == "fixed":
+        return lambda: nums[0]
+    if kind == "uniform":
+        return lambda: random.uniform(nums[0], nums[1])
+    if kind == "normal":
+        return lambda: max(0.0, random.gauss(nums[0], nums[1]))
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(nums[0], nums[1])
+    raise ValueError(f"distribución de latencia desconocida: {spec}")
+
+
+class FakeGeminiConfig:
+    def __init__(self, latency: str = "fixed:0", tokens_per_s: float = 0.0, rate_429: float = 0.0,
+                 rate_500: float = 0.0, template: str | None = None, canned: list | None = None,
+                 words_per_chunk: int = 8, seed: int | None = None):
+        self.latency = parse_latency(latency)
+        self.tokens_per_s = tokens_per_s
+        self.rate_429 = rate_429
+        self.rate_500 = rate_500
+        self.template = template
+        self.canned = canned or []
+        self.words_per_chunk = words_per_chunk
+        if seed is not None:
+            random.seed(seed)
+
+    def response_for(self, model: str, prompt: str, schema: dict | None = None) -> str:
+        for item in self.canned:
+            if item["match"] in prompt:
+                return item["text"]
+        if self.template:
+            firma = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+            return self.template.format(firma=firma, modelo=model, prompt_chars=len(prompt))
+        return StubBackend(model_name=model).response_for(prompt, schema)
+
+    def chunks(self, text: str) -> list:
+        palabras = text.split(" ")
+        n = self.words_per_chunk
+        return [" ".join(palabras[i:i + n]) + (" " if i + n < len(palabras) else "") for i in range(0, len(palabras), n)]
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _payload(model: str, text: str, prompt: str, final: bool, finish: str = "STOP") -> dict:
+    cand = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+    if final:
+        cand["finishReason"] = finish
+    return {
+        "candidates": [cand],
+        "usageMetadata": {
+            "promptTokenCount": _tokens(prompt),
+            "candidatesTokenCount": _tokens(text),
+            "totalTokenCount": _tokens(prompt) + _tokens(text),
+        },
+        "modelVersion": model,
+    }
+
+
+class _Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {"requests": 0, "stream": 0, "429": 0, "500": 0, "in_flight": 0, "max_in_flight": 0}
+
+    def add(self, key: str, n: int = 1):
+        with self.lock:
+            self.counts[key] += n
+            if key == "in_flight":
+                self.counts["max_in_flight"] = max(self.counts["max_in_flight"], self.counts["in_flight"])
+
+
+def make_handler(config: FakeGeminiConfig, stats: _Stats):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive: los SDK reutilizan la conexión como con la API real
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _json(self, status: int, body: dict):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=UTF-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _chunk(self, data: bytes):
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def do_GET(self):
+            if self.path.startswith("/stats"):
+                with stats.lock:
+                    self._json(200, dict(stats.counts))
+            else:
+                self._json(404, {"error": {"code": 404, "message": "not found", "status": "NOT_FOUND"}})
+
+        def do_POST(self):
+            path, _, query = self.path.partition("?")
+            match = _RUTA.match(path)
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not match:
+                self._json(404, {"error": {"code": 404, "message": f"ruta no soportada: {path}", "status": "NOT_FOUND"}})
+                return
+            model, method = match.group(2), match.group(3)
+            prompt = "".join(
+                part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", [])
+            )
+            stats.add("requests")
+            stats.add("in_flight")
+            try:
+                time.sleep(config.latency())
+                roll = random.random()
+                for code, rate in ((429, config.rate_429), (500, config.rate_500)):
+                    if roll < rate:
+                        stats.add(str(code))
+                        self._json(code, {"error": {"code": code, "message": "error inyectado", "status": _ERRORES[code]}})
+                        return
+                    roll -= rate
+
+                gen_config = body.get("generationConfig", {})
+                text = config.response_for(model, prompt, gen_config.get("responseSchema"))
+                # maxOutputTokens como la API: la salida se corta y termina con MAX_TOKENS
+                finish = "STOP"
+                tope = gen_config.get("maxOutputTokens")
+                if tope and _tokens(text) > tope:
+                    text, finish = text[: tope * 4], "MAX_TOKENS"
+                if method == "generateContent":
+                    if config.tokens_per_s:
+                        time.sleep(_tokens(text) / config.tokens_per_s)
+                    self._json(200, _payload(model, text, prompt, final=True, finish=finish))
+                    return
+
+                stats.add("stream")
+                sse = "alt=sse" in query
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream" if sse else "application/json; charset=UTF-8")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                trozos = config.chunks(text)
+                if not sse:
+                    self._chunk(b"[")
+                for i, trozo in enumerate(trozos):
+                    if config.tokens_per_s:
+                        time.sleep(_tokens(trozo) / config.tokens_per_s)
+                    data = json.dumps(_payload(model, trozo, prompt, final=i == len(trozos) - 1, finish=finish))
+                    if sse:
+                        self._chunk(f"data: {data}\r\n\r\n".encode("utf-8"))
+                    else:
+                        self._chunk(((",\n" if i else "") + data).encode("utf-8"))
+                if not sse:
+                    self._chunk(b"]")
+                self._chunk(b"")
+            finally:
+                stats.add("in_flight", -1)
+
+    return Handler
+
+
+def serve(config: FakeGeminiConfig, host: str = "127.0.0.1", port: int = 0):
+    # Arranca en un hilo y devuelve (servidor, base_url); port=0 elige un puerto libre
+    stats = _Stats()
+    server = ThreadingHTTPServer((host, port), make_handler(config, stats))
+    server.daemon_threads = True
+    server.stats = stats
+    threading.Thread(target=server.serve_forever, name="fake-gemini", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Sustituto local de la API de Gemini")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="fixed:0", help="fixed:S | uniform:A,B | normal:M,SD | lognormal:MU,SIGMA")
+    parser.add_argument("--tokens-per-s", type=float, default=0.0, help="ritmo de salida (0 = sin pausa)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="fracción de peticiones con 429")
+    parser.add_argument("--rate-500", type=float, default=0.0, help="fracción de peticiones con 500")
+    parser.add_argument("--template", help="fichero de plantilla de respuesta")
+    parser.add_argument("--canned", help="JSON con respuestas fijas por subcadena del prompt")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    template = open(args.template, encoding="utf-8").read() if args.template else None
+    canned = json.load(open(args.canned, encoding="utf-8")) if args.canned else None
+    config = FakeGeminiConfig(args.latency, args.tokens_per_s, args.rate_429, args.rate_500, template, canned,
+                              seed=args.seed)
+    server, url = serve(config, args.host, args.port)
+    print(f"Gemini simulado en {url} (Ctrl+C para salir)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
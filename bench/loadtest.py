@@ -0,0 +1,259 @@
+# bench/loadtest.py
+# Carga multi-sesión sobre el flujo real de app.py con el modelo simulado.
+#
+# Cada sesión simulada es un AppTest que ejecuta app.py en este proceso, como un servidor Streamlit
+# con varias pestañas abiertas: comparten st.cache_resource (caché de respuestas, JobRunner, cliente).
+# Flujo por sesión:
+#   ficha → rueda → hipótesis (hasta que llega) → VAK 24 → K turnos de Copiloto → PDF
+#
+# Uso:
+#   python bench/loadtest.py --levels 1,2,4,8 --turns 3 --stub-latency 0.8
+#   python bench/loadtest.py --levels 1,4,16 --fake-server --latency uniform:0.3,1.5 --rate-429 0.02
+#
+# Informe: p50/p95/p99 por paso y nivel de concurrencia, CPU y RSS del proceso, y el primer nivel
+# en que el p95 del rerun supera --degrade-factor veces el del nivel más bajo.
+
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+STEPS = ("ficha", "rueda", "hipotesis", "vak", "copiloto", "pdf", "rerun")
+AREA = "0. MAPA GENERAL (Macro)"
+
+
+def percentile(values: list, q: float):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:  # fuera de Linux: pico de RSS (ru_maxrss en KiB)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class ResourceSampler(threading.Thread):
+    def __init__(self, every: float = 0.25):
+        super().__init__(daemon=True)
+        self.every = every
+        self.rss = []
+        self._halt = threading.Event()
+
+    def run(self):
+        while not self._halt.is_set():
+            self.rss.append(_rss_bytes())
+            self._halt.wait(self.every)
+
+    def stop(self):
+        self._halt.set()
+        self.join()
+
+
+# -------------------------
+# SESIÓN SIMULADA
+# -------------------------
+def _wait_job(at, key: str, timeout: float, poll: float = 0.05):
+    # AppTest no dispara los fragmentos con run_every: se re-ejecuta hasta que el trabajo se entrega
+    limite = time.monotonic() + timeout
+    while at.session_state[key]:
+        if time.monotonic() > limite:
+            raise TimeoutError(f"{key} sin terminar tras {timeout}s")
+        time.sleep(poll)
+        at.run()
+
+
+def _button(at, label: str):
+    return next(b for b in at.button if b.label == label)
+
+
+def run_session(idx: int, turns: int, timeout: float, rng: random.Random) -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    from claridad.data import VAK_ITEMS, ruedas_data
+
+    tiempos = {s: [] for s in STEPS}
+
+    def step(nombre, fn):
+        t0 = time.perf_counter()
+        fn()
+        tiempos[nombre].append(time.perf_counter() - t0)
+
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=timeout)
+    at.run()
+
+    def ficha():
+        campos = {"Nombre del coach": f"Coach {idx}", "Nombre del cliente": f"Cliente {idx}",
+                  "Objetivo (1 línea)": "Recuperar rutina de sueño"}
+        for w in at.text_input:
+            if w.label in campos:
+                w.input(campos[w.label])
+        _button(at, "Guardar ficha").click().run()
+
+    def rueda():
+        for v in ruedas_data[AREA]:
+            at.slider(key=f"s_{AREA}_{v}").set_value(rng.randint(1, 10))
+        _button(at, "Guardar rueda").click().run()
+
+    def hipotesis():
+        _button(at, "🤖 Generar / Regenerar hipótesis").click().run()
+        _wait_job(at, "job_hipotesis", timeout)
+
+    def vak():
+        for i in range(len(VAK_ITEMS)):
+            at.radio(key=f"vak_{i}").set_value(rng.choice("VAC"))
+        _button(at, "Guardar perfil VAK").click().run()
+
+    def copiloto(n):
+        at.chat_input[0].set_value(f"Sesión {idx}, turno {n}: dice que no tiene tiempo.").run()
+        _wait_job(at, "job_copiloto", timeout)
+
+    def pdf():
+        _button(at, "📄 Preparar PDF").click().run()
+
+    step("ficha", ficha)
+    step("rueda", rueda)
+    step("hipotesis", hipotesis)
+    step("vak", vak)
+    for n in range(turns):
+        step("copiloto", lambda: copiloto(n))
+        step("rerun", at.run)
+    step("pdf", pdf)
+    step("rerun", at.run)
+
+    errores = [str(e.value) for e in at.exception]
+    return {"tiempos": tiempos, "errores": errores}
+
+
+def run_level(concurrency: int, turns: int, timeout: float, seed: int) -> dict:
+    resultados = [None] * concurrency
+    fallos = []
+
+    def worker(i):
+        try:
+            resultados[i] = run_session(i, turns, timeout, random.Random(seed + i))
+        except Exception as exc:  # una sesión caída no aborta el nivel
+            fallos.append(f"sesión {i}: {exc!r}")
+
+    sampler = ResourceSampler()
+    sampler.start()
+    cpu0 = resource.getrusage(resource.RUSAGE_SELF)
+    t0 = time.perf_counter()
+    hilos = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    wall = time.perf_counter() - t0
+    cpu1 = resource.getrusage(resource.RUSAGE_SELF)
+    sampler.stop()
+
+    por_paso = {s: [] for s in STEPS}
+    for r in resultados:
+        if r is None:
+            continue
+        for s, valores in r["tiempos"].items():
+            por_paso[s].extend(valores)
+        fallos.extend(r["errores"])
+
+    cpu_s = (cpu1.ru_utime - cpu0.ru_utime) + (cpu1.ru_stime - cpu0.ru_stime)
+    return {
+        "concurrency": concurrency,
+        "wall_s": wall,
+        "cpu_s": cpu_s,
+        "cpu_util": cpu_s / wall if wall else None,  # 1.0 = un núcleo al 100%
+        "rss_max_mb": max(sampler.rss, default=0) / 2**20,
+        "rss_mean_mb": (statistics.mean(sampler.rss) if sampler.rss else 0) / 2**20,
+        "steps": {
+            s: {"n": len(v), "p50_s": percentile(v, 0.50), "p95_s": percentile(v, 0.95), "p99_s": percentile(v, 0.99)}
+            for s, v in por_paso.items()
+        },
+        "errors": fallos,
+    }
+
+
+def degradation_level(levels: list, factor: float):
+    base = levels[0]["steps"]["rerun"]["p95_s"]
+    if not base:
+        return None
+    for nivel in levels[1:]:
+        p95 = nivel["steps"]["rerun"]["p95_s"]
+        if p95 and p95 > factor * base:
+            return nivel["concurrency"]
+    return None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Carga multi-sesión sobre app.py con Gemini simulado")
+    parser.add_argument("--levels", default="1,2,4,8", help="niveles de concurrencia (sesiones simultáneas)")
+    parser.add_argument("--turns", type=int, default=3, help="turnos de Copiloto por sesión")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--degrade-factor", type=float, default=2.0)
+    parser.add_argument("--stub-latency", type=float, default=0.5, help="backend stub en proceso: latencia")
+    parser.add_argument("--stub-tokens-per-s", type=float, default=80.0)
+    parser.add_argument("--fake-server", action="store_true", help="usar bench/fake_gemini.py por HTTP")
+    parser.add_argument("--latency", default="uniform:0.3,1.2", help="latencia del servidor simulado")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-500", type=float, default=0.0)
+    parser.add_argument("--out", help="ruta del JSON del informe (por defecto, stdout)")
+    args = parser.parse_args(argv)
+
+    # Caché de respuestas desechable: con la real, los prompts repetidos no medirían el modelo.
+    # Historial y trazas también: las sesiones simuladas no deben llegar a los datos de la app real.
+    tmp = tempfile.mkdtemp(prefix="claridad-load-")
+    os.environ["CLARIDAD_CACHE_PATH"] = os.path.join(tmp, "cache.sqlite3")
+    os.environ["CLARIDAD_STORE_PATH"] = os.path.join(tmp, "sesiones.sqlite3")
+    os.environ["CLARIDAD_TRACE_PATH"] = os.path.join(tmp, "traces.jsonl")
+    os.environ["CLARIDAD_SIMILAR_PATH"] = os.path.join(tmp, "ruedas_index.npz")
+    if args.fake_server:
+        from fake_gemini import FakeGeminiConfig, serve
+
+        _, url = serve(FakeGeminiConfig(args.latency, args.stub_tokens_per_s, args.rate_429, args.rate_500))
+        os.environ["CLARIDAD_GEMINI_BASE_URL"] = url
+    else:
+        os.environ["CLARIDAD_LLM_BACKEND"] = "stub"
+        os.environ["CLARIDAD_STUB_LATENCY"] = str(args.stub_latency)
+        os.environ["CLARIDAD_STUB_TOKENS_PER_S"] = str(args.stub_tokens_per_s)
+
+    niveles = []
+    for c in (int(x) for x in args.levels.split(",")):
+        nivel = run_level(c, args.turns, args.timeout, args.seed)
+        niveles.append(nivel)
+        rerun = nivel["steps"]["rerun"]
+        print(f"[{c:>3} sesiones] rerun p50={rerun['p50_s'] or 0:.3f}s p95={rerun['p95_s'] or 0:.3f}s "
+              f"cpu={nivel['cpu_util'] or 0:.2f} rss={nivel['rss_max_mb']:.0f}MB errores={len(nivel['errors'])}",
+              file=sys.stderr)
+
+    report = {
+        "backend": "fake_server" if args.fake_server else "stub",
+        "turns": args.turns,
+        "levels": niveles,
+        "degrades_at_concurrency": degradation_level(niveles, args.degrade_factor),
+        "degrade_factor": args.degrade_factor,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,432 @@
+# bench/run.py
+# Suite de benchmarks de los caminos calientes. Gemini se sustituye por claridad.stub (sin red ni cuota).
+#
+# Uso:
+#   python bench/run.py --out bench_results.json
+#   python bench/run.py --only pdf,radar --repeat 10
+#   python bench/run.py --baseline bench/baseline.json --tolerance 0.2   # sale con 1 si hay regresiones
+#   python bench/run.py --out bench/baseline.json                        # fija una nueva línea base
+#
+# Resultados: {"meta": {...}, "results": {"<camino>": {"median_s", "min_s", "p95_s", "n"}}}
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Antes de importar claridad: backend stub y caché, historial y trazas desechables (no se tocan los reales)
+_TMP = tempfile.mkdtemp(prefix="claridad-bench-")
+os.environ.setdefault("CLARIDAD_LLM_BACKEND", "stub")
+os.environ.setdefault("CLARIDAD_CACHE_PATH", os.path.join(_TMP, "cache.sqlite3"))
+os.environ.setdefault("CLARIDAD_STORE_PATH", os.path.join(_TMP, "sesiones.sqlite3"))
+os.environ.setdefault("CLARIDAD_TRACE_PATH", os.path.join(_TMP, "traces.jsonl"))
+os.environ.setdefault("CLARIDAD_SIMILAR_PATH", os.path.join(_TMP, "ruedas_index.npz"))
+
+CHAT_TURNS = (0, 50, 500)
+FECHA = "01/01/2026 10:00"
+
+
+def timeit(fn, repeat: int, warmup: int = 1, setup=None) -> dict:
+    # setup(): preparación fuera del cronómetro; su resultado se pasa a fn
+    for _ in range(warmup):
+        fn(setup()) if setup else fn()
+    samples = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        t0 = time.perf_counter()
+        fn(arg) if setup else fn()
+        samples.append(time.perf_counter() - t0)
+    samples.sort()
+    return {
+        "median_s": statistics.median(samples),
+        "min_s": samples[0],
+        "p95_s": samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))],
+        "n": len(samples),
+    }
+
+
+def sample_session(turns: int) -> dict:
+    from claridad.data import ruedas_data
+
+    area = "0. MAPA GENERAL (Macro)"
+    chat = []
+    for i in range(turns):
+        role = "user" if i % 2 == 0 else "assistant"
+        content = (
+            f"El cliente dice que esta semana ({i}) volvió a posponer el plan."
+            if role == "user"
+            else "1) 🎯 DESAFÍO REDEFINIDO\n2) 🗣️ COACH DICE: ...\n3) ❓ PREGUNTA SIGUIENTE: ...\n" * 2
+        )
+        chat.append({"role": role, "content": content})
+    return {
+        "nombre_coach": "Coach Bench",
+        "nombre_cliente": "Cliente Bench",
+        "objetivo_sesion": "Recuperar rutina de sueño",
+        "nivel_cliente": "En proceso",
+        "datos_rueda": {"area": area, "vectores": ruedas_data[area], "valores": [5, 3, 7, 4, 8, 6, 2, 9]},
+        "diagnostico_generado": "- Patrón dominante: ...\n- Cuello de botella: ...\n" * 3,
+        "puntos_vak": {"V": 10, "A": 6, "C": 8},
+        "chat_hist": chat,
+    }
+
+
+# -------------------------
+# BENCHMARKS
+# -------------------------
+def bench_pdf(repeat: int) -> dict:
+    from claridad.export import build_pdf
+
+    out = {}
+    for turns in CHAT_TURNS:
+        session = sample_session(turns)
+        out[f"pdf.build.turns_{turns}"] = timeit(lambda: build_pdf(session, FECHA), repeat)
+    return out
+
+
+def bench_radar(repeat: int) -> dict:
+    from claridad import charts
+    from claridad.data import ruedas_data
+
+    out = {}
+    for area, vectores in ruedas_data.items():
+        valores = list(range(1, len(vectores) + 1))
+        out[f"radar.render.{area}"] = timeit(lambda: charts._draw(vectores, valores, "becoach", "png"), repeat)
+    area, vectores = next(iter(ruedas_data.items()))
+    out["radar.cached"] = timeit(lambda: charts.render_radar(area, vectores, [5] * len(vectores)), repeat)
+    return out
+
+
+def bench_vak(repeat: int) -> dict:
+    from claridad.scoring import predominant, score_vak
+
+    choices = ["V", "A", "C", "V", "C", "A"] * 4
+
+    def score_1000():
+        for _ in range(1000):
+            predominant(score_vak(choices))
+
+    return {"vak.score_x1000": timeit(score_1000, repeat)}
+
+
+def bench_txt(repeat: int) -> dict:
+    from claridad.export import build_txt
+
+    out = {}
+    for turns in CHAT_TURNS:
+        session = sample_session(turns)
+        out[f"txt.build.turns_{turns}"] = timeit(lambda: build_txt(session, FECHA), repeat)
+    return out
+
+
+def bench_context(repeat: int) -> dict:
+    # Prompt del Copiloto a lo largo de la sesión: el render incremental y el tamaño deben quedar planos
+    from claridad.context import CopilotoContext
+
+    out = {}
+    for turns in (10, 60, 500):
+        chat = sample_session(turns)["chat_hist"]
+        ctx = CopilotoContext()
+        ctx.render(chat[:-2])  # estado de la sesión en el turno anterior
+        out[f"context.render.turns_{turns}"] = timeit(lambda: ctx.render(chat), repeat)
+        out[f"context.render.turns_{turns}"]["prompt_chars"] = len(ctx.render(chat))
+    return out
+
+
+def bench_store(repeat: int) -> dict:
+    # Historial con 20 000 sesiones (4 000 clientes, 40 coaches): abrir un cliente debe costar milisegundos
+    import uuid
+
+    from claridad.store import SessionRecorder, SessionStore
+
+    store = SessionStore(os.path.join(tempfile.mkdtemp(prefix="claridad-store-"), "sesiones.sqlite3"))
+    session = sample_session(10)
+    for i in range(20000):
+        eventos = [("ficha", {"nombre_cliente": f"Cliente {i % 4000}", "nombre_coach": f"Coach {i % 40}"}),
+                   ("rueda", {"datos_rueda": session["datos_rueda"]})]
+        eventos += [("chat", m) for m in session["chat_hist"]]
+        store.append(uuid.uuid4().hex, f"Cliente {i % 4000}", f"Coach {i % 40}", eventos, ts=1.7e9 + i)
+
+    def flush_turn():
+        session["chat_hist"].append({"role": "user", "content": "otro turno"})
+        recorder.flush(store, session)
+
+    recorder = SessionRecorder()
+    recorder.flush(store, session)
+    return {
+        "store.client_history_20k": timeit(lambda: store.client_history("cliente 17"), repeat),
+        "store.coach_history_20k": timeit(lambda: store.coach_history("Coach 3", limit=50), repeat),
+        "store.flush_turn": timeit(flush_turn, repeat),
+    }
+
+
+def bench_longitudinal(repeat: int) -> dict:
+    # Cartera de un coach: 5 000 sesiones de 500 clientes en un área
+    import random
+
+    from claridad.data import ruedas_data
+    from claridad.longitudinal import RuedaHistory, analyze, rank_clients
+
+    rng = random.Random(0)
+    area = "0. MAPA GENERAL (Macro)"
+    vectores = ruedas_data[area]
+    rows = [
+        (f"s{i}", 1.7e9 + i * 3600, f"cliente {i % 500}",
+         {"area": area, "vectores": vectores, "valores": [rng.randint(1, 10) for _ in vectores]})
+        for i in range(5000)
+    ]
+    history = RuedaHistory.from_rows(rows, area, vectores)
+    stats = analyze(history)
+    return {
+        "longitudinal.from_rows_5000": timeit(lambda: RuedaHistory.from_rows(rows, area, vectores), repeat),
+        "longitudinal.analyze_5000": timeit(lambda: analyze(history), repeat),
+        "longitudinal.rank_clients_500": timeit(lambda: rank_clients(stats), repeat),
+    }
+
+
+def bench_bulk(repeat: int) -> dict:
+    # Taller grande: 100 000 filas (rueda + VAK 24) leídas por bloques desde CSV
+    import io
+    import random
+
+    from claridad import bulk
+    from claridad.data import ruedas_data
+
+    rng = random.Random(0)
+    areas = list(ruedas_data)
+    lineas = [",".join(bulk.TEMPLATE_HEADER)]
+    for i in range(100_000):
+        lineas.append(",".join([f"p{i}", rng.choice(areas)] + [str(rng.randint(1, 10)) for _ in range(8)]
+                               + [rng.choice("VAC") for _ in range(24)]))
+    data = ("\n".join(lineas) + "\n").encode("utf-8")
+    return {"bulk.import_100k": timeit(lambda: bulk.import_file(io.BytesIO(data), "taller.csv"), repeat, warmup=0)}
+
+
+def bench_batch(repeat: int) -> dict:
+    # 200 PDFs de taller en un ZIP: en serie frente al pool de procesos (incluye el arranque del pool)
+    import io
+    import random
+
+    import reportlab  # noqa: F401  (sin ReportLab cada PDF fallaría en el hijo y se mediría solo el error)
+
+    from claridad import batch
+    from claridad.data import ruedas_data
+
+    rng = random.Random(0)
+    areas = list(ruedas_data)
+    records = []
+    for i in range(200):
+        area = rng.choice(areas)
+        records.append({
+            "nombre_coach": "Coach", "nombre_cliente": f"Participante {i}", "objetivo_sesion": "Taller",
+            "nivel_cliente": "Nuevo", "diagnostico_generado": None, "chat_hist": [],
+            "datos_rueda": {"area": area, "vectores": ruedas_data[area], "valores": [rng.randint(1, 10) for _ in range(8)]},
+            "puntos_vak": {"V": rng.randint(0, 24), "A": rng.randint(0, 24), "C": rng.randint(0, 24)},
+        })
+    return {
+        "batch.zip_200_serial": timeit(lambda: batch.build_pdf_zip(records, io.BytesIO(), "01/01/2025 10:00", workers=1), repeat, warmup=0),
+        "batch.zip_200_pool": timeit(lambda: batch.build_pdf_zip(records, io.BytesIO(), "01/01/2025 10:00"), repeat, warmup=0),
+    }
+
+
+def bench_sweep(repeat: int) -> dict:
+    # Las nueve áreas + síntesis con el stub: de una en una frente a todas a la vez.
+    # Sin --stub-latency se fija 0.2 s por llamada; si no, solo se mediría el coste del bucle.
+    import time
+
+    from claridad.data import ruedas_data
+    from claridad.prompts import build_prompt_auto, build_prompt_sintesis
+    from claridad.stub import StubBackend
+    from claridad.sweep import AreaSweep
+
+    backend = StubBackend(latency=float(os.environ.get("CLARIDAD_STUB_LATENCY") or 0.2))
+    prompts = {
+        area: build_prompt_auto("Cliente", "", {"area": area, "vectores": vectores, "valores": [5] * len(vectores)})
+        for area, vectores in ruedas_data.items()
+    }
+
+    def correr(limit: int):
+        sweep = AreaSweep(prompts, lambda prompt, area, stats: backend.stream(prompt, usage=stats),
+                          lambda r: build_prompt_sintesis("Cliente", "", r), limit=limit).start()
+        while not sweep.done:
+            time.sleep(0.005)
+
+    return {
+        "sweep.areas_serial": timeit(lambda: correr(1), repeat, warmup=0),
+        "sweep.areas_concurrent": timeit(lambda: correr(len(prompts)), repeat, warmup=0),
+    }
+
+
+def bench_pipeline(repeat: int) -> dict:
+    # gptapp.py: diagnóstico y luego hoja de ruta completa, frente al modo en un paso (claridad.pipeline).
+    # Stub a 0.2 s hasta el primer fragmento y 150 tokens/s (si no se fijan otros): la salida dura, como en Gemini.
+    import time
+
+    from claridad.jobs import JobRunner
+    from claridad.pipeline import GrowPipeline
+    from claridad.prompts import build_prompt_diagnostico, build_prompt_grow, build_prompt_grow_parte
+    from claridad.stub import StubBackend
+
+    backend = StubBackend(
+        latency=float(os.environ.get("CLARIDAD_STUB_LATENCY") or 0.2),
+        tokens_per_s=float(os.environ.get("CLARIDAD_STUB_TOKENS_PER_S") or 150),
+    )
+    runner = JobRunner(max_workers=4)
+    prompt = build_prompt_diagnostico("Cliente", "Salud", ["a", "b", "c"], [3, 5, 7])
+    consulta = "Quiero dormir mejor"
+
+    def secuencial():
+        diagnostico = "".join(backend.stream(prompt))
+        "".join(backend.stream(build_prompt_grow(diagnostico, consulta, None)))
+
+    def en_un_paso():
+        pipe = GrowPipeline(runner, lambda p, tipo: backend.stream(p), prompt,
+                            lambda parte, d: build_prompt_grow_parte(parte, d, consulta, None)).start()
+        while not pipe.poll():
+            time.sleep(0.005)
+
+    return {
+        "pipeline.grow_sequential": timeit(secuencial, repeat, warmup=0),
+        "pipeline.grow_pipelined": timeit(en_un_paso, repeat, warmup=0),
+    }
+
+
+def bench_similar(repeat: int) -> dict:
+    import random
+
+    from claridad.data import ruedas_data
+    from claridad.similar import RuedaIndex
+
+    rng = random.Random(0)
+    areas = list(ruedas_data)
+    index = RuedaIndex(path=None, max_entries=1000)
+    for i in range(1000):
+        index.add(rng.choice(areas), [rng.randint(1, 10) for _ in range(8)], f"hipótesis {i}", coach="Coach")
+    consulta = [5] * 7 + [3]
+    return {
+        "similar.lookup_1000": timeit(lambda: index.lookup(areas[0], consulta, threshold=100.0, coach="Coach"), repeat),
+        "similar.add_evict_1000": timeit(
+            lambda: index.add(areas[0], [rng.randint(1, 10) for _ in range(8)], "x", coach="Coach"), repeat
+        ),
+    }
+
+
+def bench_apptest(repeat: int) -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    out = {}
+    for script in ("app.py", "gptapp.py"):
+        at = AppTest.from_file(os.path.join(ROOT, script), default_timeout=120)
+        at.secrets["GEMINI_API_KEY"] = ""
+        t0 = time.perf_counter()
+        at.run()
+        out[f"apptest.{script}.first_run"] = {"median_s": time.perf_counter() - t0, "min_s": None, "p95_s": None, "n": 1}
+        out[f"apptest.{script}.rerun"] = timeit(at.run, repeat, warmup=0)
+
+    # app.py con una sesión completa cargada (rueda, VAK, hipótesis, 50 turnos de chat)
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120)
+    at.secrets["GEMINI_API_KEY"] = ""
+    for k, v in sample_session(50).items():
+        at.session_state[k] = v
+    at.run()
+    out["apptest.app.py.rerun_full_session"] = timeit(at.run, repeat, warmup=0)
+    return out
+
+
+BENCHES = {
+    "pdf": bench_pdf,
+    "radar": bench_radar,
+    "vak": bench_vak,
+    "txt": bench_txt,
+    "similar": bench_similar,
+    "store": bench_store,
+    "longitudinal": bench_longitudinal,
+    "bulk": bench_bulk,
+    "batch": bench_batch,
+    "sweep": bench_sweep,
+    "pipeline": bench_pipeline,
+    "context": bench_context,
+    "apptest": bench_apptest,
+}
+
+
+# -------------------------
+# COMPARACIÓN
+# -------------------------
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    regresiones = []
+    for name, actual in results.items():
+        previo = baseline.get(name)
+        if not previo or not previo.get("median_s") or "median_s" not in actual:
+            continue
+        ratio = actual["median_s"] / previo["median_s"]
+        if ratio > 1 + tolerance:
+            regresiones.append({"name": name, "baseline_s": previo["median_s"], "current_s": actual["median_s"],
+                                "ratio": ratio})
+    return regresiones
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de los caminos calientes (Gemini simulado)")
+    parser.add_argument("--only", help=f"subconjunto separado por comas de: {', '.join(BENCHES)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--stub-latency", type=float, help="segundos hasta el primer fragmento del stub")
+    parser.add_argument("--stub-tokens-per-s", type=float, help="ritmo de salida del stub (0 = sin pausa)")
+    parser.add_argument("--out", help="ruta del JSON de resultados (por defecto, stdout)")
+    parser.add_argument("--baseline", help="JSON de una ejecución anterior con el que comparar")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="regresión si la mediana crece más que esto")
+    args = parser.parse_args(argv)
+
+    if args.stub_latency is not None:
+        os.environ["CLARIDAD_STUB_LATENCY"] = str(args.stub_latency)
+    if args.stub_tokens_per_s is not None:
+        os.environ["CLARIDAD_STUB_TOKENS_PER_S"] = str(args.stub_tokens_per_s)
+
+    selected = args.only.split(",") if args.only else list(BENCHES)
+    results, errors = {}, {}
+    for name in selected:
+        try:
+            results.update(BENCHES[name](args.repeat))
+        except ImportError as exc:  # dependencia no instalada: se informa y se sigue con el resto
+            errors[name] = str(exc)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "stub_latency_s": float(os.environ.get("CLARIDAD_STUB_LATENCY", 0)),
+            "errors": errors,
+        },
+        "results": results,
+    }
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)["results"]
+        report["regressions"] = compare(results, baseline, args.tolerance)
+        for r in report["regressions"]:
+            print(f"REGRESIÓN {r['name']}: {r['baseline_s'] * 1000:.2f} ms → {r['current_s'] * 1000:.2f} ms "
+                  f"(x{r['ratio']:.2f})", file=sys.stderr)
+        status = 1 if report["regressions"] else 0
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
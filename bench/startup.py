@@ -0,0 +1,128 @@
+# bench/startup.py
+# Arranque en frío: tiempo de importación de las dependencias pesadas y del primer render de cada app.
+#
+# Uso:
+#   python bench/startup.py                  # árbol de trabajo actual
+#   python bench/startup.py --rev <commit>   # además, otra revisión git (SHA, HEAD~N…) para comparar
+#                                            # antes/después; p. ej. el SHA del commit de partida
+#
+# Cada medición corre en un proceso nuevo (cachés de import vacías) y se repite --repeat veces (mediana).
+
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = [
+    "streamlit",
+    "numpy",
+    "pandas",
+    "matplotlib.pyplot",
+    "reportlab.platypus",
+    "google.generativeai",
+    "google.genai",
+]
+
+_IMPORT_SNIPPET = """
+import importlib, json, time
+t0 = time.perf_counter()
+importlib.import_module({mod!r})
+print(json.dumps({{"s": time.perf_counter() - t0}}))
+"""
+
+_RENDER_SNIPPET = """
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+at = AppTest.from_file({script!r}, default_timeout=120)
+at.secrets["GEMINI_API_KEY"] = ""
+at.run()
+t2 = time.perf_counter()
+heavy = {heavy!r}
+print(json.dumps({{
+    "import_streamlit_s": t1 - t0,
+    "first_render_s": t2 - t1,
+    "exceptions": [str(e.value) for e in at.exception],
+    "loaded": [m for m in heavy if m in sys.modules],
+}}))
+"""
+
+
+def _run(snippet: str, cwd: str) -> dict:
+    proc = subprocess.run([sys.executable, "-c", snippet], cwd=cwd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": (proc.stderr.strip().splitlines() or ["?"])[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _median(samples: list, field: str):
+    values = [s[field] for s in samples if field in s]
+    return statistics.median(values) if values else None
+
+
+def measure(tree: str, repeat: int) -> dict:
+    result = {"imports_s": {}, "apps": {}}
+    for mod in HEAVY:
+        samples = [_run(_IMPORT_SNIPPET.format(mod=mod), tree) for _ in range(repeat)]
+        result["imports_s"][mod] = _median(samples, "s") if any("s" in s for s in samples) else samples[0]
+    for script in ("app.py", "gptapp.py"):
+        snippet = _RENDER_SNIPPET.format(script=os.path.join(tree, script), heavy=HEAVY)
+        samples = [_run(snippet, tree) for _ in range(repeat)]
+        ok = [s for s in samples if "error" not in s]
+        if not ok:
+            result["apps"][script] = samples[0]
+            continue
+        result["apps"][script] = {
+            "first_render_s": _median(ok, "first_render_s"),
+            "import_streamlit_s": _median(ok, "import_streamlit_s"),
+            "loaded_after_first_render": ok[-1]["loaded"],
+            "exceptions": ok[-1]["exceptions"],
+        }
+    return result
+
+
+def export_rev(rev: str) -> str:
+    # Copia limpia de otra revisión (git archive) para medirla con el mismo intérprete
+    dest = tempfile.mkdtemp(prefix="claridad-startup-")
+    archive = subprocess.run(["git", "archive", rev], cwd=ROOT, capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(dest)
+    return dest
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Arranque en frío: imports pesados y primer render")
+    parser.add_argument("--rev", help="revisión git (SHA, HEAD~N…) a comparar con el árbol actual")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="ruta del JSON de resultados (por defecto, stdout)")
+    args = parser.parse_args(argv)
+
+    # El primer render escribe caché, historial y trazas: a un directorio desechable, no a los reales
+    tmp = tempfile.mkdtemp(prefix="claridad-startup-data-")
+    for var, nombre in (("CLARIDAD_CACHE_PATH", "cache.sqlite3"), ("CLARIDAD_STORE_PATH", "sesiones.sqlite3"),
+                        ("CLARIDAD_TRACE_PATH", "traces.jsonl"), ("CLARIDAD_SIMILAR_PATH", "ruedas_index.npz")):
+        os.environ[var] = os.path.join(tmp, nombre)
+
+    report = {"python": sys.version.split()[0], "current": measure(ROOT, args.repeat)}
+    if args.rev:
+        report[args.rev] = measure(export_rev(args.rev), args.repeat)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
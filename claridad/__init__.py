@@ -0,0 +1,8 @@
+# claridad — núcleo sin Streamlit compartido por app.py y gptapp.py
+#
+#   data        ruedas y cuestionario VAK 24
+#   scoring     puntuación VAK y canal predominante
+#   prompts     construcción de prompts (hipótesis, copiloto, diagnóstico, GROW)
+#   export      registro de sesión en PDF / TXT
+#   generation  backends Gemini (SDK diferido) + stream/generate con caché
+#   cache, clients, jobs, charts   infraestructura compartida
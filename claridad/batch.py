@@ -0,0 +1,84 @@
+# claridad/batch.py
+# PDFs en lote (un registro por participante) repartidos en un pool de procesos y escritos en un ZIP
+# según terminan. ReportLab es CPU puro: con procesos escala con los núcleos; con hilos no (GIL).
+#
+# Memoria acotada: nunca hay más de 2 × workers registros en vuelo, y cada PDF se escribe en el ZIP
+# (en disco) en cuanto llega. Los registros pueden venir de un generador (claridad.bulk.iter_records).
+
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from claridad.export import build_pdf, export_filename
+
+
+def _render_one(record: dict, fecha: str):
+    # En el proceso hijo: (nombre de archivo, PDF | None, error | None); un registro malo no tumba el lote
+    nombre = export_filename(record, "registro", "pdf")
+    try:
+        return nombre, build_pdf(record, fecha), None
+    except Exception as exc:
+        return nombre, None, f"{type(exc).__name__}: {exc}"
+
+
+class _ZipWriter:
+    def __init__(self, zf: zipfile.ZipFile):
+        self.zf = zf
+        self.nombres = set()
+        self.errores = []
+        self.escritos = 0
+
+    def add(self, nombre: str, pdf: bytes | None, error: str | None):
+        base, ext = os.path.splitext(nombre)
+        n = 1
+        while nombre in self.nombres:  # participantes homónimos: registro_Ana.pdf, registro_Ana_2.pdf…
+            n += 1
+            nombre = f"{base}_{n}{ext}"
+        self.nombres.add(nombre)
+        if error is not None:
+            self.errores.append(f"{nombre}: {error}")
+            return
+        # ZIP_STORED: el PDF ya va comprimido, desinflarlo otra vez solo gasta CPU
+        self.zf.writestr(nombre, pdf, compress_type=zipfile.ZIP_STORED)
+        self.escritos += 1
+
+    def close(self):
+        if self.errores:
+            self.zf.writestr("errores.txt", "\n".join(self.errores) + "\n", compress_type=zipfile.ZIP_DEFLATED)
+
+
+def build_pdf_zip(records, out, fecha: str, workers: int | None = None, progress=None) -> dict:
+    # out: ruta o fichero binario del ZIP; progress(hechos) tras cada PDF. workers=1 → en este proceso.
+    workers = workers or os.cpu_count() or 2
+    with zipfile.ZipFile(out, "w") as zf:
+        writer = _ZipWriter(zf)
+        if workers == 1:
+            for record in records:
+                writer.add(*_render_one(record, fecha))
+                if progress is not None:
+                    progress(writer.escritos + len(writer.errores))
+        else:
+            # spawn: el servidor de Streamlit tiene hilos vivos y fork los copiaría a medias
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                registros = iter(records)
+                pendientes = set()
+
+                def lanzar():
+                    for record in registros:
+                        pendientes.add(pool.submit(_render_one, record, fecha))
+                        if len(pendientes) >= 2 * workers:
+                            return
+
+                lanzar()
+                while pendientes:
+                    listos, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+                    for futuro in listos:
+                        pendientes.discard(futuro)
+                        writer.add(*futuro.result())
+                        if progress is not None:
+                            progress(writer.escritos + len(writer.errores))
+                    lanzar()
+        writer.close()
+    return {"pdfs": writer.escritos, "errores": len(writer.errores)}
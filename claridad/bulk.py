@@ -0,0 +1,311 @@
+# claridad/bulk.py
+# Importación masiva para talleres: ruedas y respuestas VAK 24 desde CSV/XLSX, validadas contra
+# ruedas_data y VAK_ITEMS, puntuadas por bloques con numpy y resumidas por cohorte.
+#
+# Formato (una fila por participante; cabeceras sin distinguir mayúsculas):
+#   participante, area, v1..v8 (puntuaciones 1–10 en el orden de ruedas_data[area]), vak1..vak24 (V/A/C)
+# La rueda o el VAK pueden ir vacíos (fila solo de VAK o solo de rueda), pero no a medias.
+#
+# Streaming: el fichero se lee por bloques de CHUNK_ROWS filas; solo se acumulan sumas por área y
+# canal, así que 100k filas no se materializan en memoria. Las filas puntuadas pueden escribirse a un
+# fichero de salida según se procesan.
+
+import csv
+import io
+
+from claridad.data import CANALES, VAK_ITEMS, ruedas_data
+
+CHUNK_ROWS = 5000
+N_VECTORES = 8
+MAX_ERRORES = 200  # se cuentan todos, se guardan los primeros
+
+RUEDA_COLUMNS = [f"v{i}" for i in range(1, N_VECTORES + 1)]
+VAK_COLUMNS = [f"vak{i}" for i in range(1, len(VAK_ITEMS) + 1)]
+TEMPLATE_HEADER = ["participante", "area", *RUEDA_COLUMNS, *VAK_COLUMNS]
+SCORED_HEADER = ["fila", "participante", "area", "media_rueda", "vector_mas_bajo", "V", "A", "C", "predominante"]
+
+# Respuesta VAK escrita a mano → canal (inicial; K de kinestésico = C)
+_CANAL_POR_INICIAL = {"V": 0, "A": 1, "C": 2, "K": 2}
+
+
+def template_csv() -> bytes:
+    return (",".join(TEMPLATE_HEADER) + "\n").encode("utf-8")
+
+
+def read_chunks(fileobj, filename: str, chunk_rows: int = CHUNK_ROWS):
+    # (número de la primera fila de datos, cabecera, [filas como listas de str]) por bloque
+    texto = None
+    try:
+        if filename.lower().endswith((".xlsx", ".xlsm")):
+            filas = _xlsx_rows(fileobj)
+        else:
+            texto = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+            muestra = texto.read(4096)
+            texto.seek(0)
+            try:
+                dialecto = csv.Sniffer().sniff(muestra, delimiters=",;\t")  # Excel en español exporta con ';'
+            except csv.Error:
+                dialecto = csv.excel
+            filas = csv.reader(texto, dialecto)
+        header = [str(c).strip().casefold() for c in next(filas, [])]
+        bloque, inicio = [], 2  # fila 1 = cabecera
+        for fila in filas:
+            bloque.append(fila)
+            if len(bloque) == chunk_rows:
+                yield inicio, header, bloque
+                inicio += len(bloque)
+                bloque = []
+        if bloque:
+            yield inicio, header, bloque
+    finally:
+        if texto is not None:
+            texto.detach()  # el archivo es del llamador: el wrapper no lo cierra al recolectarse
+
+
+def _xlsx_rows(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:  # dependencia opcional, solo para .xlsx
+        raise RuntimeError("Para importar .xlsx instala openpyxl (pip install openpyxl) o exporta a CSV.") from exc
+    libro = load_workbook(fileobj, read_only=True, data_only=True)  # read_only: filas bajo demanda
+    try:
+        for fila in libro.active.iter_rows(values_only=True):
+            yield ["" if c is None else str(c) for c in fila]
+    finally:
+        libro.close()
+
+
+def _columns(header: list, nombres: list) -> list | None:
+    try:
+        return [header.index(n) for n in nombres]
+    except ValueError:
+        return None
+
+
+def _cells(filas: list, indices: list):
+    import numpy as np
+
+    ancho = max(indices) + 1
+    return np.array([(f + [""] * (ancho - len(f)))[:ancho] for f in filas], dtype=str)[:, indices]
+
+
+def _to_float(celdas):
+    # Conversión vectorizada; si el bloque trae texto no numérico, celda a celda (NaN = no válido)
+    import numpy as np
+
+    limpias = np.char.strip(celdas)
+    limpias = np.where(limpias == "", "nan", np.char.replace(limpias, ",", "."))
+    try:
+        return limpias.astype(np.float64)
+    except ValueError:
+        def parse(c):
+            try:
+                return float(c)
+            except ValueError:
+                return np.nan
+
+        return np.vectorize(parse, otypes=[np.float64])(limpias)
+
+
+def _areas(celdas):
+    # Nombre de área tolerante a mayúsculas y espacios → nombre canónico de ruedas_data (una búsqueda por valor distinto)
+    import numpy as np
+
+    canonicas = {" ".join(a.split()).casefold(): a for a in ruedas_data}
+    distintas, inversa = np.unique(celdas, return_inverse=True)
+    return np.array([canonicas.get(" ".join(a.split()).casefold(), a) for a in distintas], dtype=str)[inversa]
+
+
+class CohortSummary:
+    """Sumas por área (rueda) y por canal (VAK) acumuladas bloque a bloque."""
+
+    def __init__(self):
+        self.filas = 0
+        self.validas = 0
+        self.errores = []
+        self.n_errores = 0
+        self._ruedas = {}  # área → {"n", "suma", "suma2", "min", "max"}
+        self.vak_n = 0
+        self.vak_suma = None
+        self.predominantes = None
+
+    def error(self, fila: int, motivo: str):
+        self.n_errores += 1
+        if len(self.errores) < MAX_ERRORES:
+            self.errores.append({"fila": fila, "motivo": motivo})
+
+    def add_ruedas(self, area: str, valores):
+        import numpy as np
+
+        acc = self._ruedas.get(area)
+        if acc is None:
+            acc = self._ruedas[area] = {"n": 0, "suma": np.zeros(N_VECTORES), "suma2": np.zeros(N_VECTORES),
+                                        "min": np.full(N_VECTORES, np.inf), "max": np.full(N_VECTORES, -np.inf)}
+        acc["n"] += len(valores)
+        acc["suma"] += valores.sum(axis=0)
+        acc["suma2"] += (valores ** 2).sum(axis=0)
+        acc["min"] = np.minimum(acc["min"], valores.min(axis=0))
+        acc["max"] = np.maximum(acc["max"], valores.max(axis=0))
+
+    def add_vak(self, totales):
+        import numpy as np
+
+        if self.vak_suma is None:
+            self.vak_suma = np.zeros(3)
+            self.predominantes = np.zeros(3, dtype=np.int64)
+        self.vak_n += len(totales)
+        self.vak_suma += totales.sum(axis=0)
+        self.predominantes += np.bincount(totales.argmax(axis=1), minlength=3)
+
+    def areas(self) -> list:
+        return list(self._ruedas)
+
+    def area_table(self, area: str) -> list:
+        # Una fila por vector: media, desviación típica, mínimo y máximo de la cohorte
+        import numpy as np
+
+        acc = self._ruedas[area]
+        media = acc["suma"] / acc["n"]
+        std = np.sqrt(np.maximum(acc["suma2"] / acc["n"] - media ** 2, 0))
+        return [
+            {"Vector": v, "Media": round(float(media[i]), 2), "Desv.": round(float(std[i]), 2),
+             "Mín.": int(acc["min"][i]), "Máx.": int(acc["max"][i])}
+            for i, v in enumerate(ruedas_data[area])
+        ]
+
+    def overview(self) -> list:
+        # Una fila por área: participantes, media global y vector más bajo de la cohorte
+        filas = []
+        for area, acc in self._ruedas.items():
+            media = acc["suma"] / acc["n"]
+            filas.append({"Área": area, "Participantes": acc["n"], "Media": round(float(media.mean()), 2),
+                          "Vector más bajo": ruedas_data[area][int(media.argmin())]})
+        return filas
+
+    def vak_table(self) -> list:
+        if not self.vak_n:
+            return []
+        return [
+            {"Canal": CANALES[c], "Media": round(float(self.vak_suma[i] / self.vak_n), 2),
+             "Predominante (n)": int(self.predominantes[i]),
+             "Predominante (%)": round(100 * float(self.predominantes[i]) / self.vak_n, 1)}
+            for i, c in enumerate("VAC")
+        ]
+
+
+def score_chunk(inicio: int, header: list, filas: list, summary: CohortSummary, writer=None,
+                records: list | None = None, base: dict | None = None):
+    # Valida y puntúa un bloque entero con numpy; las filas con errores se cuentan y se saltan.
+    # records (opcional) recibe un registro de sesión por fila válida (SESSION_FIELDS, sobre `base`)
+    import numpy as np
+
+    m = len(filas)
+    summary.filas += m
+    num = np.arange(inicio, inicio + m)
+    col_area = _columns(header, ["area"])
+    col_part = _columns(header, ["participante"])
+    col_rueda = _columns(header, RUEDA_COLUMNS)
+    col_vak = _columns(header, VAK_COLUMNS)
+    if col_rueda is None and col_vak is None:
+        for n in num:
+            summary.error(int(n), "sin columnas v1..v8 ni vak1..vak24")
+        return
+
+    ok = np.ones(m, dtype=bool)
+    participantes = _cells(filas, col_part)[:, 0] if col_part else np.array([""] * m)
+
+    # Rueda: 8 enteros 1–10 y un área de ruedas_data (o la rueda entera vacía)
+    con_rueda = np.zeros(m, dtype=bool)
+    if col_rueda is not None:
+        valores = _to_float(_cells(filas, col_rueda))
+        areas = _areas(_cells(filas, col_area)[:, 0]) if col_area else np.array([""] * m)
+        vacia = np.isnan(valores).all(axis=1)
+        completa = ~np.isnan(valores).any(axis=1)
+        en_rango = completa & (np.nan_to_num(valores) >= 1).all(axis=1) & (np.nan_to_num(valores) <= 10).all(axis=1)
+        enteros = completa & (np.nan_to_num(valores) == np.round(np.nan_to_num(valores))).all(axis=1)
+        area_ok = np.isin(areas, list(ruedas_data))
+        con_rueda = ~vacia
+        mala = con_rueda & ~(en_rango & enteros & area_ok)
+        for i in np.flatnonzero(mala):
+            motivo = ("área desconocida" if not area_ok[i] else
+                      "rueda incompleta" if not completa[i] else "puntuaciones fuera de 1–10 o no enteras")
+            summary.error(int(num[i]), motivo)
+        ok &= ~mala
+
+    # VAK: 24 respuestas V/A/C (o todas vacías); totales por canal en una sola operación
+    con_vak = np.zeros(m, dtype=bool)
+    totales = np.zeros((m, 3), dtype=np.int64)
+    if col_vak is not None:
+        # astype("<U1") se queda con la inicial: "Visual", "v", "Cinestésico" → V, V, C
+        iniciales = np.char.upper(np.char.strip(_cells(filas, col_vak))).astype("<U1")
+        codigos = np.full(iniciales.shape, -1, dtype=np.int64)
+        for letra, canal in _CANAL_POR_INICIAL.items():
+            codigos[iniciales == letra] = canal
+        vacio = (iniciales == "").all(axis=1)
+        con_vak = ~vacio
+        mala = con_vak & (codigos < 0).any(axis=1)
+        for i in np.flatnonzero(mala & ok):
+            summary.error(int(num[i]), "respuestas VAK incompletas o distintas de V/A/C")
+        ok &= ~mala
+        totales = (codigos[:, :, None] == np.arange(3)).sum(axis=1)
+
+    ok &= con_rueda | con_vak
+    for i in np.flatnonzero(~(con_rueda | con_vak)):
+        summary.error(int(num[i]), "fila vacía")
+    summary.validas += int(ok.sum())
+
+    if col_rueda is not None:
+        sel = ok & con_rueda
+        for area in np.unique(areas[sel]):
+            summary.add_ruedas(str(area), valores[sel & (areas == area)])
+    if col_vak is not None and (ok & con_vak).any():
+        summary.add_vak(totales[ok & con_vak])
+
+    if writer is not None:
+        for i in np.flatnonzero(ok):
+            rueda_i = con_rueda[i]
+            vak_i = con_vak[i]
+            writer.writerow([
+                int(num[i]),
+                participantes[i],
+                areas[i] if rueda_i else "",
+                round(float(valores[i].mean()), 2) if rueda_i else "",
+                ruedas_data[str(areas[i])][int(valores[i].argmin())] if rueda_i else "",
+                *(totales[i].tolist() if vak_i else ["", "", ""]),
+                "VAC"[int(totales[i].argmax())] if vak_i else "",
+            ])
+
+    if records is not None:
+        for i in np.flatnonzero(ok):
+            record = {**(base or {}), "nombre_cliente": str(participantes[i]) or f"fila {int(num[i])}",
+                      "datos_rueda": None, "diagnostico_generado": None, "puntos_vak": None, "chat_hist": []}
+            if con_rueda[i]:
+                area = str(areas[i])
+                record["datos_rueda"] = {"area": area, "vectores": ruedas_data[area],
+                                         "valores": [int(x) for x in valores[i]]}
+            if con_vak[i]:
+                record["puntos_vak"] = dict(zip("VAC", totales[i].tolist()))
+            records.append(record)
+
+
+def iter_records(fileobj, filename: str, base: dict | None = None, chunk_rows: int = CHUNK_ROWS):
+    # Registros de sesión de las filas válidas, bloque a bloque (para claridad.batch.build_pdf_zip)
+    summary = CohortSummary()
+    for inicio, header, filas in read_chunks(fileobj, filename, chunk_rows):
+        registros = []
+        score_chunk(inicio, header, filas, summary, records=registros, base=base)
+        yield from registros
+
+
+def import_file(fileobj, filename: str, out=None, chunk_rows: int = CHUNK_ROWS, progress=None) -> CohortSummary:
+    # out: fichero de texto para las filas puntuadas (CSV); progress(filas_leidas) tras cada bloque
+    summary = CohortSummary()
+    writer = None
+    if out is not None:
+        writer = csv.writer(out)
+        writer.writerow(SCORED_HEADER)
+    for inicio, header, filas in read_chunks(fileobj, filename, chunk_rows):
+        score_chunk(inicio, header, filas, summary, writer)
+        if progress is not None:
+            progress(summary.filas)
+    return summary
@@ -0,0 +1,140 @@
+# claridad/cache.py
+# Caché de respuestas LLM en disco (SQLite en modo WAL), compartida por todos los procesos de Streamlit.
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.environ.get(
+    "CLARIDAD_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "llm_cache.sqlite3"),
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key        TEXT PRIMARY KEY,
+    model      TEXT NOT NULL,
+    response   TEXT NOT NULL,
+    size       INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used);
+CREATE TABLE IF NOT EXISTS counters (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO counters(name, value) VALUES ('hits', 0), ('misses', 0);
+"""
+
+
+def normalize_prompt(prompt: str) -> str:
+    # Los prompts salen de f-strings: la indentación y los espacios sobrantes no deben cambiar la clave.
+    return "\n".join(" ".join(line.split()) for line in prompt.strip().splitlines())
+
+
+def cache_key(model: str, prompt: str) -> str:
+    payload = json.dumps({"model": model, "prompt": normalize_prompt(prompt)}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Respuestas por (modelo, prompt) con caducidad (TTL) y expulsión LRU por número de entradas y bytes."""
+
+    def __init__(self, path: str = DEFAULT_PATH, ttl: float = 7 * 24 * 3600, max_entries: int = 2000,
+                 max_bytes: int = 20 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # Una conexión por hilo: sqlite3 no comparte conexiones entre hilos de forma segura.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str) -> None:
+        self._conn().execute("UPDATE counters SET value = value + 1 WHERE name = ?", (name,))
+
+    def get(self, model: str, prompt: str):
+        conn = self._conn()
+        key = cache_key(model, prompt)
+        now = time.time()
+        row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or now - row[1] > self.ttl:
+            if row is not None:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._count("misses")
+            return None
+        conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        self._count("hits")
+        return row[0]
+
+    def put(self, model: str, prompt: str, response: str) -> None:
+        if not response:
+            return
+        conn = self._conn()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses(key, model, response, size, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+            (cache_key(model, prompt), model, response, len(response.encode("utf-8")), now, now),
+        )
+        self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        conn.execute(
+            "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        conn.execute(
+            """
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (ORDER BY last_used DESC) AS acumulado FROM responses
+                ) WHERE acumulado > ?
+            )
+            """,
+            (self.max_bytes,),
+        )
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"hits": counters.get("hits", 0), "misses": counters.get("misses", 0), "entries": entries, "bytes": size}
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM responses")
+
+
+def cached_stream(cache, model: str, prompt: str, stream_fn, force: bool = False, info: dict | None = None):
+    # Acierto: la respuesta entera en un solo fragmento. Fallo: se reenvía el stream y se guarda al completarse.
+    # info (opcional) recibe cache_hit para las trazas.
+    if cache is not None and not force:
+        hit = cache.get(model, prompt)
+        if hit is not None:
+            if info is not None:
+                info["cache_hit"] = True
+            yield hit
+            return
+    if info is not None:
+        info["cache_hit"] = False
+    partes = []
+    for parte in stream_fn(prompt):
+        partes.append(parte)
+        yield parte
+    if cache is not None:
+        cache.put(model, prompt, "".join(partes))
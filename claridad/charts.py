@@ -0,0 +1,77 @@
+# claridad/charts.py
+# Radar de la rueda con la API orientada a objetos de matplotlib (Agg, sin estado global de pyplot).
+# Las imágenes se memorizan en un LRU acotado por (área, vectores, valores, superpuestas, tema, formato).
+
+import io
+import threading
+from collections import OrderedDict
+
+THEMES = {
+    # app.py (BeCoach)
+    "becoach": {"figsize": (6.4, 6.4), "linewidth": 2, "alpha": 0.18, "label_size": 9, "label_weight": "bold"},
+    # gptapp.py (Hathora)
+    "hathora": {"figsize": (7, 7), "linewidth": 1.5, "alpha": 0.3, "label_size": 10, "label_weight": "normal"},
+}
+
+MAX_ENTRIES = 256
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+# matplotlib no es thread-safe (caché de fuentes FreeType compartida): el render se serializa,
+# los aciertos de caché no esperan.
+_render_lock = threading.Lock()
+
+
+def _draw(vectores, valores, theme: str, fmt: str, overlay=()) -> bytes:
+    # Importación diferida: matplotlib solo se carga cuando se dibuja el primer radar.
+    import numpy as np
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    t = THEMES[theme]
+    fig = Figure(figsize=t["figsize"])
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(polar=True)
+    ax.set_theta_offset(np.pi / 2)
+    ax.set_theta_direction(-1)
+
+    angulos = np.linspace(0, 2 * np.pi, len(vectores), endpoint=False)
+    cerrado_x = np.append(angulos, angulos[0])
+    cerrado_y = list(valores) + [valores[0]]
+    ax.set_xticks(angulos)
+    ax.set_xticklabels(vectores, size=t["label_size"], weight=t["label_weight"])
+    # Series anteriores (p. ej. primera sesión, media histórica) en trazo discontinuo, debajo de la actual
+    for etiqueta, previos in overlay:
+        ax.plot(cerrado_x, list(previos) + [previos[0]], linewidth=t["linewidth"] * 0.75, linestyle="--",
+                label=etiqueta)
+    ax.plot(cerrado_x, cerrado_y, linewidth=t["linewidth"], label="Actual" if overlay else None)
+    ax.fill(cerrado_x, cerrado_y, alpha=t["alpha"])
+    if overlay:
+        ax.legend(loc="upper right", bbox_to_anchor=(1.25, 1.1), fontsize=t["label_size"])
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, bbox_inches="tight")
+    return buf.getvalue()
+
+
+def render_radar(area: str, vectores, valores, theme: str = "becoach", fmt: str = "png", overlay=None) -> bytes:
+    # overlay: [(etiqueta, valores)] a superponer (vista longitudinal: pasado vs. actual)
+    overlay = tuple((etiqueta, tuple(round(float(v), 1) for v in vals)) for etiqueta, vals in overlay or ())
+    key = (area, tuple(vectores), tuple(int(v) for v in valores), overlay, theme, fmt)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    with _render_lock:
+        data = _draw(key[1], key[2], theme, fmt, overlay)
+    with _cache_lock:
+        _cache[key] = data
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return data
+
+
+def cache_info() -> dict:
+    with _cache_lock:
+        return {"entries": len(_cache), "max_entries": MAX_ENTRIES}
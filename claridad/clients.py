@@ -0,0 +1,25 @@
+# claridad/clients.py
+# Un cliente Gemini por proceso: se construye una vez por clave y se reutiliza (conexiones gRPC/httpx vivas).
+
+import threading
+
+
+class ClientProvider:
+    """Devuelve siempre el mismo cliente mientras la clave no cambie; si rota, lo reconstruye una sola vez."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._current = (None, None)  # (api_key, cliente): se reemplaza entero, la lectura es atómica
+
+    def get(self, api_key: str):
+        key, client = self._current
+        if client is not None and key == api_key:
+            return client
+        with self._lock:
+            key, client = self._current
+            if client is None or key != api_key:
+                # El cliente anterior no se cierra: puede haber llamadas en curso de otras sesiones.
+                client = self._factory(api_key)
+                self._current = (api_key, client)
+            return client
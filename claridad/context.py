@@ -0,0 +1,93 @@
+# claridad/context.py
+# Memoria acotada del Copiloto: últimos turnos literales + resumen acumulado de los anteriores,
+# dentro de un presupuesto de tokens por prompt (el tamaño del prompt no crece con la sesión).
+#
+# El resumen es extractivo y se actualiza de forma incremental: cada mensaje que sale de la ventana
+# literal se reduce a una línea una sola vez; si el resumen supera su presupuesto se descartan las
+# líneas más antiguas.
+
+from claridad.throttle import estimate_tokens
+
+# Secciones de la salida del Copiloto que se conservan en el resumen
+_MARCAS_COPILOTO = (("❓", "preguntó"), ("✅", "tarea"))
+
+
+def _linea(texto: str, max_chars: int) -> str:
+    texto = " ".join(texto.split())
+    return texto if len(texto) <= max_chars else texto[: max_chars - 1] + "…"
+
+
+def summarize_message(msg: dict, max_chars: int = 160) -> str:
+    if msg["role"] == "user":
+        return "Cliente: " + _linea(msg["content"], max_chars)
+    partes = []
+    for marca, etiqueta in _MARCAS_COPILOTO:
+        linea = next((l for l in msg["content"].splitlines() if marca in l), None)
+        if linea is not None:
+            # "❓ PREGUNTA SIGUIENTE: ¿…?" → "¿…?"
+            cuerpo = linea.split(marca, 1)[1]
+            cuerpo = cuerpo.split(":", 1)[1] if ":" in cuerpo else cuerpo
+            partes.append(f"{etiqueta} {_linea(cuerpo.strip(' *-'), max_chars // 2)}")
+    if not partes:
+        partes.append(_linea(msg["content"], max_chars))
+    return "Copiloto: " + " · ".join(partes)
+
+
+class CopilotoContext:
+    """Por sesión (st.session_state): recuerda hasta dónde ha resumido para no reprocesar el historial."""
+
+    def __init__(self, budget_tokens: int = 1200, recent_turns: int = 4, summary_tokens: int = 400):
+        self.budget_tokens = budget_tokens
+        self.recent_turns = recent_turns
+        self.summary_tokens = summary_tokens
+        self._reset()
+
+    def _reset(self):
+        self._resumidos = 0      # mensajes del historial ya convertidos en líneas de resumen
+        self._firma = None       # último mensaje resumido: detecta historiales reescritos o limpiados
+        self._lineas = []
+        self._omitidas = 0
+
+    def _fold(self, chat_hist: list, hasta: int):
+        if hasta <= self._resumidos:  # nada nuevo que resumir (y nunca un índice negativo en el slice)
+            return
+        for msg in chat_hist[self._resumidos:hasta]:
+            self._lineas.append(summarize_message(msg))
+        self._resumidos = hasta
+        if self._resumidos:
+            self._firma = (chat_hist[self._resumidos - 1]["role"], chat_hist[self._resumidos - 1]["content"])
+        while self._lineas and estimate_tokens("\n".join(self._lineas)) > self.summary_tokens:
+            self._lineas.pop(0)
+            self._omitidas += 1
+
+    def summary(self) -> str:
+        cabecera = [f"(… {self._omitidas} intervenciones anteriores omitidas)"] if self._omitidas else []
+        return "\n".join(cabecera + self._lineas)
+
+    def render(self, chat_hist: list) -> str:
+        # chat_hist sin el mensaje actual del cliente (ese va aparte en el prompt)
+        if self._resumidos and (
+            len(chat_hist) < self._resumidos
+            or (chat_hist[self._resumidos - 1]["role"], chat_hist[self._resumidos - 1]["content"]) != self._firma
+        ):
+            self._reset()
+        self._fold(chat_hist, max(0, len(chat_hist) - self.recent_turns))
+
+        # Ventana literal: si no cabe con el resumen, sus mensajes más antiguos pasan al resumen
+        def literal():
+            return "\n".join(
+                f"{'Cliente' if m['role'] == 'user' else 'Copiloto'}: {m['content']}"
+                for m in chat_hist[self._resumidos:]
+            )
+
+        while self._resumidos < len(chat_hist) and (
+            estimate_tokens(self.summary()) + estimate_tokens(literal()) > self.budget_tokens
+        ):
+            self._fold(chat_hist, self._resumidos + 1)
+
+        bloques = []
+        if self.summary():
+            bloques.append("Resumen de la sesión hasta ahora:\n" + self.summary())
+        if self._resumidos < len(chat_hist):
+            bloques.append("Últimos turnos:\n" + literal())
+        return "\n\n".join(bloques)
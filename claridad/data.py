@@ -0,0 +1,206 @@
+# claridad/data.py
+# Datos de las herramientas: ruedas (vectores por área) y cuestionario VAK 24.
+
+# -------------------------
+# DATA: RUEDAS
+# -------------------------
+ruedas_data = {
+    "0. MAPA GENERAL (Macro)": ["Salud", "Economía", "Trabajo", "Des. Personal", "Familia", "Amor", "Amistad", "Diversión"],
+    "2.1 SALUD": ["Sueño", "Nutrición", "Energía", "Movimiento", "Estrés", "Prevención", "Escucha Corporal", "Rutinas"],
+    "2.2 ECONOMÍA": ["Ingresos", "Ahorro", "Deudas", "Control Gasto", "Relación Dinero", "Edu. Finan.", "Extras", "Seguridad"],
+    "2.3 TRABAJO": ["Claridad", "Productividad", "Satisfacción", "Progresión", "Clima", "Autonomía", "Propósito", "Reconocimiento"],
+    "2.4 DESARROLLO PERSONAL": ["Autoconocimiento", "Emociones", "Disciplina", "Narrativa", "Aprendizaje", "Valores", "Adaptación", "Evolución"],
+    "2.5 FAMILIA": ["Comunicación", "Tiempo", "Apoyo", "Conflictos", "Límites", "Responsabilidad", "Presencia", "Unión"],
+    "2.6 AMOR": ["Comunicación", "Intimidad", "Confianza", "Proyecto", "Conflictos", "Espacio", "Afecto", "Satisfacción"],
+    "2.7 AMISTAD": ["Cantidad", "Profundidad", "Confianza", "Apoyo", "Diversidad", "Influencia", "Frecuencia", "Pertenencia"],
+    "2.8 DIVERSIÓN": ["Tiempo", "Desconexión", "Placer", "Creatividad", "Juego", "Variedad", "Entorno", "Culpa"],
+}
+
+# -------------------------
+# DATA: VAK 24 (escena + V/A/C)
+# -------------------------
+VAK_ITEMS = [
+    {
+        "titulo": "Instrucciones",
+        "escena": "Debes ensamblar un objeto o aprender un proceso técnico nuevo (sin ayuda). ¿Qué te facilita más hacerlo bien?",
+        "V": "Ver un diagrama/video paso a paso y una lista visual de piezas.",
+        "A": "Escuchar una explicación clara o que alguien me lo explique en voz alta.",
+        "C": "Probar con las manos, ajustar sobre la marcha y aprender haciendo.",
+    },
+    {
+        "titulo": "Orientación",
+        "escena": "Estás en una zona desconocida y necesitas llegar a una dirección sin perder tiempo.",
+        "V": "Un mapa/referencias visuales (edificios, colores, formas) para ubicarme.",
+        "A": "Indicaciones verbales (izquierda/derecha) o preguntar y repetir la ruta.",
+        "C": "Caminar un tramo, sentir si voy bien y corregir por intuición de recorrido.",
+    },
+    {
+        "titulo": "Distracción",
+        "escena": "Estás trabajando concentrado y algo te interrumpe. ¿Qué te saca más de foco?",
+        "V": "Movimiento, pantallas, notificaciones, desorden visual.",
+        "A": "Ruidos, conversaciones cerca, sonidos repetitivos.",
+        "C": "Incomodidad física, hambre, tensión corporal, ganas de moverme.",
+    },
+    {
+        "titulo": "Memoria de Viajes",
+        "escena": "Piensas en unas vacaciones pasadas. ¿Qué se te viene primero a la mente?",
+        "V": "Imágenes del lugar, paisajes, fotos mentales de escenas.",
+        "A": "Música/sonidos del sitio o conversaciones que recuerdo.",
+        "C": "Sensaciones: clima, olor, energía del lugar, cómo me sentía.",
+    },
+    {
+        "titulo": "Comunicación",
+        "escena": "Necesitas contactar a alguien y recibir info importante. ¿Qué prefieres?",
+        "V": "Mensaje escrito con puntos claros o un resumen visual.",
+        "A": "Llamada/nota de voz para captar matices rápido.",
+        "C": "Hablar en persona o una interacción que ‘se sienta’ directa.",
+    },
+    {
+        "titulo": "Resolución de Problemas",
+        "escena": "Un aparato no funciona. ¿Qué haces primero?",
+        "V": "Busco manual/video/foros; reviso pasos y señales visibles.",
+        "A": "Pregunto a alguien o escucho una explicación de qué revisar.",
+        "C": "Toco, pruebo, reinicio, hago tests físicos y ajusto.",
+    },
+    {
+        "titulo": "Conferencia / Clase",
+        "escena": "Sales de una clase y mañana te evaluarán. ¿Cómo retienes mejor lo escuchado?",
+        "V": "Recuerdo diapositivas, títulos, gráficos y estructura.",
+        "A": "Recuerdo frases, ejemplos y el tono del docente.",
+        "C": "Recuerdo lo que me hizo sentir y lo que ‘me quedó en el cuerpo’.",
+    },
+    {
+        "titulo": "Nuevas Adquisiciones",
+        "escena": "Vas a comprar un gadget (móvil, reloj, auriculares). ¿Qué te decide más?",
+        "V": "Comparativas, specs, reviews con imágenes y tablas.",
+        "A": "Recomendación de alguien o reseñas que expliquen bien el uso.",
+        "C": "Probarlo en mano: peso, tacto, comodidad, sensación real.",
+    },
+    {
+        "titulo": "Tiempo Libre",
+        "escena": "Tienes una tarde libre. ¿Qué actividad te recarga más?",
+        "V": "Ver algo (serie, fotos, museo) o crear algo visual.",
+        "A": "Música, podcast, conversar, escuchar algo que me active.",
+        "C": "Moverme: caminar, deporte, cocinar, actividades físicas.",
+    },
+    {
+        "titulo": "Memoria de Personas",
+        "escena": "Conoces a alguien nuevo. ¿Qué recuerdas primero de esa persona?",
+        "V": "Cara, gestos, ropa, mirada, detalles visuales.",
+        "A": "Nombre, voz, forma de hablar, frases que dijo.",
+        "C": "Energía, vibra, apretón de manos, cómo me hizo sentir.",
+    },
+    {
+        "titulo": "Predicados Verbales",
+        "escena": "Sin pensarlo, ¿qué tipo de frases te salen más al hablar?",
+        "V": "“Veo claro”, “me enfoca”, “se nota”, “imagina esto”.",
+        "A": "“Suena bien”, “dime”, “escucha”, “eso no me cuadra”.",
+        "C": "“Siento que”, “me pesa”, “me mueve”, “no me encaja”.",
+    },
+    {
+        "titulo": "Concentración",
+        "escena": "¿Qué ambiente te ayuda más a rendir intelectualmente?",
+        "V": "Orden, buena luz, escritorio limpio, cero estímulos visuales.",
+        "A": "Silencio o sonido controlado (música específica).",
+        "C": "Comodidad física: postura, temperatura, pausas de movimiento.",
+    },
+    {
+        "titulo": "Manejo de Estrés",
+        "escena": "Surge una crisis/urgencia. ¿Qué te calma y te activa mejor?",
+        "V": "Ver el plan por escrito y ordenar prioridades en una lista.",
+        "A": "Hablarlo para aclarar y escuchar un plan directo.",
+        "C": "Respirar, moverme y ejecutar una primera acción inmediata.",
+    },
+    {
+        "titulo": "Aprendizaje de Software",
+        "escena": "Abres una app nueva. ¿Cómo aprendes más rápido?",
+        "V": "Exploro menús y miro tutoriales/guías visuales.",
+        "A": "Sigo instrucciones narradas o alguien me explica.",
+        "C": "Toco botones, ensayo-error y aprendo por uso.",
+    },
+    {
+        "titulo": "Habilidades Sociales",
+        "escena": "¿Qué genera confianza o ‘clic’ con un desconocido?",
+        "V": "Su mirada/gestos coherentes y cómo se presenta visualmente.",
+        "A": "Su tono, forma de hablar y claridad al comunicarse.",
+        "C": "La energía que transmite y cómo me hace sentir en el momento.",
+    },
+    {
+        "titulo": "Recepción de Feedback",
+        "escena": "Te van a evaluar desempeño. ¿Cómo prefieres recibir feedback?",
+        "V": "Documento con puntos, ejemplos y plan de mejora.",
+        "A": "Conversación directa (llamada) con explicaciones claras.",
+        "C": "Práctico: demo, acompañamiento, hacerlo juntos y corregir.",
+    },
+    {
+        "titulo": "Descanso Mental",
+        "escena": "Tras un día agotador, ¿qué te desconecta mejor?",
+        "V": "Contenido visual ligero o algo creativo visual.",
+        "A": "Música/podcast/charla que me relaje.",
+        "C": "Ducha, caminata, estiramientos, descanso físico real.",
+    },
+    {
+        "titulo": "Memoria de Corto Plazo",
+        "escena": "Te dictan un número (teléfono/código) una vez. ¿Qué haces para retenerlo?",
+        "V": "Lo visualizo escrito o lo ‘veo’ en mi mente.",
+        "A": "Lo repito en voz baja varias veces.",
+        "C": "Lo marco con dedos/ritmo o lo asocio a una acción/sensación.",
+    },
+    {
+        "titulo": "Decisión de Compra (Ropa)",
+        "escena": "Estás en el probador. ¿Qué define si compras la prenda?",
+        "V": "Cómo se ve: corte, color, estilo, espejo.",
+        "A": "Opinión de alguien o explicación de calidad/marca.",
+        "C": "Cómo se siente: tela, comodidad, libertad de movimiento.",
+    },
+    {
+        "titulo": "Proyectos en Grupo",
+        "escena": "En un trabajo en equipo, ¿qué rol asumes naturalmente?",
+        "V": "Organizo estructura, tableros, planificación visual.",
+        "A": "Coordino comunicación, alineo conversaciones, sintetizo acuerdos.",
+        "C": "Ejecuto tareas, destrabo acciones, pongo el cuerpo al trabajo.",
+    },
+    {
+        "titulo": "Lectura de Placer",
+        "escena": "Cuando lees por placer, ¿qué disfrutas más?",
+        "V": "Descripciones, escenas, ideas que puedo visualizar.",
+        "A": "El ritmo del texto, diálogos, ‘voz’ del autor.",
+        "C": "La emoción/impacto que me deja, cómo me transforma.",
+    },
+    {
+        "titulo": "Seguridad / Confort",
+        "escena": "Llegas a un lugar nuevo. ¿Qué te da sensación de bienestar?",
+        "V": "Ver la disposición del espacio, salidas, orden y claridad.",
+        "A": "Escuchar el ambiente: volumen, tono, si hay ruido agradable.",
+        "C": "Sentir el lugar: temperatura, comodidad, energía.",
+    },
+    {
+        "titulo": "Transmisión de Conocimiento",
+        "escena": "Tienes que explicar algo complejo a otra persona. ¿Cómo lo haces mejor?",
+        "V": "Con un esquema/dibujo y pasos en pizarra/pantalla.",
+        "A": "Hablándolo con ejemplos y repitiendo lo clave.",
+        "C": "Haciéndolo juntos: práctica guiada paso a paso.",
+    },
+    {
+        "titulo": "Búsqueda de Objetos",
+        "escena": "Perdiste algo (llaves, móvil). ¿Qué haces primero?",
+        "V": "Escaneo visual por zonas y recuerdo dónde lo vi por última vez.",
+        "A": "Repaso en voz alta la secuencia: ‘llegué, dejé, volví…’.",
+        "C": "Rehago movimientos: camino la ruta y ‘siento’ dónde estuvo.",
+    },
+]
+
+# -------------------------
+# DATA: RUEDAS gptapp.py (Hathora: nombres de área y vectores propios)
+# -------------------------
+ruedas_data_hathora = {
+    "MAPA GENERAL": ["Salud", "Economía", "Trabajo", "Desarrollo", "Familia", "Amor", "Amistad", "Diversión"],
+    "SALUD": ["Sueño", "Nutrición", "Energía", "Movimiento", "Estrés", "Prevención", "Rutinas", "Escucha corporal"],
+    "ECONOMÍA": ["Ingresos", "Ahorro", "Deudas", "Control gasto", "Relación dinero", "Educación financiera", "Extras", "Seguridad"],
+    "TRABAJO": ["Claridad", "Productividad", "Satisfacción", "Progresión", "Clima", "Autonomía", "Propósito", "Reconocimiento"]
+}
+
+# -------------------------
+# DATA: CANALES VAK
+# -------------------------
+CANALES = {"V": "Visual", "A": "Auditivo", "C": "Cinestésico"}
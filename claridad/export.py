@@ -0,0 +1,157 @@
+# claridad/export.py
+# Registro de sesión en PDF (ReportLab) y TXT a partir de un dict plano de sesión.
+#
+# Campos del registro (los mismos nombres que st.session_state en app.py):
+#   nombre_coach, nombre_cliente, objetivo_sesion, nivel_cliente,
+#   datos_rueda, diagnostico_generado, puntos_vak, chat_hist
+
+import hashlib
+import io
+import json
+import threading
+
+SESSION_FIELDS = (
+    "nombre_coach",
+    "nombre_cliente",
+    "objetivo_sesion",
+    "nivel_cliente",
+    "datos_rueda",
+    "diagnostico_generado",
+    "puntos_vak",
+    "chat_hist",
+)
+
+_styles = None
+_styles_lock = threading.Lock()
+
+
+def _pdf_styles():
+    # Hoja de estilos de ReportLab: una por proceso, solo lectura (import diferido)
+    global _styles
+    with _styles_lock:
+        if _styles is None:
+            from reportlab.lib.styles import getSampleStyleSheet
+
+            _styles = getSampleStyleSheet()
+        return _styles
+
+
+def fingerprint(session: dict) -> str:
+    # Solo el contenido de la sesión: la fecha del registro se estampa al construir el PDF
+    estado = [session.get(k) for k in SESSION_FIELDS]
+    return hashlib.sha256(json.dumps(estado, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+
+def build_pdf(session: dict, fecha: str) -> bytes:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+    styles = _pdf_styles()
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=A4, title="Registro de Sesión BeCoach")
+    story = []
+
+    def P(text: str) -> Paragraph:
+        return Paragraph(text, styles["BodyText"])
+
+    # Portada simple
+    story.append(Paragraph("BeCocach — Registro de Sesión", styles["Title"]))
+    story.append(Spacer(1, 10))
+
+    story.append(P(f"<b>Coach:</b> {session.get('nombre_coach') or '—'}"))
+    story.append(P(f"<b>Cliente:</b> {session.get('nombre_cliente') or '—'}"))
+    story.append(P(f"<b>Objetivo:</b> {session.get('objetivo_sesion') or '—'}"))
+    story.append(P(f"<b>Nivel:</b> {session.get('nivel_cliente') or '—'}"))
+    story.append(P(f"<b>Fecha:</b> {fecha}"))
+    story.append(Spacer(1, 12))
+
+    # Rueda
+    story.append(Paragraph("Rueda", styles["Heading2"]))
+    rueda = session.get("datos_rueda")
+    if rueda:
+        story.append(P(f"<b>Área:</b> {rueda['area']}"))
+        data = [["Vector", "Puntuación"]] + [[v, str(val)] for v, val in zip(rueda["vectores"], rueda["valores"])]
+        t = Table(data, colWidths=[330, 130])
+        t.setStyle(
+            TableStyle(
+                [
+                    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+                    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                    ("ALIGN", (1, 1), (1, -1), "CENTER"),
+                ]
+            )
+        )
+        story.append(t)
+    else:
+        story.append(P("No se generó rueda."))
+    story.append(Spacer(1, 12))
+
+    # Hipótesis IA
+    story.append(Paragraph("Hipótesis conductual (IA)", styles["Heading2"]))
+    hypo = session.get("diagnostico_generado") or "No disponible."
+    story.append(P(hypo.replace("\n", "<br/>")))
+    story.append(Spacer(1, 12))
+
+    # VAK
+    story.append(Paragraph("Perfil VAK", styles["Heading2"]))
+    vak = session.get("puntos_vak")
+    if vak:
+        data = [["Canal", "Puntos"]] + [[k, str(vak.get(k, 0))] for k in ["V", "A", "C"]]
+        t = Table(data, colWidths=[130, 130])
+        t.setStyle(
+            TableStyle(
+                [
+                    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+                    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                    ("ALIGN", (1, 1), (1, -1), "CENTER"),
+                ]
+            )
+        )
+        story.append(t)
+    else:
+        story.append(P("No disponible."))
+    story.append(Spacer(1, 12))
+
+    # Chat Copiloto
+    story.append(Paragraph("Copiloto — Registro de sesión", styles["Heading2"]))
+    chat_hist = session.get("chat_hist") or []
+    if chat_hist:
+        for m in chat_hist:
+            role = "COACH/CLIENTE" if m["role"] == "user" else "IA"
+            contenido = m["content"].replace("\n", "<br/>")
+            story.append(P(f"<b>{role}:</b> {contenido}"))
+            story.append(Spacer(1, 6))
+    else:
+        story.append(P("Sin conversación registrada."))
+
+    doc.build(story)
+    pdf = buf.getvalue()
+    buf.close()
+    return pdf
+
+
+def build_txt(session: dict, fecha: str) -> str:
+    return f"""BeCoach — Registro de Sesión
+Fecha: {fecha}
+
+Coach: {session.get('nombre_coach')}
+Cliente: {session.get('nombre_cliente')}
+Objetivo: {session.get('objetivo_sesion')}
+Nivel: {session.get('nivel_cliente')}
+
+RUEDA: {session.get('datos_rueda')}
+
+HIPÓTESIS:
+{session.get('diagnostico_generado')}
+
+VAK: {session.get('puntos_vak')}
+
+CHAT:
+""" + "\n\n".join([f"{m['role'].upper()}: {m['content']}" for m in session.get("chat_hist") or []])
+
+
+def export_filename(session: dict, prefix: str, ext: str) -> str:
+    return f"{prefix}_{(session.get('nombre_cliente') or 'cliente').replace(' ', '_')}.{ext}"
@@ -0,0 +1,165 @@
+# claridad/generation.py
+# Generación con Gemini sin Streamlit: backends por SDK + stream/generate con caché opcional.
+# Los SDK se importan al construir el backend (carga diferida).
+
+import functools
+import json
+import os
+
+from claridad.cache import cached_stream
+
+MODEL_NAME = "gemini-2.5-flash"
+
+# Tope de la respuesta visible por prompt, con margen sobre las palabras que pide cada uno; los tokens
+# reales quedan en las trazas (output_tokens, finish_reason=MAX_TOKENS) para ajustarlos.
+# CLARIDAD_MAX_TOKENS_<PROMPT> los sobrescribe.
+OUTPUT_TOKENS = {"hipotesis": 1024, "sintesis": 1200, "copiloto": 1024, "diagnostico": 900, "grow": 1200,
+                 "grow_parte": 600}
+
+# En gemini-2.5 max_output_tokens incluye el razonamiento: sin presupuesto propio podría gastarse todo el tope
+# y la respuesta llegaría vacía o cortada. Se acota el razonamiento y el tope pasa a ser respuesta + razonamiento.
+# CLARIDAD_THINKING_BUDGET lo ajusta (0 = sin razonamiento en flash).
+THINKING_TOKENS = 512
+
+
+def thinking_budget() -> int:
+    return int(os.environ.get("CLARIDAD_THINKING_BUDGET", THINKING_TOKENS))
+
+
+def generation_config(prompt: str, schema: dict | None = None) -> dict:
+    # prompt: clave de OUTPUT_TOKENS; schema: respuesta JSON validada (claridad.structured)
+    respuesta = int(os.environ.get(f"CLARIDAD_MAX_TOKENS_{prompt.upper()}", OUTPUT_TOKENS[prompt]))
+    razonamiento = thinking_budget()
+    config = {"max_output_tokens": respuesta + razonamiento, "thinking_budget": razonamiento}
+    if schema is not None:
+        config["response_mime_type"] = "application/json"
+        config["response_schema"] = schema
+    return config
+
+
+def cache_model(model_name: str, config: dict | None) -> str:
+    # Clave de modelo para caché y coalescencia: otra configuración es otra respuesta
+    if not config:
+        return model_name
+    return model_name + "|" + json.dumps(config, sort_keys=True, ensure_ascii=False)
+
+
+def record_usage(usage: dict | None, chunk):
+    # usage_metadata de cualquiera de los dos SDK (mismos nombres de campo); el último fragmento trae el total
+    if usage is None:
+        return
+    metadata = getattr(chunk, "usage_metadata", None)
+    for campo, clave in (("prompt_token_count", "prompt_tokens"), ("candidates_token_count", "output_tokens"),
+                         ("total_token_count", "total_tokens")):
+        valor = getattr(metadata, campo, None)
+        if valor:
+            usage[clave] = valor
+    candidatos = getattr(chunk, "candidates", None)
+    motivo = getattr(candidatos[0], "finish_reason", None) if candidatos else None
+    if motivo:  # STOP, MAX_TOKENS (cortada por el tope), SAFETY…
+        usage["finish_reason"] = getattr(motivo, "name", str(motivo))
+
+
+class GenerativeAIBackend:
+    """SDK google-generativeai (app.py). genai.configure es estado global: construir bajo ClientProvider."""
+
+    def __init__(self, api_key: str, model_name: str = MODEL_NAME, base_url: str | None = None):
+        import google.generativeai as genai
+
+        if base_url:
+            # Endpoint alternativo (p. ej. bench/fake_gemini.py): solo el transporte REST acepta host propio
+            genai.configure(api_key=api_key, transport="rest", client_options={"api_endpoint": base_url})
+        else:
+            genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+    def stream(self, prompt: str, usage: dict | None = None, config: dict | None = None):
+        # Este SDK no expone thinking_config: el tope ya reserva el presupuesto de razonamiento
+        config = {k: v for k, v in (config or {}).items() if k != "thinking_budget"}
+        for chunk in self.model.generate_content(prompt, stream=True, generation_config=config or None):
+            record_usage(usage, chunk)
+            try:
+                text = chunk.text
+            except ValueError:  # fragmento sin partes de texto (p. ej. bloqueo de seguridad)
+                continue
+            if text:
+                yield text
+
+
+class GenAIBackend:
+    """SDK google-genai (gptapp.py). genai.Client mantiene su propio pool httpx (keep-alive)."""
+
+    def __init__(self, api_key: str, model_name: str = MODEL_NAME, base_url: str | None = None):
+        from google import genai
+        from google.genai import types
+
+        self.model_name = model_name
+        self._types = types
+        http_options = types.HttpOptions(base_url=base_url) if base_url else None
+        self.client = genai.Client(api_key=api_key, http_options=http_options)
+
+    def stream(self, prompt: str, usage: dict | None = None, config: dict | None = None):
+        if config:
+            config = dict(config)
+            if "thinking_budget" in config:
+                config["thinking_config"] = self._types.ThinkingConfig(thinking_budget=config.pop("thinking_budget"))
+            config = self._types.GenerateContentConfig(**config)
+        for chunk in self.client.models.generate_content_stream(model=self.model_name, contents=prompt, config=config):
+            record_usage(usage, chunk)
+            if chunk.text:
+                yield chunk.text
+
+
+def stub_enabled() -> bool:
+    # CLARIDAD_LLM_BACKEND=stub: respuestas locales deterministas en proceso (benchmarks)
+    return os.environ.get("CLARIDAD_LLM_BACKEND") == "stub"
+
+
+def base_url() -> str | None:
+    # CLARIDAD_GEMINI_BASE_URL: los SDK reales hablan con otro endpoint (p. ej. bench/fake_gemini.py)
+    return os.environ.get("CLARIDAD_GEMINI_BASE_URL") or None
+
+
+def deadline_s() -> float:
+    # CLARIDAD_DEADLINE_S: espera máxima antes de mostrar el análisis local (0 = sin plazo)
+    return float(os.environ.get("CLARIDAD_DEADLINE_S", 25))
+
+
+def needs_api_key() -> bool:
+    # El stub y el servidor simulado no validan la clave
+    return not (stub_enabled() or base_url())
+
+
+def backend_factory(sdk: str):
+    # Constructor de backend (api_key) -> backend para ClientProvider; sdk: "generativeai" | "genai"
+    if stub_enabled():
+        from claridad.stub import StubBackend
+
+        return StubBackend
+    backend = GenerativeAIBackend if sdk == "generativeai" else GenAIBackend
+    url = base_url()
+    if url:
+        return lambda api_key: backend(api_key, base_url=url)
+    return backend
+
+
+def stream(backend, prompt: str, cache=None, force: bool = False, stats: dict | None = None, throttle=None,
+           config: dict | None = None):
+    # Fragmentos según llegan; con caché, un acierto llega en un solo fragmento.
+    # stats (opcional) se rellena mientras se consume: prompt_chars, cache_hit y tokens de usage_metadata.
+    # throttle (claridad.throttle.Throttle) limita, reintenta y comparte los fallos de caché que van a Gemini.
+    # config: generation_config() (tope de salida y, opcionalmente, esquema JSON).
+    modelo = cache_model(backend.model_name, config)
+    stream_fn = functools.partial(backend.stream, usage=stats, config=config)
+    if stats is not None:
+        stats["prompt_chars"] = len(prompt)
+        if config:
+            stats["max_output_tokens"] = config["max_output_tokens"]
+    if throttle is not None:
+        stream_fn = throttle.wrap(modelo, stream_fn)
+    return cached_stream(cache, modelo, prompt, stream_fn, force=force, info=stats)
+
+
+def generate(backend, prompt: str, cache=None, force: bool = False, config: dict | None = None) -> str:
+    return "".join(stream(backend, prompt, cache=cache, force=force, config=config)).strip()
@@ -0,0 +1,55 @@
+# claridad/heuristics.py
+# Análisis local y determinista de la rueda (numpy, sin IA): respuesta inmediata cuando Gemini no llega
+# a tiempo o no hay clave. Mismo formato de viñetas que la hipótesis, con etiqueta visible.
+
+ETIQUETA = "⚙️ Análisis local (heurístico, sin IA)"
+SALTO_MINIMO = 2  # puntos de diferencia para separar un grupo «cuello de botella» del resto
+
+
+def _perfil(dispersion: float) -> str:
+    if dispersion < 1.0:
+        return "equilibrado"
+    if dispersion < 2.5:
+        return "desigual"
+    return "polarizado"
+
+
+def local_analysis(rueda: dict, motivo: str = "") -> str:
+    # rueda = {"area", "vectores", "valores"}; misma entrada → mismo texto
+    import numpy as np
+
+    vectores = list(rueda["vectores"])
+    valores = np.asarray(rueda["valores"], dtype=float)
+    orden = np.argsort(valores, kind="stable")
+    ordenados = valores[orden]
+
+    minimo, maximo = ordenados[0], ordenados[-1]
+    bajos = [vectores[i] for i in orden if valores[i] == minimo]
+    altos = [vectores[i] for i in orden if valores[i] == maximo]
+    media = float(valores.mean())
+    dispersion = float(valores.std())
+
+    # Cuello de botella: vectores por debajo del mayor salto entre puntuaciones consecutivas
+    saltos = np.diff(ordenados)
+    corte = int(np.argmax(saltos)) if saltos.size else 0
+    if saltos.size and saltos[corte] >= SALTO_MINIMO:
+        cuello = [vectores[i] for i in orden[:corte + 1]]
+        detalle = f"salto de {saltos[corte]:.0f} puntos hasta el siguiente grupo"
+    else:
+        cuello = bajos
+        detalle = "sin saltos marcados: se toma el vector más bajo"
+
+    foco = bajos[0]
+    lineas = [
+        f"**{ETIQUETA}**" + (f" — {motivo}" if motivo else ""),
+        "",
+        f"- Área: {rueda['area']}",
+        f"- Más bajo ({minimo:.0f}/10): {', '.join(bajos)}",
+        f"- Más alto ({maximo:.0f}/10): {', '.join(altos)}",
+        f"- Media {media:.1f} · dispersión (desv. típica) {dispersion:.1f} · rango {minimo:.0f}–{maximo:.0f}"
+        f" → perfil {_perfil(dispersion)}",
+        f"- Cuello de botella candidato: {', '.join(cuello)} ({detalle})",
+        f"- Prueba 7 días: 20 min/día sobre «{foco}», métrica binaria (hecho / no hecho).",
+        f"- Pregunta de quiebre: ¿qué cambiaría en «{altos[-1]}» si «{foco}» subiera 2 puntos?",
+    ]
+    return "\n".join(lineas)
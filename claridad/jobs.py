@@ -0,0 +1,115 @@
+# claridad/jobs.py
+# Generaciones LLM en segundo plano: pool de hilos acotado, ids de trabajo, texto parcial y cancelación.
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+PENDIENTE = "pendiente"
+EN_CURSO = "en curso"
+LISTA = "lista"
+ERROR = "error"
+CANCELADA = "cancelada"
+
+
+class QueueFull(RuntimeError):
+    """La cola de JobRunner está llena: la UI avisa (o, si es especulativo, no lanza nada)."""
+
+
+class Job:
+    def __init__(self, kind: str, meta: dict | None = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.meta = meta or {}
+        self.status = PENDIENTE
+        self.text = ""
+        self.error = None
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self._cancel = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in (LISTA, ERROR, CANCELADA)
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.submitted_at
+
+    def cancel(self) -> None:
+        self._cancel.set()
+        if self.future is not None and self.future.cancel():
+            self._finish(CANCELADA)
+
+    def _finish(self, status: str) -> None:
+        self.status = status
+        self.finished_at = time.monotonic()
+
+
+class JobRunner:
+    """Ejecuta iteradores de fragmentos de texto fuera del hilo del script; la UI consulta el estado por id."""
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 32, max_jobs: int = 256):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="claridad-job")
+        self._max_queue = max_queue
+        self._max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, chunks, meta: dict | None = None) -> str:
+        job = Job(kind, meta)
+        with self._lock:
+            if self.queued() >= self._max_queue:
+                raise QueueFull("Cola de generación llena; reintenta en unos segundos.")
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = self._pool.submit(self._run, job, chunks)
+        return job.id
+
+    def _run(self, job: Job, chunks) -> None:
+        if job._cancel.is_set():
+            job._finish(CANCELADA)
+            return
+        job.status = EN_CURSO
+        job.started_at = time.monotonic()
+        try:
+            for chunk in chunks:
+                if job._cancel.is_set():
+                    break
+                job.text += chunk
+        except Exception as exc:  # el error se entrega a la UI, no al hilo
+            job.error = exc
+            job._finish(ERROR)
+            return
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+        job._finish(CANCELADA if job._cancel.is_set() else LISTA)
+
+    def _prune(self) -> None:
+        # Acota la memoria del registro: se descartan primero los trabajos terminados más antiguos.
+        for job_id in [j.id for j in self._jobs.values() if j.done]:
+            if len(self._jobs) <= self._max_jobs:
+                break
+            del self._jobs[job_id]
+
+    def get(self, job_id: str | None) -> Job | None:
+        if not job_id:
+            return None
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str | None) -> None:
+        job = self.get(job_id)
+        if job is not None and not job.done:
+            job.cancel()
+
+    def queued(self) -> int:
+        return sum(1 for j in self._jobs.values() if j.status == PENDIENTE)
+
+    def running(self) -> int:
+        return sum(1 for j in self._jobs.values() if j.status == EN_CURSO)
@@ -0,0 +1,107 @@
+# claridad/longitudinal.py
+# Evolución de la rueda entre sesiones: todas las ruedas de un área en una matriz numpy
+# (una fila por sesión) y métricas por cliente y vector en una sola pasada vectorizada:
+# primera/última, delta, tendencia (pendiente por 30 días), volatilidad y rankings.
+
+DIA = 86400.0
+
+
+class RuedaHistory:
+    """Ruedas de un área ordenadas por (cliente, fecha); la última rueda guardada representa a cada sesión."""
+
+    def __init__(self, area: str, vectores: list, clientes, ts, valores, sesiones):
+        self.area = area
+        self.vectores = vectores
+        self.clientes = clientes  # (n,) str
+        self.ts = ts              # (n,) float64, epoch
+        self.valores = valores    # (n, d) float32
+        self.sesiones = sesiones  # (n,) str
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    @classmethod
+    def from_rows(cls, rows, area: str, vectores: list):
+        # rows: SessionStore.rueda_rows() (+ la rueda actual al final); solo el área pedida
+        import numpy as np
+
+        por_sesion = {}
+        for session_id, ts, cliente, rueda in rows:
+            if rueda["area"] == area and len(rueda["valores"]) == len(vectores):
+                por_sesion[session_id] = (cliente, ts, rueda["valores"])  # en orden temporal: gana la última
+        sesiones = np.array(list(por_sesion), dtype=str)
+        clientes = np.array([v[0] for v in por_sesion.values()], dtype=str)
+        ts = np.array([v[1] for v in por_sesion.values()], dtype=np.float64)
+        valores = np.array([v[2] for v in por_sesion.values()], dtype=np.float32).reshape(-1, len(vectores))
+        orden = np.lexsort((ts, clientes))
+        return cls(area, vectores, clientes[orden], ts[orden], valores[orden], sesiones[orden])
+
+
+def analyze(history: RuedaHistory) -> dict:
+    # Métricas por cliente (k) y vector (d). Volatilidad = desviación típica de los cambios entre sesiones
+    # consecutivas; tendencia = pendiente de mínimos cuadrados en puntos por 30 días. NaN con < 2 sesiones.
+    import numpy as np
+
+    if not len(history):
+        return {"clientes": np.array([], dtype=str), "n": np.array([], dtype=np.int64)}
+    v = history.valores.astype(np.float64)
+    inicio = np.flatnonzero(np.r_[True, history.clientes[1:] != history.clientes[:-1]])
+    fin = np.r_[inicio[1:], len(v)] - 1
+    n = fin - inicio + 1
+    grupo = np.repeat(np.arange(len(inicio)), n)
+
+    primera, ultima = v[inicio], v[fin]
+    media = np.add.reduceat(v, inicio, axis=0) / n[:, None]
+
+    # Cambios entre sesiones consecutivas del mismo cliente (0 en la primera fila de cada uno)
+    cambios = np.diff(v, axis=0, prepend=v[:1])
+    cambios[inicio] = 0.0
+    m = (n - 1)[:, None].astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        s1 = np.add.reduceat(cambios, inicio, axis=0)
+        s2 = np.add.reduceat(cambios ** 2, inicio, axis=0)
+        volatilidad = np.sqrt(np.maximum(s2 / m - (s1 / m) ** 2, 0.0))
+
+        x = history.ts / (30 * DIA)
+        xc = x - (np.add.reduceat(x, inicio) / n)[grupo]
+        sxx = np.add.reduceat(xc ** 2, inicio)
+        sxy = np.add.reduceat(xc[:, None] * (v - media[grupo]), inicio, axis=0)
+        tendencia = sxy / sxx[:, None]
+
+    pocas = n < 2
+    volatilidad[pocas] = np.nan
+    tendencia[pocas] = np.nan
+    return {
+        "clientes": history.clientes[inicio],
+        "n": n,
+        "primera": primera,
+        "ultima": ultima,
+        "media": media,
+        "delta": ultima - primera,
+        "tendencia": tendencia,
+        "volatilidad": volatilidad,
+    }
+
+
+def rank_vectors(stats: dict, i: int, top: int = 3) -> dict:
+    # Vectores de un cliente: más mejorados (mayor delta) y más estancados (menor delta, y a igualdad el más bajo)
+    import numpy as np
+
+    delta, ultima = stats["delta"][i], stats["ultima"][i]
+    return {
+        "mejorados": np.argsort(-delta, kind="stable")[:top],
+        "estancados": np.lexsort((ultima, delta))[:top],
+    }
+
+
+def rank_clients(stats: dict, top: int = 5) -> dict:
+    # Cartera de un coach: clientes con ≥ 2 sesiones por delta medio entre vectores
+    import numpy as np
+
+    elegibles = np.flatnonzero(stats["n"] >= 2)
+    delta = stats["delta"][elegibles].mean(axis=1)
+    ultima = stats["ultima"][elegibles].mean(axis=1)
+    return {
+        "mejorados": elegibles[np.argsort(-delta, kind="stable")[:top]],
+        "estancados": elegibles[np.lexsort((ultima, delta))[:top]],
+    }
@@ -0,0 +1,73 @@
+# claridad/pipeline.py
+# Diagnóstico + hoja de ruta GROW en un paso (gptapp.py): REALIDAD, OPCIONES y VOLUNTAD se piden a la vez
+# en cuanto el diagnóstico trae sus primeras viñetas (tensión, bloqueador, hipótesis), sin esperar al resto.
+# El script consulta poll() en su bucle y pinta el texto parcial de cada trabajo del JobRunner.
+
+import re
+
+from claridad.jobs import LISTA, QueueFull
+
+GROW_PARTES = ("REALIDAD", "OPCIONES", "VOLUNTAD")
+
+# Viñetas del diagnóstico de las que depende la hoja de ruta (1. tensión, 2. bloqueador, 3. hipótesis)
+MIN_VINETAS = 3
+
+# Marcador de lista seguido de espacio ("- ", "* ", "• ", "1. ", "2) "); un título "**DIAGNÓSTICO**" no cuenta
+_VINETA = re.compile(r"\s*([-*•]|\d+[.)])\s")
+
+
+def diagnostico_suficiente(texto: str, vinetas: int = MIN_VINETAS) -> str | None:
+    # Prefijo con las primeras `vinetas` viñetas ya cerradas (línea terminada), o None si aún no llegaron
+    lineas = texto.split("\n")[:-1]  # la última puede estar a medias
+    contadas = 0
+    for i, linea in enumerate(lineas):
+        if _VINETA.match(linea) and not linea.lstrip().startswith("**"):
+            contadas += 1
+            if contadas == vinetas:
+                return "\n".join(lineas[:i + 1]).strip()
+    return None
+
+
+class GrowPipeline:
+    """open_stream(prompt, tipo) -> fragmentos, con tipo "diagnostico" | "grow";
+    build_parte(parte, diagnostico) -> prompt de una de GROW_PARTES."""
+
+    def __init__(self, runner, open_stream, prompt_diagnostico: str, build_parte, vinetas: int = MIN_VINETAS):
+        self.runner = runner
+        self.open_stream = open_stream
+        self.prompt_diagnostico = prompt_diagnostico
+        self.build_parte = build_parte
+        self.vinetas = vinetas
+        self.diagnostico = None  # id del trabajo
+        self.partes = {}  # {parte: id del trabajo}, vacío hasta que el diagnóstico basta
+        self.errores = {}  # {parte: QueueFull} de las partes que no cupieron en la cola
+        self.base = None  # texto del diagnóstico con el que arrancaron las partes
+
+    def start(self) -> "GrowPipeline":
+        self.diagnostico = self.runner.submit("diagnostico", self.open_stream(self.prompt_diagnostico, "diagnostico"))
+        return self
+
+    def jobs(self) -> dict:
+        return {parte: self.runner.get(job_id) for parte, job_id in self.partes.items()}
+
+    def poll(self) -> bool:
+        # Lanza las partes en cuanto el diagnóstico basta; True cuando ya no queda nada en curso
+        diagnostico = self.runner.get(self.diagnostico)
+        if not (self.partes or self.errores):
+            if not diagnostico.done:
+                self.base = diagnostico_suficiente(diagnostico.text, self.vinetas)
+            elif diagnostico.status == LISTA and diagnostico.text.strip():
+                self.base = diagnostico.text.strip()  # diagnóstico corto o sin viñetas: el texto completo
+            if self.base:
+                for parte in GROW_PARTES:
+                    try:
+                        self.partes[parte] = self.runner.submit(
+                            "grow", self.open_stream(self.build_parte(parte, self.base), "grow"), meta={"parte": parte}
+                        )
+                    except QueueFull as exc:  # esa parte queda fallida; las que entraron siguen
+                        self.errores[parte] = exc
+        return diagnostico.done and all(job.done for job in self.jobs().values())
+
+    def cancel(self) -> None:
+        for job_id in (self.diagnostico, *self.partes.values()):
+            self.runner.cancel(job_id)
@@ -0,0 +1,189 @@
+# claridad/prompts.py
+# Construcción de prompts a partir de entradas planas (sin st.session_state).
+
+from claridad.scoring import predominant_channel
+
+
+def _puntuaciones(rueda: dict) -> list:
+    return list(zip(rueda["vectores"], rueda["valores"]))
+
+
+# -------------------------
+# app.py (BeCoach)
+# -------------------------
+def build_prompt_auto(cliente: str, objetivo: str, rueda: dict) -> str:
+    puntuaciones = _puntuaciones(rueda)
+    return f"""
+Eres Director de Diagnóstico conductual. No motivas. No das teoría.
+
+Cliente: {cliente or "No indicado"}
+Objetivo declarado (si existe): {objetivo or "No indicado"}
+Área: {rueda["area"]}
+Vectores y puntuaciones: {puntuaciones}
+
+REGLAS DURAS
+- No repitas puntuaciones.
+- Máx 170 palabras.
+- Bullets, sin introducción.
+- Cada bullet = afirmación + conducta observable + coste.
+- OBLIGATORIO: 1 contradicción (lo que dice querer vs lo que sus hábitos muestran) y 1 trade-off (qué prioriza en silencio).
+
+ENTREGA (en este orden)
+- Patrón dominante (1 línea)
+- Cuello de botella (NO el más bajo) + por qué arrastra otros
+- Mecanismo de autoengaño (conducta semanal observable)
+- Prueba 7 días (≤20 min/día, métrica binaria)
+- Coste oculto (dinero/energía/relación/tiempo)
+- Pregunta de quiebre (corta y verificable)
+"""
+
+
+def build_prompt_copiloto(coach: str, cliente: str, objetivo: str, rueda: dict, diagnostico: str | None,
+                          vak: dict | None, user_input: str, contexto: str = "") -> str:
+    # contexto: memoria acotada de los turnos anteriores (claridad.context.CopilotoContext.render)
+    puntuaciones = _puntuaciones(rueda)
+    predominancia = predominant_channel(vak)
+    memoria = f"\nMEMORIA DE LA SESIÓN\n{contexto}\n\n" if contexto else ""
+    return f"""
+Eres Copiloto de Sesión GROW+ (coach estratégico). Respondes como guion práctico para el coach.
+Tu objetivo: avanzar la sesión hoy, no hablar bonito.
+
+CONTEXTO
+Coach: {coach or "No indicado"}
+Cliente: {cliente or "No indicado"}
+Objetivo declarado: {objetivo or "No indicado"}
+Área rueda: {rueda["area"]}
+Puntuaciones: {puntuaciones}
+Hipótesis previa (si existe): {diagnostico or "No disponible"}
+Canal predominante: {predominancia}
+{memoria}Última frase del cliente: {user_input}
+
+REGLAS
+- Directo, operativo, sin discursos.
+- Máx 190 palabras.
+- Usa predicados del canal {predominancia}.
+- Si el objetivo está vago, REDEFINE en 1 línea primero.
+
+SALIDA (bullets, en este orden exacto)
+1) 🎯 DESAFÍO REDEFINIDO (1 línea)
+2) 🗣️ COACH DICE (literal, 1–2 frases)
+3) ❓ PREGUNTA SIGUIENTE (1 sola)
+4) 🔁 SI RESPONDE “EVITA/DEPENDE” → repregunta exacta (1 sola)
+5) ✅ TAREA 7 DÍAS (≤20 min, binaria, SMART) + fricción (qué eliminar)
+6) ⚠️ SEÑAL DE AUTOENGAÑO (1 línea)
+"""
+
+
+def build_prompt_sintesis(cliente: str, objetivo: str, hipotesis: dict) -> str:
+    # hipotesis: {área: hipótesis de build_prompt_auto} de las áreas analizadas a la vez (claridad.sweep)
+    bloques = "\n\n".join(f"### {area}\n{texto}" for area, texto in hipotesis.items())
+    return f"""
+Eres Director de Diagnóstico conductual. Tienes las hipótesis de varias áreas de vida del mismo cliente.
+
+Cliente: {cliente or "No indicado"}
+Objetivo declarado (si existe): {objetivo or "No indicado"}
+
+HIPÓTESIS POR ÁREA
+{bloques}
+
+REGLAS DURAS
+- No resumas área por área.
+- Máx 200 palabras.
+- Bullets, sin introducción.
+
+ENTREGA (en este orden)
+- Patrón transversal (el que aparece en 2+ áreas, citándolas)
+- Área palanca (la que, movida, arrastra a las demás) + por qué
+- Contradicción entre áreas (lo que una protege y otra paga)
+- Prueba 7 días única (≤20 min/día, métrica binaria) sobre el área palanca
+- Pregunta de quiebre para la sesión
+"""
+
+
+# -------------------------
+# gptapp.py (Hathora)
+# -------------------------
+def build_prompt_diagnostico(cliente: str, area: str, vectores: list, valores: list) -> str:
+    puntuaciones = list(zip(vectores, valores))
+    return f"""
+Actúa como un Master Coach Estratégico con enfoque sistémico.
+
+Cliente: {cliente}
+Área evaluada: {area}
+Vectores y puntuaciones: {puntuaciones}
+
+REGLAS:
+- No describas los datos.
+- No repitas puntuaciones.
+- No lenguaje motivacional genérico.
+- Máx 150 palabras.
+- Responde en bullets.
+
+ANÁLISIS:
+1. Tensión central del sistema.
+2. Vector bloqueador real.
+3. Hipótesis conductual observable.
+4. Palanca de alto impacto (1 acción).
+5. Coste oculto de mantener este estado.
+6. Pregunta maestra de confrontación.
+"""
+
+
+def build_prompt_grow(diagnostico: str, consulta: str, vak: dict | None) -> str:
+    pred = predominant_channel(vak)
+    return f"""
+Actúa como un Coach Estratégico experto en metodología GROW+.
+
+DIAGNÓSTICO BASE:
+{diagnostico}
+
+Desafío declarado:
+{consulta}
+
+Perfil sensorial predominante: {pred}
+
+REGLAS:
+- No repitas el diagnóstico.
+- Lenguaje claro y accionable.
+- Usa predicados {pred}.
+- Máx 200 palabras.
+
+RESPONDE:
+1. REALIDAD (R): cómo se manifiesta esta tensión hoy.
+2. OPCIONES (O): 3 caminos viables.
+3. VOLUNTAD (W): 1 acción SMART concreta para 7 días.
+"""
+
+
+# Una parte de build_prompt_grow por llamada (claridad.pipeline): se piden a la vez con el diagnóstico a medias
+_GROW_PARTES = {
+    "REALIDAD": ("REALIDAD (R): cómo se manifiesta esta tensión hoy.", 70),
+    "OPCIONES": ("OPCIONES (O): 3 caminos viables.", 90),
+    "VOLUNTAD": ("VOLUNTAD (W): 1 acción SMART concreta para 7 días.", 60),
+}
+
+
+def build_prompt_grow_parte(parte: str, diagnostico: str, consulta: str, vak: dict | None) -> str:
+    pred = predominant_channel(vak)
+    instruccion, palabras = _GROW_PARTES[parte]
+    return f"""
+Actúa como un Coach Estratégico experto en metodología GROW+.
+
+DIAGNÓSTICO BASE (tensión, bloqueador e hipótesis):
+{diagnostico}
+
+Desafío declarado:
+{consulta}
+
+Perfil sensorial predominante: {pred}
+
+REGLAS:
+- No repitas el diagnóstico.
+- Lenguaje claro y accionable.
+- Usa predicados {pred}.
+- Máx {palabras} palabras.
+- Solo esta parte de la hoja de ruta, sin título ni introducción.
+
+RESPONDE:
+{instruccion}
+"""
@@ -0,0 +1,32 @@
+# claridad/scoring.py
+# Puntuación VAK: entradas planas (elecciones o sliders) → totales {"V", "A", "C"}.
+
+from claridad.data import CANALES
+
+
+def score_vak(choices) -> dict:
+    # VAK 24 de app.py: una elección "V" | "A" | "C" por ítem
+    total = {"V": 0, "A": 0, "C": 0}
+    for choice in choices:
+        total[choice] += 1
+    return total
+
+
+def sum_vak_sliders(rows) -> dict:
+    # Test de gptapp.py: por situación, tres sliders 1–7 (visual, auditivo, cinestésico)
+    total = {"V": 0, "A": 0, "C": 0}
+    for v, a, c in rows:
+        total["V"] += v
+        total["A"] += a
+        total["C"] += c
+    return total
+
+
+def predominant(vak: dict | None, default: str = "V") -> str:
+    if not vak or not any(vak.values()):
+        return default
+    return max(vak, key=vak.get)
+
+
+def predominant_channel(vak: dict | None, default: str = "V") -> str:
+    return CANALES[predominant(vak, default)]
@@ -0,0 +1,136 @@
+# claridad/similar.py
+# Índice de hipótesis por rueda parecida: área + vector de puntuaciones → hipótesis ya generada.
+# La caché exacta falla si cambia un solo punto o el nombre del cliente; aquí basta con que la rueda
+# quede a menos de `threshold` (distancia euclídea) para ofrecer un borrador instantáneo.
+#
+# Las hipótesis llevan el nombre y el contexto del cliente: cada coach solo ve las suyas (clave coach + área,
+# con claridad.store.person_key). Sin coach no se indexa ni se ofrece nada.
+#
+# numpy en memoria (matriz fija de max_entries filas, expulsión por menos usado) y persistido en .npz.
+
+import os
+import threading
+import time
+
+from claridad.store import person_key
+
+DEFAULT_PATH = os.environ.get(
+    "CLARIDAD_SIMILAR_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "ruedas_index.npz"),
+)
+DEFAULT_THRESHOLD = float(os.environ.get("CLARIDAD_SIMILAR_THRESHOLD", 2.0))
+_SEP = "\x1f"  # separador coach / área en las claves del índice
+
+
+class RuedaIndex:
+    def __init__(self, path: str | None = DEFAULT_PATH, max_entries: int = 1000, dim: int = 8,
+                 threshold: float = DEFAULT_THRESHOLD):
+        import numpy as np
+
+        self._np = np
+        self.path = path
+        self.max_entries = max_entries
+        self.dim = dim
+        self.threshold = threshold
+        self._vecs = np.zeros((max_entries, dim), dtype=np.float32)
+        self._area_ids = np.full(max_entries, -1, dtype=np.int32)  # -1 = fila libre
+        self._stamps = np.zeros(max_entries, dtype=np.float64)
+        self._texts = [""] * max_entries
+        self._areas = {}  # clave (coach + área) → id
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self._load()
+
+    def __len__(self) -> int:
+        return int((self._area_ids >= 0).sum())
+
+    @staticmethod
+    def _clave(coach: str, area: str) -> str | None:
+        coach = person_key(coach or "")
+        return f"{coach}{_SEP}{area}" if coach else None
+
+    def _area_id(self, clave: str) -> int:
+        return self._areas.setdefault(clave, len(self._areas))
+
+    def lookup(self, area: str, valores, threshold: float | None = None, coach: str = ""):
+        # (texto, distancia) del vecino más cercano del mismo coach y área, o None si ninguno queda dentro del umbral
+        np = self._np
+        q = np.asarray(valores, dtype=np.float32)
+        clave = self._clave(coach, area)
+        if q.shape != (self.dim,) or clave is None:
+            return None
+        limite = self.threshold if threshold is None else threshold
+        with self._lock:
+            area_id = self._areas.get(clave)
+            if area_id is None:
+                return None
+            filas = np.flatnonzero(self._area_ids == area_id)
+            if not filas.size:
+                return None
+            dist = np.linalg.norm(self._vecs[filas] - q, axis=1)
+            mejor = int(np.argmin(dist))
+            if dist[mejor] > limite:
+                return None
+            fila = filas[mejor]
+            self._stamps[fila] = time.time()
+            return self._texts[fila], float(dist[mejor])
+
+    def add(self, area: str, valores, text: str, coach: str = ""):
+        np = self._np
+        v = np.asarray(valores, dtype=np.float32)
+        clave = self._clave(coach, area)
+        if v.shape != (self.dim,) or not text or clave is None:
+            return
+        with self._lock:
+            area_id = self._area_id(clave)
+            # Misma rueda exacta: se sustituye; si no, primera fila libre o la menos usada
+            misma = np.flatnonzero((self._area_ids == area_id) & np.all(self._vecs == v, axis=1))
+            if misma.size:
+                fila = int(misma[0])
+            else:
+                libres = np.flatnonzero(self._area_ids < 0)
+                fila = int(libres[0]) if libres.size else int(np.argmin(self._stamps))
+            self._vecs[fila] = v
+            self._area_ids[fila] = area_id
+            self._stamps[fila] = time.time()
+            self._texts[fila] = text
+            if self.path:
+                self._save()
+
+    def _save(self):
+        np = self._np
+        usadas = np.flatnonzero(self._area_ids >= 0)
+        nombres = sorted(self._areas, key=self._areas.get)
+        tmp = self.path + ".tmp.npz"
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        np.savez(
+            tmp,
+            vecs=self._vecs[usadas],
+            area_ids=self._area_ids[usadas],
+            stamps=self._stamps[usadas],
+            texts=np.array([self._texts[i] for i in usadas], dtype=str),
+            areas=np.array(nombres, dtype=str),
+        )
+        os.replace(tmp, self.path)  # escritura atómica: un lector nunca ve el fichero a medias
+
+    def _load(self):
+        np = self._np
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                vecs, area_ids, stamps = data["vecs"], data["area_ids"], data["stamps"]
+                texts, areas = data["texts"].tolist(), data["areas"].tolist()
+        except (OSError, ValueError, KeyError):  # índice corrupto o de otra versión: se empieza vacío
+            return
+        if vecs.ndim != 2 or vecs.shape[1] != self.dim:
+            return
+        if not all(_SEP in area for area in areas):  # índice anterior sin coach: se descarta, no se puede acotar
+            return
+        # Si el tope bajó, se conservan las más recientes
+        orden = np.argsort(stamps)[::-1][: self.max_entries]
+        n = len(orden)
+        self._areas = {area: i for i, area in enumerate(areas)}
+        self._vecs[:n] = vecs[orden]
+        self._area_ids[:n] = area_ids[orden]
+        self._stamps[:n] = stamps[orden]
+        for fila, i in enumerate(orden):
+            self._texts[fila] = texts[i]
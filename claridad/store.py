@@ -0,0 +1,180 @@
+# claridad/store.py
+# Historial persistente de sesiones (SQLite en modo WAL): ficha, rueda, VAK, hipótesis y turnos de chat.
+#
+# Solo se añaden filas (eventos); el estado de una sesión es el último evento de cada tipo más los
+# turnos de chat en orden. SessionRecorder calcula lo que cambió desde el último volcado y la app lo
+# escribe en una sola transacción al final de cada rerun.
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+import uuid
+
+DEFAULT_PATH = os.environ.get(
+    "CLARIDAD_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "sesiones.sqlite3"),
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id         INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    ts         REAL NOT NULL,
+    kind       TEXT NOT NULL,
+    cliente    TEXT NOT NULL,
+    coach      TEXT NOT NULL,
+    payload    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_cliente ON events(cliente, ts);
+CREATE INDEX IF NOT EXISTS idx_events_coach ON events(coach, ts);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts);
+CREATE INDEX IF NOT EXISTS idx_events_session ON events(session_id, id);
+"""
+
+# Tipo de evento → campos de la sesión (claridad.export.SESSION_FIELDS) que lo forman
+EVENT_FIELDS = {
+    "ficha": ("nombre_coach", "nombre_cliente", "objetivo_sesion", "nivel_cliente"),
+    "rueda": ("datos_rueda",),
+    "vak": ("puntos_vak",),
+    "hipotesis": ("diagnostico_generado",),
+}
+
+
+def person_key(nombre: str) -> str:
+    # "  Ana  Pérez" y "ana perez" son la misma clienta: sin acentos, sin mayúsculas, espacios simples
+    sin_acentos = "".join(c for c in unicodedata.normalize("NFKD", nombre) if not unicodedata.combining(c))
+    return " ".join(sin_acentos.split()).casefold()
+
+
+class SessionRecorder:
+    """Por sesión de Streamlit: id de sesión persistente y firma de lo ya escrito."""
+
+    def __init__(self):
+        self.session_id = uuid.uuid4().hex
+        self._firmas = {}  # tipo → JSON del último valor escrito
+        self._turnos = 0   # mensajes de chat ya escritos
+
+    def pending(self, session: dict) -> list:
+        # [(tipo, payload)] de lo que cambió; no marca nada como escrito (ver commit)
+        eventos = []
+        for kind, campos in EVENT_FIELDS.items():
+            valor = {campo: session[campo] for campo in campos}
+            if not any(valor.values()):
+                continue
+            if kind == "ficha" and not (valor["nombre_cliente"] or valor["nombre_coach"]):
+                continue  # solo valores por defecto (nivel "Nuevo"): cada visita o limpieza no es una sesión
+            firma = json.dumps(valor, ensure_ascii=False, sort_keys=True)
+            if self._firmas.get(kind) != firma:
+                eventos.append((kind, valor))
+        chat = session["chat_hist"]
+        if len(chat) < self._turnos:  # historial vaciado en la misma sesión: se vuelve a empezar
+            self._turnos = 0
+        eventos.extend(("chat", {"role": m["role"], "content": m["content"]}) for m in chat[self._turnos:])
+        return eventos
+
+    def commit(self, eventos: list):
+        for kind, valor in eventos:
+            if kind == "chat":
+                self._turnos += 1
+            else:
+                self._firmas[kind] = json.dumps(valor, ensure_ascii=False, sort_keys=True)
+
+    def flush(self, store, session: dict) -> int:
+        eventos = self.pending(session)
+        if eventos:
+            store.append(self.session_id, session["nombre_cliente"], session["nombre_coach"], eventos)
+            self.commit(eventos)
+        return len(eventos)
+
+
+class SessionStore:
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # Una conexión por hilo, como ResponseCache
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def append(self, session_id: str, cliente: str, coach: str, eventos: list, ts: float | None = None):
+        # Un lote = una transacción (un fsync del WAL por rerun, no por campo)
+        ts = time.time() if ts is None else ts
+        filas = [
+            (session_id, ts, kind, person_key(cliente), person_key(coach), json.dumps(valor, ensure_ascii=False))
+            for kind, valor in eventos
+        ]
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT INTO events(session_id, ts, kind, cliente, coach, payload) VALUES (?, ?, ?, ?, ?, ?)", filas
+            )
+
+    def _sessions(self, ids: list) -> list:
+        if not ids:
+            return []
+        marcas = ",".join("?" * len(ids))
+        filas = self._conn().execute(
+            f"SELECT session_id, ts, kind, payload FROM events WHERE session_id IN ({marcas}) ORDER BY session_id, id",
+            ids,
+        ).fetchall()
+        sesiones = {}
+        for session_id, ts, kind, payload in filas:
+            s = sesiones.setdefault(session_id, {"session_id": session_id, "started_at": ts, "updated_at": ts, "chat_hist": []})
+            s["updated_at"] = ts
+            valor = json.loads(payload)
+            if kind == "chat":
+                s["chat_hist"].append(valor)
+            else:
+                s.update(valor)
+        return [sesiones[i] for i in ids if i in sesiones]
+
+    def _recent_ids(self, column: str, key: str, since: float | None, limit: int) -> list:
+        filas = self._conn().execute(
+            f"SELECT session_id, MAX(ts) AS ultimo FROM events WHERE {column} = ? AND ts >= ? "
+            "GROUP BY session_id ORDER BY ultimo DESC LIMIT ?",
+            (key, since or 0, limit),
+        ).fetchall()
+        return [f[0] for f in filas]
+
+    def client_history(self, cliente: str, limit: int = 50) -> list:
+        # Sesiones de un cliente, la más reciente primero, con su estado completo (incluido el chat)
+        return self._sessions(self._recent_ids("cliente", person_key(cliente), None, limit))
+
+    def coach_history(self, coach: str, since: float | None = None, limit: int = 200) -> list:
+        return self._sessions(self._recent_ids("coach", person_key(coach), since, limit))
+
+    def rueda_rows(self, cliente: str | None = None, coach: str | None = None) -> list:
+        # [(session_id, ts, cliente, datos_rueda)] de todas las ruedas guardadas de un cliente o de la cartera
+        # de un coach, en orden temporal (sirve a claridad.longitudinal)
+        column, key = ("cliente", person_key(cliente)) if cliente is not None else ("coach", person_key(coach))
+        filas = self._conn().execute(
+            f"""
+            SELECT e.session_id, e.ts, s.cliente, e.payload FROM events e
+            JOIN (SELECT session_id, MAX(cliente) AS cliente FROM events WHERE {column} = ? GROUP BY session_id) s
+              USING (session_id)
+            WHERE e.kind = 'rueda'
+            ORDER BY e.ts, e.id
+            """,
+            (key,),
+        ).fetchall()
+        return [(sid, ts, cli, json.loads(payload)["datos_rueda"]) for sid, ts, cli, payload in filas]
+
+    def sessions_between(self, start: float, end: float, limit: int = 500) -> list:
+        filas = self._conn().execute(
+            "SELECT session_id, MAX(ts) AS ultimo FROM events WHERE ts >= ? AND ts < ? "
+            "GROUP BY session_id ORDER BY ultimo DESC LIMIT ?",
+            (start, end, limit),
+        ).fetchall()
+        return self._sessions([f[0] for f in filas])
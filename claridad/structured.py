@@ -0,0 +1,60 @@
+# claridad/structured.py
+# Modo JSON opcional: las seis secciones de la hipótesis y del Copiloto como esquema de respuesta.
+# La salida se valida y se pinta desde los campos (mismo markdown que el modo texto).
+
+import json
+
+# (campo, título) en el orden de la ENTREGA/SALIDA de claridad.prompts
+HIPOTESIS_SECCIONES = (
+    ("patron", "Patrón dominante"),
+    ("cuello_botella", "Cuello de botella"),
+    ("autoengano", "Mecanismo de autoengaño"),
+    ("prueba_7_dias", "Prueba 7 días"),
+    ("coste_oculto", "Coste oculto"),
+    ("pregunta_quiebre", "Pregunta de quiebre"),
+)
+COPILOTO_SECCIONES = (
+    ("desafio", "🎯 DESAFÍO REDEFINIDO"),
+    ("coach_dice", "🗣️ COACH DICE"),
+    ("pregunta", "❓ PREGUNTA SIGUIENTE"),
+    ("repregunta", "🔁 SI RESPONDE “EVITA/DEPENDE”"),
+    ("tarea", "✅ TAREA 7 DÍAS"),
+    ("autoengano", "⚠️ SEÑAL DE AUTOENGAÑO"),
+)
+
+
+def response_schema(secciones) -> dict:
+    # Subconjunto OpenAPI que aceptan los dos SDK (tipos en mayúsculas)
+    return {
+        "type": "OBJECT",
+        "properties": {campo: {"type": "STRING", "description": titulo} for campo, titulo in secciones},
+        "required": [campo for campo, _ in secciones],
+    }
+
+
+def parse(text: str, secciones) -> dict | None:
+    # Campos validados {campo: texto} o None si la salida no cumple el esquema (p. ej. cortada por el tope)
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    campos = {}
+    for campo, _ in secciones:
+        valor = data.get(campo)
+        if not isinstance(valor, str) or not valor.strip():
+            return None
+        campos[campo] = valor.strip()
+    return campos
+
+
+def render_hipotesis(campos: dict) -> str:
+    return "\n".join(f"- **{titulo}:** {campos[campo]}" for campo, titulo in HIPOTESIS_SECCIONES)
+
+
+def render_copiloto(campos: dict) -> str:
+    return "\n".join(f"{i}) **{titulo}:** {campos[campo]}" for i, (campo, titulo) in enumerate(COPILOTO_SECCIONES, 1))
@@ -0,0 +1,55 @@
+# claridad/stub.py
+# Backend Gemini local y determinista para benchmarks y pruebas de carga (sin red ni cuota).
+#
+# Se activa con CLARIDAD_LLM_BACKEND=stub. Latencia configurable:
+#   CLARIDAD_STUB_LATENCY        segundos hasta el primer fragmento (por defecto 0)
+#   CLARIDAD_STUB_TOKENS_PER_S   ritmo de salida; 0 = sin pausa entre fragmentos (por defecto 0)
+
+import hashlib
+import json
+import os
+import time
+
+from claridad.generation import MODEL_NAME
+
+_PLANTILLA = """- Patrón dominante: respuesta simulada {firma} (sin llamada a Gemini).
+- Cuello de botella: el vector que arrastra a los demás según la rueda recibida.
+- Mecanismo de autoengaño: conducta semanal observable y repetida.
+- Prueba 7 días: 20 min/día, métrica binaria (hecho / no hecho).
+- Coste oculto: energía y tiempo que se pierden cada semana.
+- Pregunta de quiebre: ¿qué harías distinto mañana si esto fuera cierto?"""
+
+
+class StubBackend:
+    def __init__(self, api_key: str | None = None, model_name: str = MODEL_NAME, latency: float | None = None,
+                 tokens_per_s: float | None = None, words_per_chunk: int = 8):
+        self.model_name = model_name
+        self.latency = float(os.environ.get("CLARIDAD_STUB_LATENCY", 0)) if latency is None else latency
+        self.tokens_per_s = (
+            float(os.environ.get("CLARIDAD_STUB_TOKENS_PER_S", 0)) if tokens_per_s is None else tokens_per_s
+        )
+        self.words_per_chunk = words_per_chunk
+
+    def response_for(self, prompt: str, schema: dict | None = None) -> str:
+        # Mismo prompt → misma respuesta (los benchmarks son reproducibles y la caché se puede ejercitar).
+        # Con esquema (modo JSON), un objeto con todas sus propiedades rellenas.
+        firma = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        if schema and schema.get("properties"):
+            return json.dumps({campo: f"respuesta simulada {firma} ({campo})" for campo in schema["properties"]},
+                              ensure_ascii=False)
+        return _PLANTILLA.format(firma=firma)
+
+    def stream(self, prompt: str, usage: dict | None = None, config: dict | None = None):
+        if self.latency:
+            time.sleep(self.latency)
+        respuesta = self.response_for(prompt, (config or {}).get("response_schema"))
+        if usage is not None:
+            # Estimación ~4 caracteres por token, como referencia para las trazas
+            usage.update(prompt_tokens=len(prompt) // 4, output_tokens=len(respuesta) // 4,
+                         total_tokens=(len(prompt) + len(respuesta)) // 4, finish_reason="STOP")
+        palabras = respuesta.split(" ")
+        for i in range(0, len(palabras), self.words_per_chunk):
+            trozo = palabras[i:i + self.words_per_chunk]
+            if self.tokens_per_s:
+                time.sleep(len(trozo) / self.tokens_per_s)
+            yield " ".join(trozo) + (" " if i + self.words_per_chunk < len(palabras) else "")
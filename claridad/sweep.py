@@ -0,0 +1,116 @@
+# claridad/sweep.py
+# Hipótesis de todas las áreas a la vez: asyncio lanza los prompts por área con un límite de concurrencia,
+# cada resultado queda visible en cuanto llega y al final se pide una síntesis entre áreas.
+#
+# Los SDK (y caché, Throttle, trazas) son síncronos: cada fragmento se lee con asyncio.to_thread, así el
+# bucle solo coordina. El bucle corre en su propio hilo; la UI consulta el estado como con JobRunner.
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from claridad.jobs import CANCELADA, EN_CURSO, ERROR, LISTA, PENDIENTE
+
+_FIN = object()
+
+
+def concurrency() -> int:
+    # CLARIDAD_AREAS_CONCURRENCY: prompts por área en vuelo a la vez (9 = todas las áreas en una ronda)
+    return int(os.environ.get("CLARIDAD_AREAS_CONCURRENCY", 9))
+
+
+class AreaSweep:
+    """prompts: {área: prompt}; open_stream(prompt, área | None, stats) -> fragmentos (None = síntesis), con
+    stats un dict que el stream rellena (finish_reason, tokens; ver generation.stream);
+    synthesis({área: texto}) -> prompt de síntesis con los resultados en orden de llegada."""
+
+    def __init__(self, prompts: dict, open_stream, synthesis, limit: int | None = None, meta: dict | None = None):
+        self.prompts = prompts
+        self.meta = meta or {}
+        self.open_stream = open_stream
+        self.synthesis = synthesis
+        self.limit = max(1, concurrency() if limit is None else limit)
+        self.textos = {area: "" for area in prompts}
+        self.estados = {area: PENDIENTE for area in prompts}
+        self.errores = {}
+        self.stats = {area: {} for area in [*prompts, None]}  # por área (None = síntesis): finish_reason…
+        self.llegada = []  # áreas terminadas, en orden de llegada
+        self.sintesis = ""
+        self.status = PENDIENTE
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in (LISTA, ERROR, CANCELADA)
+
+    @property
+    def elapsed(self) -> float:
+        return ((self.finished_at or time.monotonic()) - self.started_at) if self.started_at else 0.0
+
+    def resultados(self) -> dict:
+        return {area: self.textos[area].strip() for area in self.llegada if self.estados[area] == LISTA}
+
+    def start(self) -> "AreaSweep":
+        threading.Thread(target=asyncio.run, args=(self.run(),), name="claridad-sweep", daemon=True).start()
+        return self
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    async def run(self) -> None:
+        self.status = EN_CURSO
+        self.started_at = time.monotonic()
+        # Un hilo por prompt en vuelo (+1 para cerrar): el ejecutor por defecto se queda corto con pocos núcleos
+        ejecutor = ThreadPoolExecutor(self.limit + 1, thread_name_prefix="claridad-sweep")
+        asyncio.get_running_loop().set_default_executor(ejecutor)
+        semaforo = asyncio.Semaphore(self.limit)
+        await asyncio.gather(*(self._area(area, prompt, semaforo) for area, prompt in self.prompts.items()))
+        resultados = self.resultados()
+        if resultados and not self._cancel.is_set():
+            try:
+                await self._consume(self.open_stream(self.synthesis(resultados), None, self.stats[None]), None)
+            except Exception as exc:  # sin síntesis los resultados por área siguen valiendo
+                self.errores[None] = exc
+        if self._cancel.is_set():
+            self.status = CANCELADA
+        else:
+            self.status = LISTA if resultados else ERROR
+        self.finished_at = time.monotonic()
+
+    async def _area(self, area: str, prompt: str, semaforo: asyncio.Semaphore) -> None:
+        async with semaforo:
+            if self._cancel.is_set():
+                self.estados[area] = CANCELADA
+                return
+            self.estados[area] = EN_CURSO
+            try:
+                await self._consume(self.open_stream(prompt, area, self.stats[area]), area)
+            except Exception as exc:  # un área fallida no tumba las demás
+                self.errores[area] = exc
+                self.estados[area] = ERROR
+                return
+            if self._cancel.is_set():
+                self.estados[area] = CANCELADA
+                return
+            self.estados[area] = LISTA
+            self.llegada.append(area)
+
+    async def _consume(self, chunks, area: str | None) -> None:
+        it = iter(chunks)
+        try:
+            while not self._cancel.is_set():
+                chunk = await asyncio.to_thread(next, it, _FIN)
+                if chunk is _FIN:
+                    break
+                if area is None:
+                    self.sintesis += chunk
+                else:
+                    self.textos[area] += chunk
+        finally:
+            close = getattr(it, "close", None)
+            if close is not None:
+                await asyncio.to_thread(close)
@@ -0,0 +1,227 @@
+# claridad/throttle.py
+# Llamadas a Gemini compartidas por todo el proceso: presupuesto RPM/TPM (token bucket), reintentos con
+# backoff exponencial y jitter ante 429/5xx, y coalescencia de prompts idénticos en vuelo (single-flight).
+#
+# Configuración por entorno (0 = sin límite):
+#   CLARIDAD_GEMINI_RPM   peticiones por minuto (por defecto 60)
+#   CLARIDAD_GEMINI_TPM   tokens por minuto, estimados ~4 caracteres/token (por defecto 1_000_000)
+
+import os
+import random
+import threading
+import time
+
+from claridad.cache import cache_key
+
+RETRYABLE_CODES = {429, 500, 502, 503, 504}
+
+
+def is_retryable(exc: Exception) -> bool:
+    # google.api_core (generativeai) y google.genai.errors exponen el estado HTTP en .code;
+    # otros clientes HTTP en .status_code
+    code = getattr(exc, "code", None)
+    if code is None:
+        code = getattr(exc, "status_code", None)
+    try:
+        return int(code) in RETRYABLE_CODES
+    except (TypeError, ValueError):
+        return False
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """Capacidad = un minuto de presupuesto; se rellena de forma continua."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, n: float, now: float) -> float:
+        self._refill(now)
+        n = min(n, self.capacity)  # una petición mayor que el presupuesto espera al cubo lleno, no para siempre
+        return 0.0 if self.tokens >= n else (n - self.tokens) / self.rate
+
+    def take(self, n: float):
+        self.tokens -= min(n, self.capacity)
+
+
+class RateLimiter:
+    def __init__(self, rpm: float = 0, tpm: float = 0):
+        self._requests = TokenBucket(rpm) if rpm else None
+        self._tokens = TokenBucket(tpm) if tpm else None
+        self._cond = threading.Condition()
+        self.waiting = 0
+        self.max_waiting = 0
+        self.acquired = 0
+        self.throttled_s = 0.0
+
+    def acquire(self, tokens: int = 1, timeout: float = 120.0):
+        # Bloquea hasta que hay presupuesto de peticiones y de tokens; RuntimeError si la cola no avanza.
+        inicio = time.monotonic()
+        limite = inicio + timeout
+        with self._cond:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+            try:
+                while True:
+                    now = time.monotonic()
+                    espera = max(
+                        self._requests.wait_time(1, now) if self._requests else 0.0,
+                        self._tokens.wait_time(tokens, now) if self._tokens else 0.0,
+                    )
+                    if espera <= 0:
+                        break
+                    if now + espera > limite:
+                        raise RuntimeError("Límite de peticiones a Gemini: cola saturada, inténtalo en unos segundos")
+                    self._cond.wait(espera)
+                if self._requests:
+                    self._requests.take(1)
+                if self._tokens:
+                    self._tokens.take(tokens)
+                self.acquired += 1
+                self.throttled_s += time.monotonic() - inicio
+            finally:
+                self.waiting -= 1
+                self._cond.notify_all()
+
+
+class _Flight:
+    # Una llamada upstream compartida. Quien lee más allá del búfer avanza el iterador upstream
+    # (bajo turno); los demás esperan el fragmento. Si un lector se va, otro sigue tirando del stream.
+    def __init__(self, start):
+        self._start = start
+        self._it = None
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.readers = 0
+        self._pulling = False
+        self._cond = threading.Condition()
+
+    def chunk(self, i: int):
+        # Fragmento i, o None al terminar; relanza el error upstream a todos los lectores
+        with self._cond:
+            while True:
+                if i < len(self.chunks):
+                    return self.chunks[i]
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return None
+                if not self._pulling:
+                    self._pulling = True
+                    break
+                self._cond.wait()
+        parte, fin, error = None, False, None
+        try:
+            if self._it is None:
+                self._it = iter(self._start())
+            parte = next(self._it)
+        except StopIteration:
+            fin = True
+        except Exception as exc:
+            fin, error = True, exc
+        with self._cond:
+            self._pulling = False
+            if fin:
+                self.done, self.error = True, error
+            else:
+                self.chunks.append(parte)
+            self._cond.notify_all()
+        return self.chunk(i)
+
+    def close(self):
+        if self._it is not None and hasattr(self._it, "close"):
+            self._it.close()
+
+
+class Throttle:
+    """Pasarela única hacia Gemini por proceso (st.cache_resource en las apps)."""
+
+    def __init__(self, rpm: float | None = None, tpm: float | None = None, attempts: int = 4,
+                 backoff_base: float = 1.0, backoff_cap: float = 20.0):
+        rpm = float(os.environ.get("CLARIDAD_GEMINI_RPM", 60)) if rpm is None else rpm
+        tpm = float(os.environ.get("CLARIDAD_GEMINI_TPM", 1_000_000)) if tpm is None else tpm
+        self.limiter = RateLimiter(rpm, tpm)
+        self.attempts = attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.coalesced = 0
+        self.upstream_calls = 0
+
+    def _upstream(self, stream_fn, prompt: str):
+        # Reintento solo antes del primer fragmento: con texto ya entregado, repetir duplicaría la salida.
+        for intento in range(self.attempts):
+            self.limiter.acquire(estimate_tokens(prompt))
+            self.upstream_calls += 1
+            it = iter(stream_fn(prompt))
+            try:
+                primero = next(it)
+            except StopIteration:
+                return
+            except Exception as exc:
+                if intento + 1 >= self.attempts or not is_retryable(exc):
+                    raise
+                self.retries += 1
+                # Full jitter: espera uniforme en [0, min(tope, base·2^n)]
+                time.sleep(random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** intento)))
+                continue
+            yield primero
+            yield from it
+            return
+
+    def wrap(self, model: str, stream_fn):
+        # stream_fn(prompt) → iterador limitado, con reintentos y compartido entre prompts idénticos en vuelo
+        def stream(prompt: str):
+            key = cache_key(model, prompt)
+            with self._lock:
+                flight = self._flights.get(key)
+                if flight is None or flight.done:
+                    flight = self._flights[key] = _Flight(lambda: self._upstream(stream_fn, prompt))
+                else:
+                    self.coalesced += 1
+                flight.readers += 1
+            i = 0
+            try:
+                while True:
+                    parte = flight.chunk(i)
+                    if parte is None:
+                        return
+                    i += 1
+                    yield parte
+            finally:
+                with self._lock:
+                    flight.readers -= 1
+                    abandonada = flight.readers == 0 and not flight.done
+                    if (flight.done or abandonada) and self._flights.get(key) is flight:
+                        del self._flights[key]
+                if abandonada:  # nadie más la lee: se corta la llamada upstream
+                    flight.close()
+
+        return stream
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = len(self._flights)
+        return {
+            "waiting": self.limiter.waiting,
+            "max_waiting": self.limiter.max_waiting,
+            "acquired": self.limiter.acquired,
+            "throttled_s": self.limiter.throttled_s,
+            "retries": self.retries,
+            "coalesced": self.coalesced,
+            "upstream_calls": self.upstream_calls,
+            "in_flight": in_flight,
+        }
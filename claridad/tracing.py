@@ -0,0 +1,105 @@
+# claridad/tracing.py
+# Trazas ligeras por rerun: spans con tiempo de pared y atributos (tamaños, tokens, caché).
+# Cada span es una línea JSON en un fichero rotativo; en memoria se guarda una ventana por nombre
+# para el resumen p50/p95 del panel de depuración.
+
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+DEFAULT_PATH = os.environ.get(
+    "CLARIDAD_TRACE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "traces.jsonl"),
+)
+
+
+def _percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+class Tracer:
+    """Compartido por proceso (st.cache_resource): escritura y ventana protegidas por lock."""
+
+    def __init__(self, path: str | None = DEFAULT_PATH, max_bytes: int = 5 * 2**20, backups: int = 3,
+                 window: int = 200):
+        self.path = path
+        self._handler = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            # RotatingFileHandler: rotación y lock propios; delay=True no abre el fichero hasta el primer span
+            self._handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True
+            )
+        self.window = window
+        self._recent = {}  # nombre → deque de ms
+        self._tokens = {}  # nombre → deque de tokens de salida (spans de generación)
+        self._lock = threading.Lock()
+
+    def record(self, name: str, ms: float, **attrs):
+        with self._lock:
+            self._recent.setdefault(name, deque(maxlen=self.window)).append(ms)
+            if attrs.get("output_tokens"):
+                self._tokens.setdefault(name, deque(maxlen=self.window)).append(attrs["output_tokens"])
+        if self._handler is not None:
+            line = json.dumps({"ts": time.time(), "span": name, "ms": round(ms, 3), **attrs}, ensure_ascii=False,
+                              default=str)
+            self._handler.handle(logging.makeLogRecord({"msg": line, "levelno": logging.INFO}))
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        # El bloque puede añadir atributos al dict recibido (p. ej. bytes generados)
+        t0 = time.perf_counter()
+        try:
+            yield attrs
+        except BaseException as exc:
+            attrs["error"] = repr(exc)
+            raise
+        finally:
+            self.record(name, (time.perf_counter() - t0) * 1000, **attrs)
+
+    def stream(self, name: str, chunks, attrs: dict | None = None):
+        # Span alrededor de un iterador de texto: se mide desde el primer next() (el hilo que lo consume)
+        # hasta agotarlo o cerrarlo. attrs lo rellena el productor (prompt_chars, tokens, cache_hit).
+        attrs = {} if attrs is None else attrs
+        t0 = time.perf_counter()
+        primero = None
+        n_chars = n_chunks = 0
+        estado = "cancelled"
+        try:
+            for chunk in chunks:
+                if primero is None:
+                    primero = time.perf_counter()
+                n_chars += len(chunk)
+                n_chunks += 1
+                yield chunk
+            estado = "ok"
+        except Exception as exc:
+            estado = "error"
+            attrs["error"] = repr(exc)
+            raise
+        finally:
+            if primero is not None:
+                attrs["ttft_ms"] = round((primero - t0) * 1000, 3)
+            self.record(name, (time.perf_counter() - t0) * 1000, status=estado, response_chars=n_chars,
+                        chunks=n_chunks, **attrs)
+
+    def summary(self) -> dict:
+        # {nombre: {"n", "p50_ms", "p95_ms"[, "p50_out_tokens", "p95_out_tokens"]}} sobre la ventana reciente
+        with self._lock:
+            ventanas = {name: list(ms) for name, ms in self._recent.items()}
+            tokens = {name: list(t) for name, t in self._tokens.items()}
+        resumen = {}
+        for name, ms in sorted(ventanas.items()):
+            if not ms:
+                continue
+            resumen[name] = {"n": len(ms), "p50_ms": _percentile(ms, 0.50), "p95_ms": _percentile(ms, 0.95)}
+            if tokens.get(name):
+                resumen[name]["p50_out_tokens"] = _percentile(tokens[name], 0.50)
+                resumen[name]["p95_out_tokens"] = _percentile(tokens[name], 0.95)
+        return resumen
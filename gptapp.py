@@ -1,8 +1,18 @@
+import time
+
 import streamlit as st
-import matplotlib.pyplot as plt
-import numpy as np
-import pandas as pd
-from google import genai
+
+from claridad import generation
+from claridad.cache import ResponseCache
+from claridad.charts import render_radar
+from claridad.clients import ClientProvider
+from claridad.data import ruedas_data_hathora as ruedas_data
+from claridad.heuristics import local_analysis
+from claridad.jobs import CANCELADA, ERROR, LISTA, JobRunner, QueueFull
+from claridad.pipeline import GROW_PARTES, GrowPipeline
+from claridad.prompts import build_prompt_diagnostico, build_prompt_grow, build_prompt_grow_parte
+from claridad.scoring import sum_vak_sliders
+from claridad.throttle import Throttle
 
 # -------------------------------------------------
 # CONFIGURACIÓN GENERAL
@@ -23,6 +33,8 @@ if "diagnostico" not in st.session_state:
     st.session_state.diagnostico = None
 if "puntos_vak" not in st.session_state:
     st.session_state.puntos_vak = None
+if "hoja_ruta" not in st.session_state:
+    st.session_state.hoja_ruta = None  # {"consulta": str, "texto": str} del modo en un paso
 
 # -------------------------------------------------
 # SIDEBAR
@@ -41,26 +53,63 @@ with st.sidebar:
             del st.session_state[k]
         st.rerun()
 
-# -------------------------------------------------
-# BASE DE DATOS RUEDAS
-# -------------------------------------------------
-ruedas_data = {
-    "MAPA GENERAL": ["Salud", "Economía", "Trabajo", "Desarrollo", "Familia", "Amor", "Amistad", "Diversión"],
-    "SALUD": ["Sueño", "Nutrición", "Energía", "Movimiento", "Estrés", "Prevención", "Rutinas", "Escucha corporal"],
-    "ECONOMÍA": ["Ingresos", "Ahorro", "Deudas", "Control gasto", "Relación dinero", "Educación financiera", "Extras", "Seguridad"],
-    "TRABAJO": ["Claridad", "Productividad", "Satisfacción", "Progresión", "Clima", "Autonomía", "Propósito", "Reconocimiento"]
-}
-
 # -------------------------------------------------
 # CLIENT GEMINI
 # -------------------------------------------------
-def gemini_response(prompt):
-    client = genai.Client(api_key=st.secrets["GEMINI_API_KEY"])
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt
+@st.cache_resource
+def get_response_cache():
+    return ResponseCache()
+
+
+@st.cache_resource
+def get_throttle():
+    # Presupuesto RPM/TPM, reintentos 429/5xx y prompts idénticos en vuelo compartidos por proceso
+    return Throttle()
+
+
+@st.cache_resource
+def get_job_runner():
+    # El diagnóstico corre en segundo plano: el script puede dejar de esperarlo al vencer el plazo.
+    # En el modo en un paso cada sesión ocupa cuatro hilos (diagnóstico + tres partes GROW).
+    return JobRunner(max_workers=8)
+
+
+@st.cache_resource
+def _client_provider():
+    # Un genai.Client por proceso y por clave (pool httpx con keep-alive); SDK importado al construirlo
+    return ClientProvider(generation.backend_factory("genai"))
+
+
+def has_api_key() -> bool:
+    if not generation.needs_api_key():
+        return True
+    return "GEMINI_API_KEY" in st.secrets and bool(st.secrets["GEMINI_API_KEY"])
+
+
+def get_client():
+    # Con el stub o el servidor simulado no hace falta clave (ni secrets.toml)
+    return _client_provider().get(st.secrets["GEMINI_API_KEY"] if generation.needs_api_key() else "local")
+
+
+def gemini_stream(prompt, force=False, config=None, stats=None):
+    # Fragmentos según llegan: en sesión en vivo importa el primer token, no el total.
+    # Caché en disco compartida con app.py; force=True pide una respuesta nueva.
+    # config: generation.generation_config() con el tope de salida de cada prompt.
+    # stats (opcional): tokens y finish_reason, para avisar de una respuesta cortada.
+    return generation.stream(
+        get_client(), prompt, cache=get_response_cache(), force=force, stats=stats, throttle=get_throttle(), config=config
     )
-    return response.text
+
+
+def pintar_partes(pipe, cajas):
+    # Texto parcial de REALIDAD / OPCIONES / VOLUNTAD según llega
+    for parte, job in pipe.jobs().items():
+        if job.status == ERROR:
+            cajas[parte].error(f"{parte}: no se pudo generar ({job.error})")
+        else:
+            cajas[parte].markdown(f"**{parte}**\n\n{job.text}{'' if job.done else '▌'}")
+    for parte, exc in pipe.errores.items():  # no cupieron en la cola
+        cajas[parte].error(f"{parte}: no se pudo generar ({exc})")
 
 # -------------------------------------------------
 # SECCIÓN 1 — RUEDA DE LA VIDA (DIAGNÓSTICO)
@@ -77,59 +126,108 @@ if opcion == "🎡 Rueda de la Vida":
     vectores = ruedas_data[area]
     valores = [st.slider(v, 1, 10, 5, key=f"s_{v}") for v in vectores]
 
+    forzar = st.checkbox("Forzar regeneración (ignorar caché)")
+    en_un_paso = st.toggle(
+        "⚡ Diagnóstico + hoja de ruta en un paso",
+        help="REALIDAD, OPCIONES y VOLUNTAD se piden a la vez en cuanto el diagnóstico trae tensión, "
+             "bloqueador e hipótesis, sin esperar a que termine.",
+    )
+    consulta = st.text_area("Desafío específico del cliente", key="consulta_un_paso") if en_un_paso else ""
+
     if st.button("🚀 Generar Diagnóstico", use_container_width=True):
         st.session_state.datos_rueda = {
             "area": area,
             "vectores": vectores,
             "valores": valores
         }
+        st.session_state.hoja_ruta = None  # la de otro diagnóstico ya no aplica
 
         # --- GRÁFICO ---
-        N = len(vectores)
-        angles = np.linspace(0, 2 * np.pi, N, endpoint=False)
-        valores_plot = valores + [valores[0]]
-        angles_plot = list(angles) + [angles[0]]
-
-        fig, ax = plt.subplots(figsize=(7, 7), subplot_kw=dict(polar=True))
-        ax.set_theta_offset(np.pi / 2)
-        ax.set_theta_direction(-1)
-        ax.plot(angles_plot, valores_plot)
-        ax.fill(angles_plot, valores_plot, alpha=0.3)
-        ax.set_thetagrids(angles * 180 / np.pi, vectores)
-        st.pyplot(fig)
-        plt.close(fig)
+        st.image(render_radar(area, vectores, valores, theme="hathora"))
 
         # --- PROMPT MAESTRO (CAPA 1) ---
-        puntuaciones = list(zip(vectores, valores))
-
-        prompt_diagnostico = f"""
-Actúa como un Master Coach Estratégico con enfoque sistémico.
-
-Cliente: {st.session_state.nombre_cliente}
-Área evaluada: {area}
-Vectores y puntuaciones: {puntuaciones}
-
-REGLAS:
-- No describas los datos.
-- No repitas puntuaciones.
-- No lenguaje motivacional genérico.
-- Máx 150 palabras.
-- Responde en bullets.
-
-ANÁLISIS:
-1. Tensión central del sistema.
-2. Vector bloqueador real.
-3. Hipótesis conductual observable.
-4. Palanca de alto impacto (1 acción).
-5. Coste oculto de mantener este estado.
-6. Pregunta maestra de confrontación.
-"""
-
-        st.session_state.diagnostico = gemini_response(prompt_diagnostico)
+        prompt_diagnostico = build_prompt_diagnostico(st.session_state.nombre_cliente, area, vectores, valores)
 
         st.divider()
         st.subheader("🔍 Diagnóstico Estratégico")
-        st.info(st.session_state.diagnostico)
+        caja = st.empty()
+        if not has_api_key():
+            st.session_state.diagnostico = local_analysis(st.session_state.datos_rueda, motivo="sin `GEMINI_API_KEY`")
+            caja.warning(st.session_state.diagnostico)
+        else:
+            # Se pinta el texto parcial según llega; al vencer el plazo, análisis local y se libera el script:
+            # el trabajo sigue en el JobRunner y su respuesta queda en caché para el siguiente clic.
+            plazo = generation.deadline_s()
+            config = generation.generation_config("diagnostico")
+            stats = {}
+            t0 = time.monotonic()
+            pipe = None
+            try:
+                if en_un_paso and consulta.strip():
+                    config_parte = generation.generation_config("grow_parte")
+                    vak = st.session_state.puntos_vak
+                    pipe = GrowPipeline(
+                        get_job_runner(),
+                        lambda prompt, tipo: gemini_stream(
+                            prompt, force=forzar, config=config if tipo == "diagnostico" else config_parte,
+                            stats=stats if tipo == "diagnostico" else None,
+                        ),
+                        prompt_diagnostico,
+                        lambda parte, diagnostico: build_prompt_grow_parte(parte, diagnostico, consulta, vak),
+                    ).start()
+                    job = get_job_runner().get(pipe.diagnostico)
+                    st.subheader("🎯 Hoja de Ruta Estratégica")
+                    cajas = {parte: st.empty() for parte in GROW_PARTES}
+                else:
+                    job = get_job_runner().get(get_job_runner().submit(
+                        "diagnostico", gemini_stream(prompt_diagnostico, force=forzar, config=config, stats=stats)
+                    ))
+            except QueueFull as exc:  # nada se envió: aviso en vez de traza, y el resto de la sección no aplica
+                st.warning(f"{exc} Vuelve a pulsar «Generar Diagnóstico» en unos segundos.")
+                st.stop()
+            local = None
+            while not (pipe.poll() if pipe else job.done):
+                if plazo and job.elapsed > plazo:
+                    local = local_analysis(
+                        st.session_state.datos_rueda,
+                        motivo=f"Gemini no respondió en {plazo:.0f} s; su respuesta seguirá llegando en segundo plano",
+                    )
+                    break
+                if job.text:
+                    caja.info(job.text)
+                if pipe:
+                    pintar_partes(pipe, cajas)
+                time.sleep(0.1)
+            if local is not None:
+                st.session_state.diagnostico = local
+                caja.warning(local)
+                if pipe:
+                    pintar_partes(pipe, cajas)
+                st.caption("Vuelve a pulsar «Generar Diagnóstico» (sin forzar) para usar la respuesta de Gemini "
+                           "desde la caché en cuanto termine.")
+                st.stop()
+            if job.status == ERROR:  # cuota agotada tras los reintentos, red, etc.
+                st.error(f"No se pudo generar el diagnóstico: {job.error}")
+            elif job.status != CANCELADA and job.text.strip():
+                st.session_state.diagnostico = job.text
+                caja.info(job.text)
+            if job.status not in (ERROR, CANCELADA):
+                if stats.get("finish_reason") == "MAX_TOKENS":
+                    st.warning("El diagnóstico llegó cortado por el tope de tokens (MAX_TOKENS); regenera o sube el tope.")
+                elif not job.text.strip():
+                    st.warning("Gemini devolvió un diagnóstico vacío; vuelve a intentarlo.")
+            if pipe and (pipe.partes or pipe.errores):
+                pintar_partes(pipe, cajas)
+                partes = pipe.jobs()
+                st.session_state.hoja_ruta = {
+                    "consulta": consulta,
+                    "texto": "\n\n".join(
+                        f"**{parte}**\n\n{j.text.strip()}" for parte, j in partes.items() if j.status == LISTA
+                    ),
+                }
+                st.caption(f"Diagnóstico + hoja de ruta en {time.monotonic() - t0:.1f} s")
+            elif pipe:
+                st.warning("La hoja de ruta no se generó: el diagnóstico no llegó.")
 
 # -------------------------------------------------
 # SECCIÓN 2 — TEST VAK
@@ -138,20 +236,22 @@ elif opcion == "🧠 Test VAK":
     st.title("🧠 Perfil Sensorial VAK")
 
     preguntas = range(1, 13)
-    totales = {"V": 0, "A": 0, "C": 0}
+    respuestas = []
 
     for i in preguntas:
         with st.expander(f"Situación {i}"):
             v = st.slider("Visual", 1, 7, 4, key=f"v{i}")
             a = st.slider("Auditivo", 1, 7, 4, key=f"a{i}")
             c = st.slider("Cinestésico", 1, 7, 4, key=f"c{i}")
-            totales["V"] += v
-            totales["A"] += a
-            totales["C"] += c
+            respuestas.append((v, a, c))
+
+    totales = sum_vak_sliders(respuestas)
 
     if st.button("Guardar Perfil", use_container_width=True):
         st.session_state.puntos_vak = totales
         st.success("Perfil VAK guardado")
+        import pandas as pd
+
         st.bar_chart(pd.DataFrame(totales.values(), index=totales.keys()))
 
 # -------------------------------------------------
@@ -163,38 +263,20 @@ elif opcion == "🤖 Consultoría Estratégica":
     if not st.session_state.diagnostico:
         st.warning("Primero genera una Rueda de la Vida.")
     else:
-        consulta = st.text_area("Desafío específico del cliente")
+        if st.session_state.hoja_ruta:
+            st.subheader("🎯 Hoja de Ruta Estratégica")
+            st.caption(f"Generada junto al diagnóstico para: {st.session_state.hoja_ruta['consulta']}")
+            st.markdown(st.session_state.hoja_ruta["texto"])
+            st.divider()
 
-        pred = "Visual"
-        if st.session_state.puntos_vak:
-            pred = max(st.session_state.puntos_vak, key=st.session_state.puntos_vak.get)
-            pred = {"V": "Visual", "A": "Auditivo", "C": "Cinestésico"}[pred]
+        consulta = st.text_area("Desafío específico del cliente")
 
         if st.button("🚀 Generar Hoja de Ruta", use_container_width=True):
-            prompt_grow = f"""
-Actúa como un Coach Estratégico experto en metodología GROW+.
-
-DIAGNÓSTICO BASE:
-{st.session_state.diagnostico}
-
-Desafío declarado:
-{consulta}
-
-Perfil sensorial predominante: {pred}
-
-REGLAS:
-- No repitas el diagnóstico.
-- Lenguaje claro y accionable.
-- Usa predicados {pred}.
-- Máx 200 palabras.
-
-RESPONDE:
-1. REALIDAD (R): cómo se manifiesta esta tensión hoy.
-2. OPCIONES (O): 3 caminos viables.
-3. VOLUNTAD (W): 1 acción SMART concreta para 7 días.
-"""
+            prompt_grow = build_prompt_grow(st.session_state.diagnostico, consulta, st.session_state.puntos_vak)
 
-            respuesta = gemini_response(prompt_grow)
             st.divider()
             st.subheader("🎯 Hoja de Ruta Estratégica")
-            st.markdown(respuesta)
+            try:
+                st.write_stream(gemini_stream(prompt_grow, config=generation.generation_config("grow")))
+            except Exception as exc:
+                st.error(f"No se pudo generar la hoja de ruta: {exc}")
@@ -0,0 +1,31 @@
+# tests/test_gptapp.py
+# gptapp.py de punta a punta con AppTest y el backend stub (sin red ni clave).
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Antes de importar claridad: stub y caché, historial, trazas e índice desechables (como bench/run.py)
+_TMP = tempfile.mkdtemp(prefix="claridad-test-")
+os.environ["CLARIDAD_LLM_BACKEND"] = "stub"
+for _var, _nombre in (("CLARIDAD_CACHE_PATH", "cache.sqlite3"), ("CLARIDAD_STORE_PATH", "sesiones.sqlite3"),
+                      ("CLARIDAD_TRACE_PATH", "traces.jsonl"), ("CLARIDAD_SIMILAR_PATH", "ruedas_index.npz")):
+    os.environ[_var] = os.path.join(_TMP, _nombre)
+
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+
+def test_diagnostico_sin_pipeline():
+    at = AppTest.from_file(os.path.join(ROOT, "gptapp.py"), default_timeout=60)
+    at.run()
+    assert not at.toggle[0].value  # modo en un paso apagado
+    at.button[0].click().run()
+
+    assert not at.exception
+    assert "respuesta simulada" in at.session_state.diagnostico
+    assert at.session_state.hoja_ruta is None